@@ -1,10 +1,8 @@
 
 import os
 from google.adk.tools.tool_context import ToolContext
-from rag_agent.agent import root_agent
-from rag_agent.tools.get_corpus_info import get_corpus_info
-from rag_agent.tools.get_log_content_by_filename import get_log_content_by_filename
-from rag_agent.tools.analyze_logs import analyze_logs
+from rag_agent.tools.rag_query import rag_query
+from rag_agent.tools.analyze_corpus_logs import analyze_corpus_logs
 
 def main():
     corpus_name = "example_corpus"
@@ -13,7 +11,7 @@ def main():
     tool_context = ToolContext(invocation_context)
 
     # Query the corpus
-    result = root_agent.tools[0](corpus_name=corpus_name, query=query, tool_context=tool_context)
+    result = rag_query(corpus_name=corpus_name, query=query, tool_context=tool_context)
 
     if result.get("status") == "success":
         # Save results to a local file
@@ -23,14 +21,10 @@ def main():
                 f.write(f"{entry['text']}\n")
         print(f"Query results saved to {output_file}")
 
-        # --- Fetch log content and analyze logs ---
-        info = get_corpus_info(corpus_name, tool_context)
-        filename = info["files"][0]["display_name"]  # Use display_name, not file_id
-        log_content = get_log_content_by_filename(filename, corpus_name, tool_context)
-        analysis_result = analyze_logs(
+        # --- Analyze every log file in the corpus ---
+        analysis_result = analyze_corpus_logs(
             corpus_name=corpus_name,
-            tool_context=tool_context,
-            log_content=log_content
+            tool_context=tool_context
         )
         print("Log analysis result:", analysis_result)
     else:
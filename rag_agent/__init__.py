@@ -6,7 +6,6 @@ A package for interacting with Google Cloud Vertex AI RAG capabilities.
 
 import os
 
-import vertexai
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -15,10 +14,15 @@ load_dotenv()
 # Get Vertex AI configuration from environment
 PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT")
 LOCATION = os.environ.get("GOOGLE_CLOUD_LOCATION")
+RAG_BACKEND = os.environ.get("RAG_BACKEND", "vertex")
 
 # Initialize Vertex AI at package load time
 try:
-    if PROJECT_ID and LOCATION:
+    if RAG_BACKEND != "vertex":
+        print(f"Using the '{RAG_BACKEND}' RAG backend, skipping Vertex AI initialization")
+    elif PROJECT_ID and LOCATION:
+        import vertexai
+
         print(f"Initializing Vertex AI with project={PROJECT_ID}, location={LOCATION}")
         vertexai.init(project=PROJECT_ID, location=LOCATION)
         print("Vertex AI initialization successful")
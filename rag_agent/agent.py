@@ -1,15 +1,26 @@
 from google.adk.agents import Agent
 
 # from .tools import get_corpur_file_content
-from .tools.add_data import add_data
-from .tools.create_corpus import create_corpus
-from .tools.delete_corpus import delete_corpus
-from .tools.delete_document import delete_document
-from .tools.get_corpus_info import get_corpus_info
-from .tools.list_corpora import list_corpora
-from .tools.rag_query import rag_query
-from .tools.analyze_logs import analyze_logs
-from rag_agent.tools.get_log_content_by_filename import get_log_content_by_filename
+# Async variants run the blocking tools on a shared executor so concurrent
+# sessions don't stall the event loop
+from .tools.async_tools import (
+    add_data,
+    analyze_corpus_logs,
+    analyze_logs,
+    create_corpus,
+    delete_corpus,
+    delete_document,
+    get_corpus_info,
+    get_import_status,
+    get_log_content_by_filename,
+    get_log_template_lines,
+    get_plot_status,
+    list_corpora,
+    rag_query,
+    rag_query_batch,
+    rag_query_multi,
+    read_corpus_file,
+)
 
 root_agent = Agent(
     name="RagAgent",
@@ -18,13 +29,20 @@ root_agent = Agent(
     description="Vertex AI RAG Agent",
     tools=[
         rag_query,
+        rag_query_batch,
+        rag_query_multi,
         list_corpora,
         create_corpus,
         add_data,
+        get_import_status,
         get_corpus_info,
         delete_corpus,
         analyze_logs,
+        analyze_corpus_logs,
         get_log_content_by_filename,
+        read_corpus_file,
+        get_log_template_lines,
+        get_plot_status,
         delete_document,
         # get_corpur_file_content
     ],
@@ -48,11 +66,20 @@ root_agent = Agent(
     8. **Analyze Logs**: You can analyze logs for the RAG agent to identify issues or performance bottlenecks and present the results graphically (e.g., error trends, distributions, and heatmaps).
     9. **Get Log Content from filename**: You can fetch the content of a specific log file from a corpus, which can be useful for debugging or analysis purposes.
     10. **Get Corpus File Content**: You can download all file contents from a specified corpus and save them as a JSON file for further analysis or archiving.
+    11. **Batch Query**: You can run many questions against the same corpus at once.
+    12. **Multi-Corpus Query**: You can answer one question across many corpora (e.g. one per service or month) in a single step.
+    13. **Analyze Corpus Logs**: You can analyze all log files of a corpus at once and present corpus-wide error statistics.
+    14. **Read Part of a File**: You can read the head, the tail, a line range or a byte range of a corpus file, optionally only lines of one log level (e.g. ERROR).
+    15. **Import Status**: You can start large imports in the background and report their progress, results and the analysis of any log files they added.
+    16. **Compact Logs**: You can add log files as mined line templates (with counts and time ranges) instead of every repeated line, and fetch the original lines behind any template.
+    17. **Plot Status**: You can tell when plots rendered in the background are ready.
     ## How to Approach User Requests
     
     When a user asks a question:
     1. First, determine if they want to manage corpora (list/create/add data/get info/delete) or query existing information.
     2. If they're asking a knowledge question, use the `rag_query` tool to search the corpus.
+       If they ask several independent questions about the same corpus, use `rag_query_batch` instead.
+       If the question spans several corpora (e.g. several services or months), use `rag_query_multi`.
     3. If they're asking about available corpora, use the `list_corpora` tool.
     4. If they want to create a new corpus, use the `create_corpus` tool.
     5. If they want to add data, ensure you know which corpus to add to, then use the `add_data` tool.
@@ -79,11 +106,24 @@ root_agent = Agent(
     4. `add_data`: Add new data to a corpus
        - Parameters:
          - corpus_name: The name of the corpus to add data to (required, but can be empty to use current corpus)
-         - paths: List of Google Drive or GCS URLs
+         - paths: List of Google Drive or GCS URLs, or local files, directories and glob patterns
+         - force: Set to True to re-import sources that are unchanged since their last import (optional)
+         - background: Set to True to return an operation_id immediately instead of waiting for the import (optional)
+         - compress: Set to True to gzip local files while uploading them (optional)
+         - compact_logs: Set to True to add local .log files as line templates with counts and time ranges (optional)
+       - Unchanged GCS and local sources are skipped and reported as files_unchanged
+       - Local files are uploaded in parallel; upload_stats reports the throughput of each file
+       - Use background=True for large imports (many files or whole GCS prefixes)
     
     5. `get_corpus_info`: Get detailed information about a specific corpus
        - Parameters:
          - corpus_name: The name of the corpus to get information about
+         - limit: Maximum number of files to return (optional, defaults to 100)
+         - page_token: The next_page_token of the previous call, to get the next page of files (optional)
+         - summary_only: Set to True to only get file counts and time ranges (optional)
+         - fields: File fields to return, e.g. ["display_name", "update_time"] (optional)
+       - For large corpora, start with summary_only=True and only page through files if the user needs them
+       - Pages do not carry the total file count; summary_only=True returns it
          
     6. `delete_document`: Delete a specific document from a corpus
        - Parameters:
@@ -100,7 +140,11 @@ root_agent = Agent(
        - Parameters:
          - corpus_name: The name of the corpus (optional, for context)
          - tool_context: Additional context for the tool
+         - plot_mode: "sync" (default) renders the plots before returning, "background" returns the summary and plot paths immediately while the plots render, "none" returns the summary only
+       - With plot_mode "background", use `get_plot_status` before showing or referring to the plot files.
        - When this tool is called, it reads the agent's log file, analyzes errors and performance, and generates graphical summaries (such as error trend plots and heatmaps). The results are returned as image file paths and summary statistics.
+       - Use plot_mode "none" when the user only needs the numbers (e.g. total errors or error types).
+       - For a local log file that keeps growing, pass log_path with incremental=True so only newly appended lines are parsed.
        
       9. `get_log_content_by_filename`: Fetch the content of a log file from a corpus by file name
    - Parameters:
@@ -114,7 +158,66 @@ root_agent = Agent(
             - corpus_name: The name of the corpus to fetch files from
             - tool_context: Additional context for the tool
             - output_json_path: Path to the output JSON file where logs will be saved
+            - output_format: "json" or "jsonl" (optional, inferred from the file extension)
+            - compression: "none", "gzip" or "zstd" (optional, inferred from a .gz or .zst extension)
             - Returns a JSON file containing all file contents from the corpus
+            - Running it again with the same output path resumes an interrupted export
+            
+    11. `rag_query_batch`: Run several queries against one corpus concurrently
+         - Parameters:
+            - corpus_name: The name of the corpus to query (required, but can be empty to use current corpus)
+            - queries: List of text questions to ask
+            - max_concurrency: Maximum number of queries in flight at once (optional)
+         - Returns per-query results and timings in the same order as the queries
+            
+    12. `rag_query_multi`: Query several corpora in parallel and merge the best results
+         - Parameters:
+            - corpus_names: List of corpus names or glob patterns (e.g. `auth-logs-2025-*`)
+            - query: The text question to ask
+            - top_k: Number of results to return across all corpora (optional)
+            - max_concurrency: Maximum number of corpora queried at once (optional)
+            - distance_threshold: Maximum vector distance of a result (optional)
+         - Returns the global top-k results, each tagged with the corpus it came from
+
+    13. `analyze_corpus_logs`: Analyze every log file in a corpus as a whole
+         - Parameters:
+            - corpus_name: The name of the corpus whose log files to analyze
+            - file_pattern: Glob matched against file names (optional, defaults to `*.log`)
+            - plot_mode: "sync", "background" or "none", as for analyze_logs (optional)
+         - Returns one corpus-wide summary and plot set, plus per-file line and error counts
+         - Prefer this over fetching and analyzing log files one by one
+
+    14. `read_corpus_file`: Read part of a file from a corpus
+         - Parameters:
+            - filename: The name of the file to read (e.g., `test.log`)
+            - corpus_name: The name of the corpus containing the file
+            - mode: "head", "tail" (default), "lines" or "bytes"
+            - n: Number of lines for head and tail (optional, defaults to 100)
+            - start, end: Line range (1-based, inclusive) for "lines", byte range for "bytes" (optional)
+            - level: Only return lines of this log level, e.g. "ERROR" (optional)
+         - Returns the requested lines with their position in the file and whether the output was truncated
+         - Prefer this over `get_log_content_by_filename` for large logs, e.g. to show the last errors
+
+    15. `get_import_status`: Check on an import started by `add_data`
+         - Parameters:
+            - operation_id: The operation_id returned by add_data (empty to list recent imports)
+         - Returns the import's state (queued, running, done or failed), its progress, its result and the analysis of added log files
+         - Log files added by an import are analyzed in the background; use this tool to get the analysis
+         - The plots of each analysis render in the background; pass its `plots` to `get_plot_status` before showing them
+
+    16. `get_log_template_lines`: Get the original lines behind a template of a compacted log
+         - Parameters:
+            - log_ref: The log_ref shown in the template's "ref:" line
+            - template_id: The template id, e.g. "T3"
+            - offset: Number of the template's lines to skip (optional, defaults to 0)
+            - limit: Maximum number of lines to return (optional, defaults to 100)
+         - Use it when a query result shows a compacted log record and the user needs the actual lines
+
+    17. `get_plot_status`: Check on plots rendered in the background by `analyze_logs` or `analyze_corpus_logs`
+         - Parameters:
+            - plot_paths: The plot paths from the analysis summary
+            - wait_seconds: Seconds to wait for pending plots before reporting (optional, defaults to 0)
+         - Returns "pending", "done" or "error: <reason>" for each plot and whether all are done
             
    
     
@@ -0,0 +1,63 @@
+"""
+Retrieval backends used by the RAG tools.
+
+The backend is selected with RAG_BACKEND in config.py (or the RAG_BACKEND
+environment variable): "vertex" for Vertex AI RAG Engine, "local" for the
+in-process vector store used offline and for load testing.
+"""
+
+import threading
+from typing import Optional
+
+from ..config import RAG_BACKEND
+from .base import CorpusRecord, FileRecord, ImportResult, RagBackend, UploadResult
+
+_backend: Optional[RagBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> RagBackend:
+    """
+    Get the process-wide backend, creating it on first use.
+
+    Returns:
+        RagBackend: The configured backend
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if RAG_BACKEND == "local":
+                    from .local import LocalRagBackend
+
+                    _backend = LocalRagBackend()
+                elif RAG_BACKEND == "vertex":
+                    from .vertex import VertexRagBackend
+
+                    _backend = VertexRagBackend()
+                else:
+                    raise ValueError(f"Unknown RAG_BACKEND '{RAG_BACKEND}' (expected 'vertex' or 'local')")
+    return _backend
+
+
+def set_backend(backend: RagBackend) -> None:
+    """
+    Replace the process-wide backend (e.g. with a custom stand-in for load tests).
+
+    Args:
+        backend (RagBackend): The backend every tool should use from now on
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+__all__ = [
+    "CorpusRecord",
+    "FileRecord",
+    "ImportResult",
+    "RagBackend",
+    "UploadResult",
+    "get_backend",
+    "set_backend",
+]
@@ -0,0 +1,278 @@
+"""
+Backend interface covering the RAG operations used by the tools.
+"""
+
+import hashlib
+import io
+import os
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class CorpusRecord:
+    """A RAG corpus as seen by the tools."""
+
+    name: str
+    display_name: str = ""
+    create_time: str = ""
+    update_time: str = ""
+
+
+@dataclass
+class FileRecord:
+    """A file (document) stored in a RAG corpus."""
+
+    name: str
+    display_name: str = ""
+    source_uri: str = ""
+    create_time: str = ""
+    update_time: str = ""
+
+    @property
+    def file_id(self) -> str:
+        return self.name.split("/")[-1]
+
+
+def gcs_fingerprints(storage_client, path: str) -> Dict[str, str]:
+    """
+    List the objects under a gs:// path with a fingerprint from their metadata.
+
+    The generation changes whenever an object is rewritten; the MD5 (or CRC32C for
+    composite objects) identifies its content.
+    """
+    bucket_name, _, prefix = path[len("gs://"):].partition("/")
+    return {
+        f"gs://{bucket_name}/{blob.name}": f"gcs:{blob.generation}:{blob.md5_hash or blob.crc32c}"
+        for blob in storage_client.list_blobs(bucket_name, prefix=prefix)
+        if not blob.name.endswith("/")
+    }
+
+
+def local_fingerprints(path: str) -> Dict[str, str]:
+    """
+    Hash the content of a local file, or of every file under a local directory.
+
+    Returns:
+        Dict[str, str]: A fingerprint per file://<absolute path>; empty if the path
+                        does not exist
+    """
+    local_path = path[len("file://"):] if path.startswith("file://") else path
+    if os.path.isdir(local_path):
+        files = [
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(local_path)
+            for name in names
+        ]
+    elif os.path.isfile(local_path):
+        files = [local_path]
+    else:
+        return {}
+    fingerprints = {}
+    for file_path in sorted(files):
+        hasher = hashlib.blake2b(digest_size=20)
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(block)
+        fingerprints[f"file://{os.path.abspath(file_path)}"] = f"blake2b:{hasher.hexdigest()}"
+    return fingerprints
+
+
+@dataclass
+class ImportResult:
+    """Outcome of an import_files call."""
+
+    imported_count: int = 0
+    failed_count: int = 0
+    skipped_count: int = 0
+
+
+@dataclass
+class UploadResult:
+    """Outcome of an upload_file call."""
+
+    # The file's name is empty when the backend only learns it by listing the
+    # corpus; callers then find the file by its source_uri
+    file: FileRecord
+    bytes_read: int = 0
+    # Bytes sent to the backend; smaller than bytes_read when the upload is compressed
+    bytes_sent: int = 0
+
+
+class GzipReader(io.RawIOBase):
+    """
+    Readable stream of the gzip-compressed content of another binary stream.
+
+    The source is compressed block by block as the stream is read, so a file can be
+    uploaded compressed without holding it, or its compressed form, in memory.
+    """
+
+    def __init__(self, source: BinaryIO, block_size: int = 1 << 20):
+        self._source = source
+        self._block_size = block_size
+        self._compressor = zlib.compressobj(wbits=31)
+        self._buffer = b""
+        self._offset = 0
+        self._eof = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while self._offset == len(self._buffer) and not self._eof:
+            block = self._source.read(self._block_size)
+            if block:
+                self.bytes_in += len(block)
+                self._buffer = self._compressor.compress(block)
+            else:
+                self._buffer = self._compressor.flush()
+                self._eof = True
+            self._offset = 0
+        count = min(len(b), len(self._buffer) - self._offset)
+        b[:count] = self._buffer[self._offset:self._offset + count]
+        self._offset += count
+        self.bytes_out += count
+        return count
+
+
+class RagBackend(ABC):
+    """
+    Operations every retrieval backend must provide.
+
+    Corpus and file names are full resource names
+    ("projects/{project}/locations/{location}/ragCorpora/{id}" and
+    "{corpus}/ragFiles/{file_id}").
+    """
+
+    @abstractmethod
+    def list_corpora(self) -> Iterator[CorpusRecord]:
+        """List all corpora."""
+
+    @abstractmethod
+    def create_corpus(self, display_name: str, embedding_model: str) -> CorpusRecord:
+        """Create a corpus that embeds documents with the given model."""
+
+    @abstractmethod
+    def delete_corpus(self, corpus_name: str) -> None:
+        """Delete a corpus and all of its files."""
+
+    @abstractmethod
+    def list_files(self, corpus_name: str) -> Iterator[FileRecord]:
+        """List the files of a corpus lazily."""
+
+    def list_files_page(
+        self, corpus_name: str, page_size: int, page_token: Optional[str] = None
+    ) -> Tuple[List[FileRecord], Optional[str]]:
+        """
+        List one page of the files of a corpus.
+
+        The default walks list_files() lazily up to the page, with the offset as
+        token; backends with native paging should override it.
+
+        Returns:
+            Tuple[List[FileRecord], Optional[str]]: The page's files and the token of
+                the next page, None after the last page
+        """
+        offset = int(page_token) if page_token else 0
+        files = list(islice(self.list_files(corpus_name), offset, offset + page_size + 1))
+        next_page_token = str(offset + page_size) if len(files) > page_size else None
+        return files[:page_size], next_page_token
+
+    @abstractmethod
+    def get_file(self, file_name: str) -> FileRecord:
+        """Get the metadata of one file."""
+
+    @abstractmethod
+    def read_file(self, file_name: str, source_uri: Optional[str] = None) -> bytes:
+        """
+        Read the raw content of one file.
+
+        Args:
+            file_name (str): The resource name of the file
+            source_uri (str): The file's source_uri, when the caller already has its
+                              FileRecord; saves backends a metadata lookup
+        """
+
+    def open_file(self, file_name: str, source_uri: Optional[str] = None) -> BinaryIO:
+        """
+        Open one file as a binary stream that fetches its content as it is read.
+
+        Backends that can stream should override this; the default reads the
+        whole file up front. source_uri is as for read_file().
+        """
+        return io.BytesIO(self.read_file(file_name, source_uri=source_uri))
+
+    @abstractmethod
+    def delete_file(self, file_name: str, source_uri: Optional[str] = None) -> None:
+        """
+        Delete one file from its corpus.
+
+        Args:
+            source_uri (str): The file's source URI, if the caller already knows it
+        """
+
+    def fingerprint_sources(self, path: str) -> Dict[str, str]:
+        """
+        Expand an import path into the source files it covers, with a fingerprint
+        of each. Local files and directories are hashed by every backend, as they
+        are uploaded from this machine.
+
+        Returns:
+            Dict[str, str]: A content fingerprint per source URI, as recorded in the
+                            imported files' source_uri. Empty if the backend cannot
+                            fingerprint this kind of path, in which case the path is
+                            always imported.
+        """
+        if "://" in path and not path.startswith("file://"):
+            return {}
+        return local_fingerprints(path)
+
+    @abstractmethod
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: List[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> ImportResult:
+        """Import, chunk and embed source files into a corpus."""
+
+    def upload_file(
+        self,
+        corpus_name: str,
+        path: str,
+        display_name: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        compress: bool = False,
+    ) -> UploadResult:
+        """
+        Upload, chunk and embed one local file into a corpus, streaming it from disk.
+
+        Args:
+            compress (bool): Gzip the file on the fly while it is sent, where the
+                             backend's transport supports it
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support local file uploads")
+
+    @abstractmethod
+    def retrieval_query(
+        self,
+        corpus_names: List[str],
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[dict]:
+        """
+        Retrieve the contexts closest to a query.
+
+        Returns:
+            List[dict]: Contexts with "source_uri", "source_name", "text" and "score"
+                        (vector distance, lower is closer)
+        """
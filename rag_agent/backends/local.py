@@ -0,0 +1,601 @@
+"""
+In-process retrieval backend for offline work and load testing.
+
+Chunks are embedded with the local HashingEmbedder and stored per corpus as a
+float32 matrix in a memory-mapped .npy file. Queries use brute-force cosine
+search, or an IVF (inverted file) index once a corpus grows large.
+
+Layout of the store directory:
+    catalog.json                    corpora and file metadata
+    {corpus_id}/vectors.npy         (n_chunks, dim) float32 unit vectors
+    {corpus_id}/chunks.jsonl        one {"file_id", "text"} row per vector
+    {corpus_id}/files/{file_id}     raw file content
+    {corpus_id}/ivf_*.npy           IVF index, rebuilt when the corpus changes
+"""
+
+import codecs
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import (
+    LOCAL_EMBEDDING_DIM,
+    LOCAL_INDEX_TYPE,
+    LOCAL_IVF_MIN_ROWS,
+    LOCAL_IVF_NPROBE,
+    LOCAL_STORE_DIR,
+)
+from ..embeddings import HashingEmbedder
+from .base import (
+    CorpusRecord,
+    FileRecord,
+    GzipReader,
+    ImportResult,
+    RagBackend,
+    UploadResult,
+    gcs_fingerprints,
+)
+
+logger = logging.getLogger(__name__)
+
+_CORPUS_PREFIX = "projects/local/locations/local/ragCorpora/"
+_FILE_NAME_PATTERN = re.compile(r"^projects/local/locations/local/ragCorpora/([^/]+)/ragFiles/([^/]+)$")
+# Chunks embedded per call while a file is uploaded
+_EMBED_BATCH_CHUNKS = 256
+
+
+def _now() -> str:
+    return str(datetime.now(timezone.utc))
+
+
+def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """
+    Split text into windows of chunk_size whitespace-separated tokens.
+
+    Chunks keep the original formatting (line breaks included) of the text they cover.
+
+    Args:
+        text (str): The text to split
+        chunk_size (int): Tokens per chunk
+        chunk_overlap (int): Tokens shared by consecutive chunks
+
+    Returns:
+        List[str]: The chunks, in document order
+    """
+    spans = [match.span() for match in re.finditer(r"\S+", text)]
+    step = max(1, chunk_size - chunk_overlap)
+    chunks = []
+    for start in range(0, len(spans), step):
+        window = spans[start : start + chunk_size]
+        chunks.append(text[window[0][0] : window[-1][1]])
+        if start + chunk_size >= len(spans):
+            break
+    return chunks
+
+
+def iter_chunks(
+    stream: BinaryIO, chunk_size: int, chunk_overlap: int, block_size: int = 1 << 20
+) -> Iterator[str]:
+    """
+    Chunk a binary stream like chunk_text, reading it block by block.
+
+    Only the text of the chunk being assembled is held in memory.
+
+    Args:
+        stream (BinaryIO): UTF-8 text to split
+        chunk_size (int): Tokens per chunk
+        chunk_overlap (int): Tokens shared by consecutive chunks
+        block_size (int): Bytes read at a time
+
+    Yields:
+        str: The chunks, in document order
+    """
+    step = max(1, chunk_size - chunk_overlap)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    text = ""
+    eof = False
+    while not eof:
+        block = stream.read(block_size)
+        eof = not block
+        text += decoder.decode(block, final=eof)
+        spans = [match.span() for match in re.finditer(r"\S+", text)]
+        # The last token may continue in the next block
+        complete = len(spans) if eof or not text or text[-1].isspace() else len(spans) - 1
+        start = 0
+        # A window is only final once a token beyond it is known
+        while complete - start > max(chunk_size, step):
+            window = spans[start : start + chunk_size]
+            yield text[window[0][0] : window[-1][1]]
+            start += step
+        if start:
+            text = text[spans[start][0]:]
+    spans = [match.span() for match in re.finditer(r"\S+", text)]
+    if spans:
+        window = spans[:chunk_size]
+        yield text[window[0][0] : window[-1][1]]
+
+
+class _LoadedCorpus:
+    """Read-only view of one corpus version: vectors, chunk rows and IVF index."""
+
+    def __init__(self, version: int, vectors: np.ndarray, rows: List[dict]):
+        self.version = version
+        self.vectors = vectors
+        self.rows = rows
+        self.ivf: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+
+class LocalRagBackend(RagBackend):
+    """
+    Vector store kept in a local directory.
+
+    Writes are serialized with a lock; the store is meant for a single process.
+    """
+
+    def __init__(self, root: str = LOCAL_STORE_DIR, dim: int = LOCAL_EMBEDDING_DIM):
+        self.root = root
+        self.embedder = HashingEmbedder(dim=dim)
+        self._lock = threading.RLock()
+        self._loaded: Dict[str, _LoadedCorpus] = {}
+        self._storage_client = None
+        os.makedirs(root, exist_ok=True)
+        self._catalog_path = os.path.join(root, "catalog.json")
+        if os.path.exists(self._catalog_path):
+            with open(self._catalog_path, encoding="utf-8") as f:
+                self._catalog = json.load(f)
+        else:
+            self._catalog = {"corpora": {}}
+
+    # ----- catalog helpers -----
+
+    def _save_catalog(self) -> None:
+        tmp_path = f"{self._catalog_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._catalog, f)
+        os.replace(tmp_path, self._catalog_path)
+
+    def _corpus_id(self, corpus_name: str) -> str:
+        corpus_id = corpus_name[len(_CORPUS_PREFIX):] if corpus_name.startswith(_CORPUS_PREFIX) else ""
+        if corpus_id not in self._catalog["corpora"]:
+            raise ValueError(f"Corpus '{corpus_name}' not found")
+        return corpus_id
+
+    def _split_file_name(self, file_name: str) -> Tuple[str, str]:
+        match = _FILE_NAME_PATTERN.match(file_name)
+        if not match or match.group(2) not in self._catalog["corpora"].get(match.group(1), {}).get("files", {}):
+            raise ValueError(f"File '{file_name}' not found")
+        return match.group(1), match.group(2)
+
+    def _corpus_dir(self, corpus_id: str) -> str:
+        return os.path.join(self.root, corpus_id)
+
+    def _file_record(self, corpus_id: str, file_id: str) -> FileRecord:
+        meta = self._catalog["corpora"][corpus_id]["files"][file_id]
+        return FileRecord(
+            name=f"{_CORPUS_PREFIX}{corpus_id}/ragFiles/{file_id}",
+            display_name=meta["display_name"],
+            source_uri=meta["source_uri"],
+            create_time=meta["create_time"],
+            update_time=meta["update_time"],
+        )
+
+    # ----- vector storage -----
+
+    def _load(self, corpus_id: str) -> _LoadedCorpus:
+        version = self._catalog["corpora"][corpus_id]["version"]
+        loaded = self._loaded.get(corpus_id)
+        if loaded is not None and loaded.version == version:
+            return loaded
+
+        corpus_dir = self._corpus_dir(corpus_id)
+        vectors_path = os.path.join(corpus_dir, "vectors.npy")
+        if os.path.exists(vectors_path):
+            vectors = np.load(vectors_path, mmap_mode="r")
+            with open(os.path.join(corpus_dir, "chunks.jsonl"), encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+        else:
+            vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+            rows = []
+        loaded = _LoadedCorpus(version, vectors, rows)
+        self._loaded[corpus_id] = loaded
+        return loaded
+
+    def _write_vectors(self, corpus_id: str, vectors: np.ndarray, rows: List[dict]) -> None:
+        corpus_dir = self._corpus_dir(corpus_id)
+        vectors_tmp = os.path.join(corpus_dir, "vectors.tmp.npy")
+        chunks_tmp = os.path.join(corpus_dir, "chunks.jsonl.tmp")
+        np.save(vectors_tmp, np.ascontiguousarray(vectors, dtype=np.float32))
+        with open(chunks_tmp, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        os.replace(vectors_tmp, os.path.join(corpus_dir, "vectors.npy"))
+        os.replace(chunks_tmp, os.path.join(corpus_dir, "chunks.jsonl"))
+        corpus = self._catalog["corpora"][corpus_id]
+        corpus["version"] += 1
+        corpus["update_time"] = _now()
+
+    def _remove_file_rows(self, corpus_id: str, file_ids: set) -> None:
+        loaded = self._load(corpus_id)
+        keep = [i for i, row in enumerate(loaded.rows) if row["file_id"] not in file_ids]
+        if len(keep) != len(loaded.rows):
+            self._write_vectors(
+                corpus_id,
+                np.asarray(loaded.vectors[keep]),
+                [loaded.rows[i] for i in keep],
+            )
+
+    # ----- IVF index -----
+
+    def _use_ivf(self, n_rows: int) -> bool:
+        if LOCAL_INDEX_TYPE == "ivf":
+            return n_rows > 0
+        return LOCAL_INDEX_TYPE == "auto" and n_rows >= LOCAL_IVF_MIN_ROWS
+
+    def _ivf(self, corpus_id: str, loaded: _LoadedCorpus) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if loaded.ivf is not None:
+            return loaded.ivf
+
+        corpus_dir = self._corpus_dir(corpus_id)
+        paths = [os.path.join(corpus_dir, f"ivf_{part}.npy") for part in ("centroids", "order", "offsets")]
+        corpus = self._catalog["corpora"][corpus_id]
+        if corpus.get("ivf_version") == loaded.version and all(os.path.exists(p) for p in paths):
+            loaded.ivf = tuple(np.load(p, mmap_mode="r") for p in paths)
+            return loaded.ivf
+
+        vectors = loaded.vectors
+        n_lists = max(1, int(np.sqrt(len(vectors))))
+        rng = np.random.default_rng(0)
+        sample = np.asarray(vectors[rng.choice(len(vectors), min(len(vectors), 32 * n_lists), replace=False)])
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        # Spherical k-means on a sample is enough to partition unit vectors
+        for _ in range(10):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(assignment, minlength=n_lists)
+            # Empty lists keep their previous centroid
+            filled = counts > 0
+            starts = (np.cumsum(counts) - counts)[filled]
+            sums = np.add.reduceat(sample[np.argsort(assignment, kind="stable")], starts, axis=0)
+            centroids[filled] = sums / (np.linalg.norm(sums, axis=1, keepdims=True) + 1e-12)
+
+        assignment = np.concatenate(
+            [np.argmax(np.asarray(vectors[i : i + 65536]) @ centroids.T, axis=1) for i in range(0, len(vectors), 65536)]
+        )
+        order = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1)).astype(np.int64)
+        for path, array in zip(paths, (centroids, order, offsets)):
+            np.save(path, array)
+        with self._lock:
+            corpus["ivf_version"] = loaded.version
+            self._save_catalog()
+        loaded.ivf = (centroids, order, offsets)
+        return loaded.ivf
+
+    def _search(self, corpus_id: str, query: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray, _LoadedCorpus]:
+        with self._lock:
+            loaded = self._load(corpus_id)
+        if not len(loaded.vectors):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), loaded
+
+        if self._use_ivf(len(loaded.vectors)):
+            centroids, order, offsets = self._ivf(corpus_id, loaded)
+            probes = np.argsort(-(centroids @ query))[:LOCAL_IVF_NPROBE]
+            candidates = np.concatenate([order[offsets[c] : offsets[c + 1]] for c in probes])
+            candidates.sort()
+            similarities = np.asarray(loaded.vectors[candidates]) @ query
+        else:
+            candidates = np.arange(len(loaded.vectors))
+            similarities = loaded.vectors @ query
+
+        k = min(top_k, len(candidates))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), loaded
+        best = np.argpartition(-similarities, k - 1)[:k]
+        return candidates[best], 1.0 - similarities[best], loaded
+
+    # ----- source loading -----
+
+    def _get_storage_client(self):
+        if self._storage_client is None:
+            from google.cloud import storage
+
+            self._storage_client = storage.Client()
+        return self._storage_client
+
+    def _local_files(self, path: str) -> List[str]:
+        local_path = path[len("file://"):] if path.startswith("file://") else path
+        if os.path.isdir(local_path):
+            return sorted(
+                os.path.join(directory, name)
+                for directory, _, names in os.walk(local_path)
+                for name in names
+            )
+        if os.path.isfile(local_path):
+            return [local_path]
+        raise ValueError(f"Unsupported or missing source for the local backend: {path}")
+
+    def _expand_sources(self, path: str) -> List[Tuple[str, str, Callable[[], bytes]]]:
+        """Expand an import path into (source_uri, display_name, read_bytes) tuples."""
+        if path.startswith("gs://"):
+            self._get_storage_client()
+            bucket_name, _, prefix = path[len("gs://"):].partition("/")
+            blobs = [
+                blob
+                for blob in self._storage_client.list_blobs(bucket_name, prefix=prefix)
+                if not blob.name.endswith("/")
+            ]
+            return [
+                (f"gs://{bucket_name}/{blob.name}", os.path.basename(blob.name), blob.download_as_bytes)
+                for blob in blobs
+            ]
+
+        files = self._local_files(path)
+
+        def reader(file_path):
+            def read_bytes():
+                with open(file_path, "rb") as f:
+                    return f.read()
+
+            return read_bytes
+
+        return [
+            (f"file://{os.path.abspath(p)}", os.path.basename(p), reader(p)) for p in files
+        ]
+
+    # ----- RagBackend -----
+
+    def fingerprint_sources(self, path: str) -> Dict[str, str]:
+        if path.startswith("gs://"):
+            return gcs_fingerprints(self._get_storage_client(), path)
+        return super().fingerprint_sources(path)
+
+    def list_corpora(self) -> Iterator[CorpusRecord]:
+        with self._lock:
+            corpora = list(self._catalog["corpora"].items())
+        for corpus_id, meta in corpora:
+            yield CorpusRecord(
+                name=f"{_CORPUS_PREFIX}{corpus_id}",
+                display_name=meta["display_name"],
+                create_time=meta["create_time"],
+                update_time=meta["update_time"],
+            )
+
+    def create_corpus(self, display_name: str, embedding_model: str) -> CorpusRecord:
+        with self._lock:
+            corpus_id = uuid.uuid4().hex[:16]
+            os.makedirs(os.path.join(self._corpus_dir(corpus_id), "files"), exist_ok=True)
+            created = _now()
+            self._catalog["corpora"][corpus_id] = {
+                "display_name": display_name,
+                # Recorded for reference only; the local store always uses HashingEmbedder
+                "embedding_model": embedding_model,
+                "create_time": created,
+                "update_time": created,
+                "version": 0,
+                "files": {},
+            }
+            self._save_catalog()
+        return CorpusRecord(f"{_CORPUS_PREFIX}{corpus_id}", display_name, created, created)
+
+    def delete_corpus(self, corpus_name: str) -> None:
+        with self._lock:
+            corpus_id = self._corpus_id(corpus_name)
+            del self._catalog["corpora"][corpus_id]
+            self._loaded.pop(corpus_id, None)
+            self._save_catalog()
+            shutil.rmtree(self._corpus_dir(corpus_id), ignore_errors=True)
+
+    def list_files(self, corpus_name: str) -> Iterator[FileRecord]:
+        with self._lock:
+            corpus_id = self._corpus_id(corpus_name)
+            file_ids = list(self._catalog["corpora"][corpus_id]["files"])
+        for file_id in file_ids:
+            try:
+                yield self._file_record(corpus_id, file_id)
+            except KeyError:
+                # Deleted while iterating
+                continue
+
+    def list_files_page(
+        self, corpus_name: str, page_size: int, page_token: Optional[str] = None
+    ) -> Tuple[List[FileRecord], Optional[str]]:
+        # Pages are ordered by file id and the token is the last id returned, so
+        # files added or deleted between calls do not shift the next page
+        with self._lock:
+            corpus_id = self._corpus_id(corpus_name)
+            file_ids = sorted(
+                file_id for file_id in self._catalog["corpora"][corpus_id]["files"]
+                if not page_token or file_id > page_token
+            )
+            page = [self._file_record(corpus_id, file_id) for file_id in file_ids[:page_size]]
+        next_page_token = page[-1].file_id if len(file_ids) > page_size else None
+        return page, next_page_token
+
+    def get_file(self, file_name: str) -> FileRecord:
+        with self._lock:
+            return self._file_record(*self._split_file_name(file_name))
+
+    def _stored_file_path(self, file_name: str) -> str:
+        with self._lock:
+            corpus_id, file_id = self._split_file_name(file_name)
+        return os.path.join(self._corpus_dir(corpus_id), "files", file_id)
+
+    def read_file(self, file_name: str, source_uri: Optional[str] = None) -> bytes:
+        with open(self._stored_file_path(file_name), "rb") as f:
+            return f.read()
+
+    def open_file(self, file_name: str, source_uri: Optional[str] = None) -> BinaryIO:
+        return open(self._stored_file_path(file_name), "rb")
+
+    def delete_file(self, file_name: str, source_uri: Optional[str] = None) -> None:
+        with self._lock:
+            corpus_id, file_id = self._split_file_name(file_name)
+            self._remove_file_rows(corpus_id, {file_id})
+            del self._catalog["corpora"][corpus_id]["files"][file_id]
+            self._save_catalog()
+            content_path = os.path.join(self._corpus_dir(corpus_id), "files", file_id)
+            if os.path.exists(content_path):
+                os.remove(content_path)
+
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: List[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> ImportResult:
+        # Embedding is local, so max_embedding_requests_per_min does not apply
+        with self._lock:
+            corpus_id = self._corpus_id(corpus_name)
+        result = ImportResult()
+        new_vectors = []
+        new_rows = []
+        new_files = {}
+        for path in paths:
+            try:
+                sources = self._expand_sources(path)
+            except Exception as e:
+                logger.warning(f"Failed to expand import path {path}: {str(e)}")
+                result.failed_count += 1
+                continue
+            for source_uri, display_name, read_bytes in sources:
+                try:
+                    content = read_bytes()
+                    chunks = chunk_text(content.decode("utf-8", errors="replace"), chunk_size, chunk_overlap)
+                except Exception as e:
+                    logger.warning(f"Failed to import {source_uri}: {str(e)}")
+                    result.failed_count += 1
+                    continue
+                file_id = uuid.uuid4().hex[:16]
+                with open(os.path.join(self._corpus_dir(corpus_id), "files", file_id), "wb") as f:
+                    f.write(content)
+                if chunks:
+                    new_vectors.append(self.embedder.embed(chunks))
+                    new_rows.extend({"file_id": file_id, "text": chunk} for chunk in chunks)
+                new_files[file_id] = (source_uri, display_name)
+                result.imported_count += 1
+
+        if new_files:
+            self._commit_files(corpus_id, new_files, new_vectors, new_rows)
+        return result
+
+    def _commit_files(
+        self,
+        corpus_id: str,
+        new_files: Dict[str, Tuple[str, str]],
+        new_vectors: List[np.ndarray],
+        new_rows: List[dict],
+    ) -> None:
+        """Add stored and embedded files to the catalog and the vector store."""
+        with self._lock:
+            corpus = self._catalog["corpora"][corpus_id]
+            # Re-importing a source replaces its previous version
+            replaced_uris = {source_uri for source_uri, _ in new_files.values()}
+            replaced = {
+                file_id for file_id, meta in corpus["files"].items() if meta["source_uri"] in replaced_uris
+            }
+            self._remove_file_rows(corpus_id, replaced)
+            for file_id in replaced:
+                del corpus["files"][file_id]
+                os.remove(os.path.join(self._corpus_dir(corpus_id), "files", file_id))
+
+            loaded = self._load(corpus_id)
+            self._write_vectors(
+                corpus_id,
+                np.concatenate([np.asarray(loaded.vectors)] + new_vectors),
+                loaded.rows + new_rows,
+            )
+            created = _now()
+            for file_id, (source_uri, display_name) in new_files.items():
+                corpus["files"][file_id] = {
+                    "display_name": display_name,
+                    "source_uri": source_uri,
+                    "create_time": created,
+                    "update_time": created,
+                }
+            self._save_catalog()
+
+    def upload_file(
+        self,
+        corpus_name: str,
+        path: str,
+        display_name: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        compress: bool = False,
+    ) -> UploadResult:
+        with self._lock:
+            corpus_id = self._corpus_id(corpus_name)
+        file_id = uuid.uuid4().hex[:16]
+        stored_path = os.path.join(self._corpus_dir(corpus_id), "files", file_id)
+        with open(path, "rb") as source, open(stored_path, "wb") as target:
+            if compress:
+                # Round-trip through gzip, as a remote backend would receive the file
+                wire = GzipReader(source)
+                with gzip.GzipFile(fileobj=wire, mode="rb") as received:
+                    shutil.copyfileobj(received, target)
+                bytes_sent = wire.bytes_out
+            else:
+                shutil.copyfileobj(source, target)
+                bytes_sent = target.tell()
+        bytes_read = os.path.getsize(stored_path)
+
+        # Chunk and embed while reading, a batch of chunks at a time
+        new_vectors = []
+        new_rows = []
+        batch = []
+        with open(stored_path, "rb") as f:
+            for chunk in iter_chunks(f, chunk_size, chunk_overlap):
+                batch.append(chunk)
+                if len(batch) >= _EMBED_BATCH_CHUNKS:
+                    new_vectors.append(self.embedder.embed(batch))
+                    batch = []
+                new_rows.append({"file_id": file_id, "text": chunk})
+        if batch:
+            new_vectors.append(self.embedder.embed(batch))
+        source_uri = f"file://{os.path.abspath(path)}"
+        self._commit_files(corpus_id, {file_id: (source_uri, display_name)}, new_vectors, new_rows)
+        with self._lock:
+            record = self._file_record(corpus_id, file_id)
+        return UploadResult(file=record, bytes_read=bytes_read, bytes_sent=bytes_sent)
+
+    def retrieval_query(
+        self,
+        corpus_names: List[str],
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[dict]:
+        query = self.embedder.embed([text])[0]
+        candidates = []
+        for corpus_name in corpus_names:
+            with self._lock:
+                corpus_id = self._corpus_id(corpus_name)
+            rows, distances, loaded = self._search(corpus_id, query, top_k)
+            for row, distance in zip(rows, distances):
+                if distance <= distance_threshold:
+                    candidates.append((float(distance), corpus_id, loaded.rows[int(row)]))
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        results = []
+        with self._lock:
+            for distance, corpus_id, row in candidates[:top_k]:
+                meta = self._catalog["corpora"][corpus_id]["files"].get(row["file_id"], {})
+                results.append(
+                    {
+                        "source_uri": meta.get("source_uri", ""),
+                        "source_name": meta.get("display_name", ""),
+                        "text": row["text"],
+                        "score": distance,
+                    }
+                )
+        return results
@@ -0,0 +1,293 @@
+"""
+Retrieval backend backed by Vertex AI RAG Engine.
+"""
+
+import logging
+import mimetypes
+import os
+import uuid
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from vertexai import rag
+
+from ..config import GCS_READ_CHUNK_BYTES, PROJECT_ID, UPLOAD_STAGING_BUCKET
+from .base import (
+    CorpusRecord,
+    FileRecord,
+    GzipReader,
+    ImportResult,
+    RagBackend,
+    UploadResult,
+    gcs_fingerprints,
+)
+
+logger = logging.getLogger(__name__)
+
+# Compressed uploads are staged under this prefix of UPLOAD_STAGING_BUCKET
+_STAGING_PREFIX = "rag-uploads/"
+
+
+def _source_uri(rag_file) -> str:
+    """Extract the source URI of a listed RagFile, whatever source it came from."""
+    if getattr(rag_file, "source_uri", ""):
+        return rag_file.source_uri
+    gcs_source = getattr(rag_file, "gcs_source", None)
+    if gcs_source is not None and getattr(gcs_source, "uris", None):
+        return gcs_source.uris[0]
+    drive_source = getattr(rag_file, "google_drive_source", None)
+    if drive_source is not None and getattr(drive_source, "resource_ids", None):
+        resource_id = drive_source.resource_ids[0].resource_id
+        return f"https://drive.google.com/file/d/{resource_id}/view"
+    return ""
+
+
+def _to_file_record(rag_file) -> FileRecord:
+    return FileRecord(
+        name=rag_file.name,
+        display_name=getattr(rag_file, "display_name", "") or "",
+        source_uri=_source_uri(rag_file),
+        create_time=str(rag_file.create_time) if hasattr(rag_file, "create_time") else "",
+        update_time=str(rag_file.update_time) if hasattr(rag_file, "update_time") else "",
+    )
+
+
+def _to_corpus_record(corpus) -> CorpusRecord:
+    return CorpusRecord(
+        name=corpus.name,
+        display_name=getattr(corpus, "display_name", "") or "",
+        create_time=str(corpus.create_time) if hasattr(corpus, "create_time") else "",
+        update_time=str(corpus.update_time) if hasattr(corpus, "update_time") else "",
+    )
+
+
+class VertexRagBackend(RagBackend):
+    """Thin adapter from the backend interface to vertexai.rag."""
+
+    def __init__(self):
+        self._storage_client = None
+
+    def list_corpora(self) -> Iterator[CorpusRecord]:
+        return (_to_corpus_record(corpus) for corpus in rag.list_corpora())
+
+    def create_corpus(self, display_name: str, embedding_model: str) -> CorpusRecord:
+        embedding_model_config = rag.RagEmbeddingModelConfig(
+            vertex_prediction_endpoint=rag.VertexPredictionEndpoint(
+                publisher_model=embedding_model
+            )
+        )
+        rag_corpus = rag.create_corpus(
+            display_name=display_name,
+            backend_config=rag.RagVectorDbConfig(
+                rag_embedding_model_config=embedding_model_config
+            ),
+        )
+        return _to_corpus_record(rag_corpus)
+
+    def delete_corpus(self, corpus_name: str) -> None:
+        if not UPLOAD_STAGING_BUCKET:
+            rag.delete_corpus(corpus_name)
+            return
+        # Sources are only known from the listing, which is gone once the corpus is
+        staged = [record.source_uri for record in self.list_files(corpus_name)]
+        rag.delete_corpus(corpus_name)
+        self._delete_staged(staged)
+
+    def list_files(self, corpus_name: str) -> Iterator[FileRecord]:
+        # The pager fetches further pages only as iteration reaches them
+        return (_to_file_record(rag_file) for rag_file in rag.list_files(corpus_name))
+
+    def list_files_page(
+        self, corpus_name: str, page_size: int, page_token: Optional[str] = None
+    ) -> Tuple[List[FileRecord], Optional[str]]:
+        # Only the requested page is fetched
+        pager = rag.list_files(corpus_name, page_size=page_size, page_token=page_token or None)
+        response = next(iter(pager.pages))
+        return (
+            [_to_file_record(rag_file) for rag_file in response.rag_files],
+            response.next_page_token or None,
+        )
+
+    def get_file(self, file_name: str) -> FileRecord:
+        # rag.get_file() drops the import source, so look the file up in its listing
+        corpus_name = file_name.split("/ragFiles/")[0]
+        for record in self.list_files(corpus_name):
+            if record.name == file_name:
+                return record
+        raise ValueError(f"File '{file_name}' not found")
+
+    def _get_storage_client(self):
+        if self._storage_client is None:
+            from google.cloud import storage
+
+            self._storage_client = storage.Client(project=PROJECT_ID)
+        return self._storage_client
+
+    def _source_blob(self, file_name: str, source_uri: Optional[str] = None):
+        # RAG Engine does not serve file content, so read it from the import source;
+        # without a source_uri from the caller that takes a listing of the corpus
+        if source_uri is None:
+            source_uri = self.get_file(file_name).source_uri
+        if not source_uri.startswith("gs://"):
+            raise ValueError(
+                f"Content of '{file_name}' is only readable for files imported from GCS "
+                f"(source: '{source_uri or 'unknown'}')"
+            )
+        bucket_name, _, blob_name = source_uri[len("gs://"):].partition("/")
+        return self._get_storage_client().bucket(bucket_name).blob(blob_name)
+
+    def read_file(self, file_name: str, source_uri: Optional[str] = None) -> bytes:
+        return self._source_blob(file_name, source_uri).download_as_bytes()
+
+    def open_file(self, file_name: str, source_uri: Optional[str] = None) -> BinaryIO:
+        # BlobReader downloads the object in chunks as the stream is consumed
+        return self._source_blob(file_name, source_uri).open("rb", chunk_size=GCS_READ_CHUNK_BYTES)
+
+    def delete_file(self, file_name: str, source_uri: Optional[str] = None) -> None:
+        if not UPLOAD_STAGING_BUCKET:
+            rag.delete_file(file_name)
+            return
+        if source_uri is None:
+            source_uri = self.get_file(file_name).source_uri
+        rag.delete_file(file_name)
+        self._delete_staged([source_uri])
+
+    def _delete_staged(self, source_uris: List[str]) -> None:
+        """Delete the staging objects of compressed uploads among the given sources."""
+        if not UPLOAD_STAGING_BUCKET:
+            return
+        prefix = f"gs://{UPLOAD_STAGING_BUCKET}/{_STAGING_PREFIX}"
+        bucket = None
+        for source_uri in source_uris:
+            if not source_uri.startswith(prefix):
+                continue
+            if bucket is None:
+                bucket = self._get_storage_client().bucket(UPLOAD_STAGING_BUCKET)
+            try:
+                bucket.blob(source_uri[len(f"gs://{UPLOAD_STAGING_BUCKET}/"):]).delete()
+            except Exception as e:
+                logger.warning(f"Could not delete staged upload {source_uri}: {str(e)}")
+
+    def fingerprint_sources(self, path: str) -> Dict[str, str]:
+        # Drive files carry no cheap content fingerprint; local files are hashed
+        if not path.startswith("gs://"):
+            return super().fingerprint_sources(path)
+        return gcs_fingerprints(self._get_storage_client(), path)
+
+    def import_files(
+        self,
+        corpus_name: str,
+        paths: List[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        max_embedding_requests_per_min: int,
+    ) -> ImportResult:
+        transformation_config = rag.TransformationConfig(
+            chunking_config=rag.ChunkingConfig(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+            ),
+        )
+        response = rag.import_files(
+            corpus_name,
+            paths,
+            transformation_config=transformation_config,
+            max_embedding_requests_per_min=max_embedding_requests_per_min,
+        )
+        return ImportResult(
+            imported_count=getattr(response, "imported_rag_files_count", 0),
+            failed_count=getattr(response, "failed_rag_files_count", 0),
+            skipped_count=getattr(response, "skipped_rag_files_count", 0),
+        )
+
+    def upload_file(
+        self,
+        corpus_name: str,
+        path: str,
+        display_name: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        compress: bool = False,
+    ) -> UploadResult:
+        transformation_config = rag.TransformationConfig(
+            chunking_config=rag.ChunkingConfig(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+            ),
+        )
+        size = os.path.getsize(path)
+        if not compress or not UPLOAD_STAGING_BUCKET:
+            # The SDK sends the file from disk as a multipart upload
+            rag_file = rag.upload_file(
+                corpus_name=corpus_name,
+                path=path,
+                display_name=display_name,
+                transformation_config=transformation_config,
+            )
+            return UploadResult(file=_to_file_record(rag_file), bytes_read=size, bytes_sent=size)
+
+        # Compressed uploads are staged in GCS with gzip content encoding (served
+        # decompressed to readers) and imported from there
+        blob = self._get_storage_client().bucket(UPLOAD_STAGING_BUCKET).blob(
+            f"{_STAGING_PREFIX}{uuid.uuid4().hex}/{display_name}"
+        )
+        blob.content_encoding = "gzip"
+        with open(path, "rb") as source:
+            wire = GzipReader(source, block_size=GCS_READ_CHUNK_BYTES)
+            blob.upload_from_file(wire, content_type=mimetypes.guess_type(path)[0] or "text/plain")
+        source_uri = f"gs://{UPLOAD_STAGING_BUCKET}/{blob.name}"
+        imported = 0
+        try:
+            response = rag.import_files(
+                corpus_name,
+                [source_uri],
+                transformation_config=transformation_config,
+            )
+            imported = getattr(response, "imported_rag_files_count", 0)
+        finally:
+            # The staged object is where the file's content is read from, so it
+            # lives as long as the corpus file and is only removed if the import failed
+            if not imported:
+                self._delete_staged([source_uri])
+        if not imported:
+            raise ValueError(f"Upload of '{path}' was not imported into {corpus_name}")
+        # The import response carries no file names; the caller resolves the file
+        # by its source URI, with one listing for all uploads of a batch
+        record = FileRecord(name="", display_name=display_name, source_uri=source_uri)
+        return UploadResult(file=record, bytes_read=size, bytes_sent=wire.bytes_out)
+
+    def retrieval_query(
+        self,
+        corpus_names: List[str],
+        text: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> List[dict]:
+        rag_retrieval_config = rag.RagRetrievalConfig(
+            top_k=top_k,
+            filter=rag.Filter(vector_distance_threshold=distance_threshold),
+        )
+        response = rag.retrieval_query(
+            rag_resources=[rag.RagResource(rag_corpus=name) for name in corpus_names],
+            text=text,
+            rag_retrieval_config=rag_retrieval_config,
+        )
+
+        # Process the response into a more usable format
+        results = []
+        if hasattr(response, "contexts") and response.contexts:
+            for ctx_group in response.contexts.contexts:
+                results.append(
+                    {
+                        "source_uri": (
+                            ctx_group.source_uri if hasattr(ctx_group, "source_uri") else ""
+                        ),
+                        "source_name": (
+                            ctx_group.source_display_name
+                            if hasattr(ctx_group, "source_display_name")
+                            else ""
+                        ),
+                        "text": ctx_group.text if hasattr(ctx_group, "text") else "",
+                        "score": ctx_group.score if hasattr(ctx_group, "score") else 0.0,
+                    }
+                )
+        return results
@@ -24,3 +24,132 @@ DEFAULT_TOP_K = 3
 DEFAULT_DISTANCE_THRESHOLD = 0.5
 DEFAULT_EMBEDDING_MODEL = "publishers/google/models/text-embedding-005"
 DEFAULT_EMBEDDING_REQUESTS_PER_MIN = 1000
+
+# Ingestion settings
+# add_data imports paths in batches of this size, several batches at a time; the
+# embedding request rate above is shared by all of them
+IMPORT_BATCH_SIZE = 25
+IMPORT_MAX_CONCURRENCY = 4
+# A failed batch is retried this many times, waiting 2, 4, 8... times the backoff
+IMPORT_MAX_RETRIES = 3
+IMPORT_RETRY_BACKOFF_SECONDS = 2.0
+# Local files uploaded at the same time by add_data
+UPLOAD_MAX_CONCURRENCY = 8
+# Fingerprints of imported sources, used to skip unchanged ones on later imports
+INGEST_MANIFEST_DIR = os.environ.get("RAG_INGEST_MANIFEST_DIR", ".rag_ingest_manifests")
+# Imports run by add_data(background=True) at the same time
+IMPORT_OPERATION_WORKERS = 2
+# Finished import operations kept for get_import_status
+IMPORT_OPERATIONS_KEPT = 100
+# Workers analyzing log files added by imports
+LOG_ANALYSIS_JOB_WORKERS = 1
+
+# Corpus resolver cache settings
+# How long a corpus listing is trusted before the corpora are listed again
+CORPUS_RESOLVER_TTL_SECONDS = 300
+
+# Corpus file index settings
+# How long a corpus's file listing is trusted before the corpus is listed again
+FILE_INDEX_TTL_SECONDS = 300
+# Corpora whose file index is kept; the least recently used ones are dropped
+FILE_INDEX_MAX_CORPORA = 32
+# Files returned per get_corpus_info page unless the caller asks for another limit
+CORPUS_INFO_PAGE_SIZE = 100
+
+# Retrieval result cache settings
+RESULT_CACHE_MAX_ENTRIES = 1024
+RESULT_CACHE_TTL_SECONDS = 600
+
+# Semantic (near-duplicate) query cache settings
+SEMANTIC_CACHE_ENABLED = False
+# Calibrated on the local hashing embedder: reordered or re-inflected paraphrases
+# score 0.86-1.0, while related but different questions ("authentication" vs
+# "authorization" errors) score up to 0.72. Queries must also share their numbers
+# and identifiers exactly, since those barely move the embedding.
+SEMANTIC_CACHE_SIMILARITY_THRESHOLD = 0.8
+SEMANTIC_CACHE_MAX_ENTRIES_PER_CORPUS = 256
+SEMANTIC_CACHE_MAX_CORPORA = 32
+SEMANTIC_CACHE_TTL_SECONDS = 600
+SEMANTIC_CACHE_EMBEDDING_DIM = 512
+
+# Batch query settings
+DEFAULT_QUERY_CONCURRENCY = 8
+
+# Multi-corpus retrieval settings
+# The default RagManagedDb reports cosine distance, so lower scores rank higher
+RETRIEVAL_SCORE_IS_DISTANCE = True
+
+# Retrieval backend settings
+# "vertex" uses Vertex AI RAG Engine; "local" uses an in-process vector store
+# (offline work and load testing)
+RAG_BACKEND = os.environ.get("RAG_BACKEND", "vertex")
+LOCAL_STORE_DIR = os.environ.get("RAG_LOCAL_STORE_DIR", ".rag_store")
+LOCAL_EMBEDDING_DIM = 512
+# "flat" (brute force), "ivf", or "auto" (IVF once a corpus reaches LOCAL_IVF_MIN_ROWS chunks)
+LOCAL_INDEX_TYPE = "auto"
+LOCAL_IVF_MIN_ROWS = 50000
+LOCAL_IVF_NPROBE = 8
+# Download chunk size when streaming file content from GCS
+GCS_READ_CHUNK_BYTES = 8 * 1024 * 1024
+# Corpus exports keep each downloaded file in memory up to this size, on disk beyond it
+EXPORT_SPOOL_MAX_MEMORY_BYTES = 16 * 1024 * 1024
+# Bucket where compressed local uploads are staged before import (Vertex backend);
+# without it, add_data(compress=True) uploads uncompressed. Staged objects under
+# rag-uploads/ back the corpus files' content and are deleted with those files
+UPLOAD_STAGING_BUCKET = os.environ.get("RAG_UPLOAD_STAGING_BUCKET", "")
+
+# Async tool settings
+# Size of the thread pool shared by all async tool variants for blocking backend calls
+ASYNC_TOOL_MAX_WORKERS = 16
+
+# Log analysis settings
+LOG_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Lines parsed per chunk by the streaming log parser
+LOG_CHUNK_LINES = 200_000
+# Timeline plots bin events into at most this many time buckets
+LOG_TIMELINE_MAX_BINS = 400
+# Maximum number of unauthorized events labelled on the unauthorized timeline
+LOG_ANNOTATION_BUDGET = 20
+# Worker processes used to render analyze_logs plots in the background
+PLOT_RENDER_WORKERS = 4
+# Finished background renders whose outcome get_plot_status still remembers
+PLOT_STATUS_HISTORY = 1024
+# Longest get_plot_status may wait for background renders to finish
+PLOT_STATUS_MAX_WAIT_SECONDS = 60
+
+# Log analysis cache settings
+# analyze_logs results and plots are cached on disk by log content hash
+ANALYSIS_CACHE_ENABLED = True
+ANALYSIS_CACHE_DIR = os.environ.get("LOG_ANALYSIS_CACHE_DIR", ".log_analysis_cache")
+ANALYSIS_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Log files whose content hash is remembered, so unchanged files are not re-read
+ANALYSIS_CACHE_MAX_FILE_HASHES = 1024
+# Per-file checkpoints for incremental analysis of append-only logs
+LOG_CHECKPOINT_DIR = os.environ.get("LOG_CHECKPOINT_DIR", ".log_checkpoints")
+# Worker processes that parse log files for analyze_corpus_logs
+LOG_ANALYSIS_WORKERS = os.cpu_count() or 4
+# Larger log files are split at line boundaries into segments of about this size,
+# so a single big file is parsed by several workers
+LOG_SEGMENT_BYTES = 64 * 1024 * 1024
+# Log bytes analyze_corpus_logs has queued or being parsed at once; file downloads
+# wait while the parsers are this far behind
+LOG_ANALYSIS_MAX_INFLIGHT_BYTES = 256 * 1024 * 1024
+
+# Local copies of corpus files used for ranged reads (read_corpus_file)
+FILE_CACHE_DIR = os.environ.get("RAG_FILE_CACHE_DIR", ".rag_file_cache")
+FILE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+# Upper bounds on what one read_corpus_file call returns
+FILE_READ_MAX_LINES = 500
+FILE_READ_MAX_BYTES = 64 * 1024
+
+# Log template mining for add_data(compact_logs=True)
+# Drain parse tree depth, including the token-count level and the leaves
+LOG_TEMPLATE_DEPTH = 4
+# Minimum share of equal tokens for a line to join an existing template
+LOG_TEMPLATE_SIMILARITY = 0.5
+# Children per parse tree node before further tokens are grouped under <*>
+LOG_TEMPLATE_MAX_CHILDREN = 100
+# Line numbers listed per template in the compacted log; the index keeps all of them
+LOG_TEMPLATE_REFS_LISTED = 20
+# Compacted logs, their template indexes and compressed copies of the originals
+LOG_TEMPLATE_DIR = os.environ.get("RAG_LOG_TEMPLATE_DIR", ".log_templates")
@@ -0,0 +1,70 @@
+"""
+Local text embedders that work offline.
+
+These are used wherever the agent needs cheap, deterministic vectors without
+calling the Vertex AI embedding endpoint (e.g. the semantic query cache).
+"""
+
+import re
+import zlib
+from typing import List, Sequence
+
+import numpy as np
+
+# Words that carry little meaning in log queries and only dilute similarity
+_STOPWORDS = frozenset(
+    """
+    a all an and any are as at be by can could do does for from give get had has
+    have how i in is it list me my of on or please show tell the their them there
+    to was were what which who why with would you
+    """.split()
+)
+
+
+class HashingEmbedder:
+    """
+    Embed text with the hashing trick over words and character n-grams.
+
+    Vectors are L2-normalized float32, so cosine similarity is a dot product.
+    Character n-grams make near spellings ("error" / "errors") land close together.
+    """
+
+    def __init__(self, dim: int = 512, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+
+    def _features(self, text: str) -> List[str]:
+        words = [
+            word
+            for word in re.findall(r"[a-z0-9_@.]+", text.lower())
+            if word not in _STOPWORDS
+        ]
+        features = [f"w:{word}" for word in words]
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(
+                padded[i : i + self.ngram]
+                for i in range(max(1, len(padded) - self.ngram + 1))
+            )
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts (Sequence[str]): The texts to embed
+
+        Returns:
+            np.ndarray: A (len(texts), dim) float32 matrix of unit vectors
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 is stable across processes, unlike hash()
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dim] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
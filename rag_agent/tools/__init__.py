@@ -3,15 +3,30 @@ RAG Tools package for interacting with Vertex AI RAG corpora.
 """
 
 from .add_data import add_data
+from .analyze_corpus_logs import analyze_corpus_logs
 from .create_corpus import create_corpus
 from .delete_corpus import delete_corpus
 from .delete_document import delete_document
 from .get_corpus_info import get_corpus_info
+from .get_import_status import get_import_status
+from .get_log_template_lines import get_log_template_lines
+from .get_plot_status import get_plot_status
 from .list_corpora import list_corpora
+from .read_corpus_file import read_corpus_file
 from .rag_query import rag_query
+from .rag_query_batch import rag_query_batch
+from .rag_query_multi import rag_query_multi
 from .utils import (
     check_corpus_exists,
+    get_analysis_cache_stats,
+    get_corpus_cache_stats,
     get_corpus_resource_name,
+    get_file_cache_stats,
+    get_file_index_stats,
+    get_retrieval_cache_stats,
+    get_semantic_cache_stats,
+    invalidate_corpus_cache,
+    invalidate_corpus_data,
     set_current_corpus,
 )
 
@@ -20,10 +35,25 @@ __all__ = [
     "create_corpus",
     "list_corpora",
     "rag_query",
+    "rag_query_batch",
+    "rag_query_multi",
+    "analyze_corpus_logs",
     "get_corpus_info",
+    "get_import_status",
+    "get_log_template_lines",
+    "get_plot_status",
     "delete_corpus",
     "delete_document",
+    "read_corpus_file",
     "check_corpus_exists",
     "get_corpus_resource_name",
     "set_current_corpus",
+    "get_corpus_cache_stats",
+    "invalidate_corpus_cache",
+    "get_retrieval_cache_stats",
+    "get_semantic_cache_stats",
+    "get_analysis_cache_stats",
+    "get_file_cache_stats",
+    "get_file_index_stats",
+    "invalidate_corpus_data",
 ]
@@ -2,26 +2,188 @@
 Tool for adding new data sources to a Vertex AI RAG corpus.
 """
 
+import glob
+import os
 import re
-from typing import List
+from typing import Callable, List
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
-from .analyze_logs import analyze_logs
-from .get_log_content_by_filename import get_log_content_by_filename
-
-from ..config import (
-    DEFAULT_CHUNK_OVERLAP,
-    DEFAULT_CHUNK_SIZE,
-    DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
+
+from .import_operations import import_operations
+from .ingestion import expand_local_paths, import_in_batches, upload_local_files
+from .ingestion_manifest import ingestion_manifest
+from .utils import (
+    check_corpus_exists,
+    get_corpus_resource_name,
+    invalidate_corpus_data,
 )
-from .utils import check_corpus_exists, get_corpus_resource_name
+
+# Unchanged sources listed in the result; the count covers all of them
+UNCHANGED_SOURCES_LISTED = 50
+
+
+def _import_sources(
+    operation_id: str,
+    corpus_name: str,
+    corpus_resource_name: str,
+    local_files: List[str],
+    force: bool,
+    compress: bool,
+    compact_logs: bool,
+    progress: Callable[[dict], None],
+    details: dict,
+) -> dict:
+    """Import new and changed sources, upload local files and queue the analysis of added logs."""
+    # Only import sources that are new or changed since their last import
+    import_paths, unchanged, fingerprints = ingestion_manifest.plan(
+        corpus_resource_name, details["paths"], force=force
+    )
+    upload_uris, unchanged_files, upload_fingerprints = ingestion_manifest.plan(
+        corpus_resource_name, local_files, force=force
+    )
+    unchanged += unchanged_files
+    local_files = [uri[len("file://"):] if uri.startswith("file://") else uri for uri in upload_uris]
+    details = {
+        "files_unchanged": len(unchanged),
+        "unchanged_sources": unchanged[:UNCHANGED_SOURCES_LISTED],
+        **details,
+    }
+    if unchanged:
+        print(f"Skipping {len(unchanged)} unchanged source(s)")
+    if not import_paths and not local_files:
+        return {
+            "status": "success",
+            "message": f"All {len(unchanged)} source(s) are unchanged since their last import into corpus '{corpus_name}'; nothing to add",
+            "corpus_name": corpus_name,
+            "files_added": 0,
+            **details,
+        }
+
+    imported = failed = skipped = 0
+    result = {}
+    added_logs = []
+    if import_paths:
+        # Import files to the corpus in concurrent, individually retried batches
+        import_result = import_in_batches(corpus_resource_name, import_paths, progress=progress)
+        ingestion_manifest.record(
+            corpus_resource_name,
+            {
+                path: fingerprints[path]
+                for path in import_result["succeeded_paths"]
+                if path in fingerprints
+            },
+        )
+        imported += import_result["imported"]
+        failed += import_result["failed"]
+        skipped += import_result["skipped"]
+        result.update(
+            batches=import_result["batches"],
+            batches_failed=import_result["batches_failed"],
+            batch_stats=import_result["batch_stats"],
+        )
+        added_logs.extend(p for p in import_result["succeeded_paths"] if p.endswith('.log'))
+
+    if local_files:
+        # Upload local files in parallel, streaming each one from disk
+        upload_result = upload_local_files(
+            corpus_resource_name,
+            local_files,
+            compress=compress,
+            progress=progress,
+            compact_logs=compact_logs,
+        )
+        uploaded = {
+            f"file://{stats['path']}": stats["file_name"]
+            for stats in upload_result["file_stats"]
+            if stats["error"] is None
+        }
+        ingestion_manifest.record(
+            corpus_resource_name,
+            {uri: upload_fingerprints[uri] for uri in uploaded if uri in upload_fingerprints},
+            file_names=uploaded,
+        )
+        imported += upload_result["uploaded"]
+        failed += upload_result["failed"]
+        result.update(
+            files_uploaded=upload_result["uploaded"],
+            bytes_uploaded=upload_result["bytes"],
+            bytes_sent=upload_result["bytes_sent"],
+            upload_elapsed_ms=upload_result["elapsed_ms"],
+            upload_mb_per_s=upload_result["mb_per_s"],
+            upload_stats=upload_result["file_stats"],
+        )
+        if "compaction" in upload_result:
+            result["compaction"] = upload_result["compaction"]
+        # Compacted logs no longer hold one row per event, so they are not analyzed.
+        # Uploaded logs are analyzed from the local copy: not every backend can
+        # read back the content of an uploaded file
+        added_logs.extend(
+            stats["path"]
+            for stats in upload_result["file_stats"]
+            if stats["error"] is None and stats["path"].endswith('.log') and "compaction" not in stats
+        )
+
+    # Cached query results for this corpus are now stale
+    if imported:
+        invalidate_corpus_data(corpus_resource_name)
+
+    # Build the success message
+    conversion_msg = ""
+    if details["conversions"]:
+        conversion_msg = " (Converted Google Docs URLs to Drive format)"
+    compaction_msg = ""
+    if "compaction" in result and result["compaction"]["ratio"] is not None:
+        compaction = result["compaction"]
+        compaction_msg = (
+            f"; compacted {compaction['lines']} log lines into {compaction['templates']} templates"
+            f" ({compaction['ratio']:.1%} of the original size)"
+        )
+
+    if not imported and failed:
+        status = "error"
+    elif failed:
+        status = "warning"
+    else:
+        status = "success"
+    if status == "error":
+        message = f"Failed to add {failed} file(s) to corpus '{corpus_name}'"
+    else:
+        failed_msg = f", {failed} failed" if failed else ""
+        message = f"Successfully added {imported} file(s) to corpus '{corpus_name}'{failed_msg}{conversion_msg}{compaction_msg}"
+
+    result = {
+        "status": status,
+        "message": message,
+        "corpus_name": corpus_name,
+        "files_added": imported,
+        "files_failed": failed,
+        "files_skipped": skipped,
+        **result,
+        **details,
+    }
+
+    # Analyze added .log files in the background, off the import's critical path
+    if added_logs:
+        import_operations.queue_log_analysis(
+            operation_id, corpus_name, corpus_resource_name, added_logs
+        )
+        result["log_analysis"] = {
+            "status": "queued",
+            "files": added_logs,
+            "message": "Log analysis runs in the background; use get_import_status to get its results",
+        }
+
+    return result
 
 
 def add_data(
     corpus_name: str,
     paths: List[str],
     tool_context: ToolContext,
+    force: bool = False,
+    background: bool = False,
+    compress: bool = False,
+    compact_logs: bool = False,
 ) -> dict:
     """
     Add new data sources to a Vertex AI RAG corpus.
@@ -33,8 +195,16 @@ def add_data(
                           - Google Drive: "https://drive.google.com/file/d/{FILE_ID}/view"
                           - Google Docs/Sheets/Slides: "https://docs.google.com/{type}/d/{FILE_ID}/..."
                           - Google Cloud Storage: "gs://{BUCKET}/{PATH}"
+                          - Local files, directories and globs: "/var/log/app/*.log", "file:///data/logs"
                           Example: ["https://drive.google.com/file/d/123", "gs://my_bucket/my_files_dir"]
         tool_context (ToolContext): The tool context
+        force (bool): Re-import sources even if they are unchanged since their last import
+        background (bool): Return an operation_id right away instead of waiting for the
+                           import; follow it with get_import_status
+        compress (bool): Gzip local files on the fly while uploading them
+        compact_logs (bool): Collapse repeated lines of local .log files into mined
+                             templates (template, count, time range, line references)
+                             before embedding them
 
     Returns:
         dict: Information about the added data and status
@@ -61,6 +231,7 @@ def add_data(
 
     # Pre-process paths to validate and convert Google Docs URLs to Drive format if needed
     validated_paths = []
+    local_files = []
     invalid_paths = []
     conversions = []
 
@@ -101,14 +272,24 @@ def add_data(
             validated_paths.append(path)
             continue
 
+        # Check for local files, directories and glob patterns
+        if path.startswith("file://") or os.path.exists(path) or glob.has_magic(path):
+            files = expand_local_paths(path)
+            if files:
+                local_files.extend(files)
+            else:
+                invalid_paths.append(f"{path} (No local files found)")
+            continue
+
         # If we're here, the path wasn't in a recognized format
         invalid_paths.append(f"{path} (Invalid format)")
 
     # Check if we have any valid paths after validation
-    if not validated_paths:
+    local_files = list(dict.fromkeys(local_files))
+    if not validated_paths and not local_files:
         return {
             "status": "error",
-            "message": "No valid paths provided. Please provide Google Drive URLs or GCS paths.",
+            "message": "No valid paths provided. Please provide Google Drive URLs, GCS paths or local files.",
             "corpus_name": corpus_name,
             "invalid_paths": invalid_paths,
         }
@@ -117,58 +298,48 @@ def add_data(
         # Get the corpus resource name
         corpus_resource_name = get_corpus_resource_name(corpus_name)
 
-        # Set up chunking configuration
-        transformation_config = rag.TransformationConfig(
-            chunking_config=rag.ChunkingConfig(
-                chunk_size=DEFAULT_CHUNK_SIZE,
-                chunk_overlap=DEFAULT_CHUNK_OVERLAP,
-            ),
-        )
-
-        # Import files to the corpus
-        import_result = rag.import_files(
-            corpus_resource_name,
-            validated_paths,
-            transformation_config=transformation_config,
-            max_embedding_requests_per_min=DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
-        )
-
         # Set this as the current corpus if not already set
         if not tool_context.state.get("current_corpus"):
             tool_context.state["current_corpus"] = corpus_name
 
-            # Build the success message
-            conversion_msg = ""
-            if conversions:
-                conversion_msg = " (Converted Google Docs URLs to Drive format)"
-
+        operation_id = import_operations.create(
+            corpus_name, len(validated_paths) + len(local_files)
+        )
 
+        def run_import(progress):
+            return _import_sources(
+                operation_id,
+                corpus_name,
+                corpus_resource_name,
+                local_files,
+                force,
+                compress,
+                compact_logs,
+                progress,
+                {
+                    "paths": validated_paths,
+                    "local_files": len(local_files),
+                    "invalid_paths": invalid_paths,
+                    "conversions": conversions,
+                },
+            )
 
-            result = {
+        if background:
+            import_operations.submit(operation_id, run_import)
+            return {
                 "status": "success",
-                "message": f"Successfully added {import_result.imported_rag_files_count} file(s) to corpus '{corpus_name}'{conversion_msg}",
+                "message": f"Started importing {len(validated_paths) + len(local_files)} path(s) into corpus '{corpus_name}'. Use get_import_status with the operation_id to follow it.",
+                "operation_id": operation_id,
                 "corpus_name": corpus_name,
-                "files_added": import_result.imported_rag_files_count,
                 "paths": validated_paths,
+                "local_files": len(local_files),
                 "invalid_paths": invalid_paths,
                 "conversions": conversions,
             }
 
-            # Analyze logs if any .log file was added
-            log_files = [p for p in validated_paths if p.endswith('.log')]
-            log_analysis = []
-            for log_file in log_files:
-                log_content = get_log_content_by_filename(log_file, corpus_name, tool_context)
-                analysis = analyze_logs(
-                    corpus_name=corpus_name,
-                    tool_context=tool_context,
-                    log_content=log_content
-                )
-                log_analysis.append({"file": log_file, "analysis": analysis})
-            if log_analysis:
-                result["log_analysis"] = log_analysis
-
-            return result
+        result = import_operations.run(operation_id, run_import)
+        result["operation_id"] = operation_id
+        return result
 
     except Exception as e:
         return {
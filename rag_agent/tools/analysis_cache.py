@@ -0,0 +1,210 @@
+"""
+Content-addressed on-disk cache for analyze_logs results and plots.
+
+Each entry is a directory named after a hash of the log content, the analysis
+version and the analysis mode. It holds the summary as summary.json next to the
+plot PNGs. The total size of the cache is bounded, and the least recently used
+entries are evicted first (an entry's summary.json mtime is bumped on every hit).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+from ..config import ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_MAX_BYTES, ANALYSIS_CACHE_MAX_FILE_HASHES
+
+# Bump whenever the summary or the plots change for the same input, so stale
+# entries stop matching
+ANALYSIS_VERSION = 1
+_HASH_BLOCK_BYTES = 1 << 20
+SUMMARY_FILE = "summary.json"
+
+
+def _entry_size(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class AnalysisCache:
+    """
+    Log analysis results keyed by content hash, with size-bounded LRU eviction.
+    """
+
+    def __init__(
+        self,
+        root: str = ANALYSIS_CACHE_DIR,
+        max_bytes: int = ANALYSIS_CACHE_MAX_BYTES,
+        max_file_hashes: int = ANALYSIS_CACHE_MAX_FILE_HASHES,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_file_hashes = max_file_hashes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Content hash of the most recently hashed files by path, with the (size,
+        # mtime) it was computed for, so unchanged files are not re-read
+        self._file_hashes: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+
+    def content_hash(
+        self, log_content: Optional[Union[str, bytes]] = None, log_path: Optional[str] = None
+    ) -> str:
+        """
+        Hash a log given either as text, as bytes or as a file path.
+
+        Args:
+            log_content (Union[str, bytes]): The log content
+            log_path (str): Path to a log file, used instead of log_content
+
+        Returns:
+            str: A hex digest of the log bytes
+        """
+        if log_path is None:
+            if isinstance(log_content, str):
+                log_content = log_content.encode("utf-8")
+            return hashlib.blake2b(log_content, digest_size=20).hexdigest()
+
+        stat = os.stat(log_path)
+        path = os.path.abspath(log_path)
+        with self._lock:
+            known = self._file_hashes.get(path)
+            if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+                self._file_hashes.move_to_end(path)
+                return known[2]
+
+        # Hashed outside the lock; a concurrent hash of the same file is harmless
+        hasher = hashlib.blake2b(digest_size=20)
+        with open(log_path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b""):
+                hasher.update(block)
+        digest = hasher.hexdigest()
+        with self._lock:
+            self._file_hashes[path] = (stat.st_size, stat.st_mtime_ns, digest)
+            self._file_hashes.move_to_end(path)
+            while len(self._file_hashes) > self.max_file_hashes:
+                self._file_hashes.popitem(last=False)
+        return digest
+
+    def make_key(self, content_hash: str, mode: str) -> str:
+        """
+        Build the entry key for a content hash and an analysis mode.
+
+        Args:
+            content_hash (str): The result of content_hash()
+            mode (str): The analysis variant, e.g. "full" or "streaming"
+
+        Returns:
+            str: The entry key, also used as the entry directory name
+        """
+        return f"{content_hash}-v{ANALYSIS_VERSION}-{mode}"
+
+    def entry_dir(self, key: str) -> str:
+        """Return the directory of an entry, creating it if needed."""
+        path = os.path.join(self.root, key)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def get(self, key: str, need_plots: bool = True) -> Optional[dict]:
+        """
+        Return the cached summary for a key.
+
+        Args:
+            key (str): The entry key
+            need_plots (bool): Only count as a hit if every plot of the entry exists
+
+        Returns:
+            Optional[dict]: The cached summary, or None on a miss
+        """
+        summary_path = os.path.join(self.root, key, SUMMARY_FILE)
+        try:
+            with open(summary_path, "r", encoding="utf-8") as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+
+        plots = summary.get("plots", {})
+        if need_plots and (not plots or not all(os.path.exists(path) for path in plots.values())):
+            self._count(hit=False)
+            return None
+
+        os.utime(summary_path)
+        self._count(hit=True)
+        return summary
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, key: str, summary: dict) -> None:
+        """
+        Store the summary of an entry whose plots were written to entry_dir(key).
+
+        Args:
+            key (str): The entry key
+            summary (dict): The analysis summary, including plot paths
+        """
+        summary_path = os.path.join(self.entry_dir(key), SUMMARY_FILE)
+        tmp_path = f"{summary_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, default=str)
+        os.replace(tmp_path, summary_path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            if not os.path.isdir(self.root):
+                return
+            entries = []
+            for entry in os.scandir(self.root):
+                if not entry.is_dir():
+                    continue
+                summary_path = os.path.join(entry.path, SUMMARY_FILE)
+                # Entries without a summary are still being written; age them by the directory
+                stat_path = summary_path if os.path.exists(summary_path) else entry.path
+                entries.append((os.stat(stat_path).st_mtime, entry.path, _entry_size(entry.path)))
+
+            total = sum(size for _, _, size in entries)
+            for _, path, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                logging.info(f"Evicting log analysis cache entry {path}")
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._file_hashes.clear()
+
+    def stats(self) -> dict:
+        """Return entry count, size and hit statistics."""
+        entries = 0
+        size = 0
+        if os.path.isdir(self.root):
+            for entry in os.scandir(self.root):
+                if entry.is_dir():
+                    entries += 1
+                    size += _entry_size(entry.path)
+        with self._lock:
+            return {
+                "root": self.root,
+                "entries": entries,
+                "size_bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "file_hashes": len(self._file_hashes),
+            }
+
+
+analysis_cache = AnalysisCache()
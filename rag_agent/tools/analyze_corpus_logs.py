@@ -0,0 +1,297 @@
+"""
+Tool for analyzing every log file of a corpus as one map-reduce job.
+"""
+
+import fnmatch
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..backends import get_backend
+from ..backends.base import FileRecord
+from ..config import (
+    ANALYSIS_CACHE_ENABLED,
+    DEFAULT_QUERY_CONCURRENCY,
+    GCS_READ_CHUNK_BYTES,
+    LOG_ANALYSIS_MAX_INFLIGHT_BYTES,
+    LOG_ANALYSIS_WORKERS,
+    LOG_SEGMENT_BYTES,
+)
+from .analysis_cache import analysis_cache
+from .analyze_logs import PLOT_MODES, summarize_aggregates
+from .file_index import file_index
+from .log_analysis import LogAggregates, aggregate_log_bytes
+from .utils import check_corpus_exists, get_corpus_resource_name
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(replace_broken: bool = False) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is not None and replace_broken:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            # spawn rather than fork, see log_plots._get_pool()
+            _pool = ProcessPoolExecutor(
+                max_workers=LOG_ANALYSIS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+class _ByteBudget:
+    """Blocks producers while more than `limit` bytes are handed out."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size: int) -> int:
+        # Larger requests are capped so they wait for an empty budget, not forever
+        size = min(size, self.limit)
+        with self._condition:
+            self._condition.wait_for(lambda: self.used + size <= self.limit)
+            self.used += size
+        return size
+
+    def release(self, size: int) -> None:
+        with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+
+def _iter_segments(stream: BinaryIO, segment_bytes: int) -> Iterator[bytes]:
+    """Read a log stream into segments of about segment_bytes, cut at line boundaries."""
+    buffer = bytearray()
+    for block in iter(lambda: stream.read(min(GCS_READ_CHUNK_BYTES, segment_bytes)), b""):
+        buffer += block
+        if len(buffer) >= segment_bytes:
+            cut = buffer.rfind(b"\n") + 1
+            if cut:
+                yield bytes(buffer[:cut])
+                del buffer[:cut]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _submit_segment(segment: bytes, budget: _ByteBudget) -> Future:
+    # The segment counts against the budget until a worker has parsed it
+    size = budget.acquire(len(segment))
+    try:
+        try:
+            future = _get_pool().submit(aggregate_log_bytes, segment)
+        except BrokenProcessPool:
+            future = _get_pool(replace_broken=True).submit(aggregate_log_bytes, segment)
+    except BaseException:
+        budget.release(size)
+        raise
+    future.add_done_callback(lambda _: budget.release(size))
+    return future
+
+
+def _stream_file(record: FileRecord, segment_bytes: int, budget: _ByteBudget) -> Tuple[List[Future], int]:
+    """Stream one file into the process pool; returns its parse futures and size."""
+    futures: List[Future] = []
+    size = 0
+    try:
+        with get_backend().open_file(record.name, source_uri=record.source_uri) as stream:
+            for segment in _iter_segments(stream, segment_bytes):
+                size += len(segment)
+                futures.append(_submit_segment(segment, budget))
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return futures, size
+
+
+def analyze_corpus_logs(
+    corpus_name: str,
+    tool_context: ToolContext,
+    file_pattern: str = "*.log",
+    plot_mode: str = "sync",
+    max_concurrency: int = DEFAULT_QUERY_CONCURRENCY,
+) -> dict:
+    """
+    Analyze all log files of a corpus together and plot corpus-wide error statistics.
+
+    The result is cached by the names and update times of the files, so a cached
+    analysis is returned without downloading anything. Otherwise files are streamed
+    concurrently and cut into segments that worker processes parse into partial
+    aggregates, which are then merged into a single summary and plot set. Downloads
+    pause while LOG_ANALYSIS_MAX_INFLIGHT_BYTES are waiting to be parsed.
+
+    Args:
+        corpus_name (str): The name of the corpus whose log files to analyze
+        tool_context (ToolContext): The tool context
+        file_pattern (str): Glob matched against file display names, e.g. "*.log"
+        plot_mode (str): "sync", "background" or "none", as for analyze_logs
+        max_concurrency (int): The maximum number of files downloaded at once
+
+    Returns:
+        dict: The corpus-wide summary, plot paths and per-file status
+    """
+    try:
+        if plot_mode not in PLOT_MODES:
+            return {
+                "status": "error",
+                "message": f"Invalid plot_mode '{plot_mode}'. Use one of: {', '.join(PLOT_MODES)}",
+                "corpus_name": corpus_name,
+            }
+        if not check_corpus_exists(corpus_name, tool_context):
+            return {
+                "status": "error",
+                "message": f"Corpus '{corpus_name}' does not exist",
+                "corpus_name": corpus_name,
+            }
+
+        started = time.perf_counter()
+        corpus_resource_name = get_corpus_resource_name(corpus_name)
+        log_files = [
+            record
+            for record in file_index.files(corpus_resource_name)
+            if fnmatch.fnmatch(record.display_name or record.name, file_pattern)
+        ]
+        if not log_files:
+            return {
+                "status": "warning",
+                "message": f"No files matching '{file_pattern}' in corpus '{corpus_name}'",
+                "corpus_name": corpus_name,
+            }
+
+        # The corpus-wide result is cached by the identity and version of its files
+        cache_key = None
+        if ANALYSIS_CACHE_ENABLED:
+            corpus_hash = hashlib.blake2b(
+                "\n".join(sorted(f"{record.name}@{record.update_time}" for record in log_files)).encode("utf-8"),
+                digest_size=20,
+            ).hexdigest()
+            cache_key = analysis_cache.make_key(corpus_hash, "corpus")
+            cached = analysis_cache.get(cache_key, need_plots=plot_mode != "none")
+            if cached is not None:
+                print("Returning cached corpus analysis:", cache_key)
+                return {
+                    "status": "success",
+                    "summary": cached,
+                    "plot_mode": plot_mode,
+                    "plots_pending": False,
+                    "cached": True,
+                    "corpus_name": corpus_name,
+                    "files_analyzed": len(log_files),
+                    "files_failed": 0,
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+                }
+
+        print(f"Analyzing {len(log_files)} log files with {LOG_ANALYSIS_WORKERS} workers...")
+        # Keyed by resource name: display names are not unique within a corpus
+        per_file: Dict[str, dict] = {}
+        # Parse futures by file; a file's segments are merged once all of them are done
+        segment_futures: Dict[str, List[Future]] = {}
+        workers = max(1, min(max_concurrency, len(log_files)))
+        budget = _ByteBudget(LOG_ANALYSIS_MAX_INFLIGHT_BYTES)
+        # Each download buffers up to two segments, so keep those within the budget too
+        segment_bytes = max(1, min(LOG_SEGMENT_BYTES, LOG_ANALYSIS_MAX_INFLIGHT_BYTES // (2 * workers)))
+        with ThreadPoolExecutor(max_workers=workers) as fetcher:
+            fetches = {
+                fetcher.submit(_stream_file, record, segment_bytes, budget): record
+                for record in log_files
+            }
+            for future in as_completed(fetches):
+                record = fetches[future]
+                per_file[record.name] = {"display_name": record.display_name}
+                try:
+                    futures, size = future.result()
+                except Exception as e:
+                    logging.error(f"Error fetching log file {record.name}: {str(e)}")
+                    per_file[record.name].update(status="error", message=str(e))
+                    # A partial result must not be cached as the corpus-wide one
+                    cache_key = None
+                    continue
+                segment_futures[record.name] = futures
+                per_file[record.name].update(status="pending", bytes=size)
+
+        aggregates = LogAggregates()
+        for file_name, futures in segment_futures.items():
+            try:
+                partials = [LogAggregates.from_dict(future.result()) for future in futures]
+            except Exception as e:
+                logging.error(f"Error parsing log file {file_name}: {str(e)}")
+                per_file[file_name].update(status="error", message=str(e))
+                # A partial result must not be cached as the corpus-wide one
+                cache_key = None
+                continue
+            file_aggregates = LogAggregates()
+            for partial in partials:
+                file_aggregates.merge(partial)
+            aggregates.merge(file_aggregates)
+            per_file[file_name].update(
+                status="success",
+                lines=file_aggregates.total_lines,
+                errors=file_aggregates.total_errors,
+            )
+
+        analyzed = [name for name, stats in per_file.items() if stats["status"] == "success"]
+        if not analyzed:
+            return {
+                "status": "error",
+                "message": f"None of the {len(log_files)} log files could be analyzed",
+                "corpus_name": corpus_name,
+                "files": per_file,
+            }
+
+        prefix = (
+            os.path.join(analysis_cache.entry_dir(cache_key), "log")
+            if cache_key is not None
+            else f"{corpus_name}_corpus"
+        )
+        try:
+            result = summarize_aggregates(aggregates, prefix, corpus_name, plot_mode, cache_key)
+        except Exception as e:
+            # The merged numbers are the point of the map-reduce; don't lose them to the plots
+            logging.error(f"Error plotting corpus logs of {corpus_name}: {str(e)}")
+            result = {
+                "status": "success",
+                "summary": {
+                    "total_errors": aggregates.total_errors,
+                    "error_types": aggregates.error_distribution().to_dict(),
+                    "plots": {},
+                },
+                "plot_mode": plot_mode,
+                "plots_pending": False,
+                "plot_errors": {"all": f"error: {str(e)}"},
+                "cached": False,
+                "corpus_name": corpus_name,
+            }
+        result.update(
+            files_analyzed=len(analyzed),
+            files_failed=len(per_file) - len(analyzed),
+            files=per_file,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+        return result
+
+    except Exception as e:
+        error_msg = f"Error analyzing corpus logs: {str(e)}"
+        logging.error(error_msg)
+        return {
+            "status": "error",
+            "message": error_msg,
+            "corpus_name": corpus_name,
+        }
@@ -1,23 +1,192 @@
 import os
-import io
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import re
-from typing import Optional
-import matplotlib.dates as mdates
+from typing import List, Optional
 
 from google.adk.tools.tool_context import ToolContext
 
+from ..config import ANALYSIS_CACHE_ENABLED
+from .analysis_cache import analysis_cache
+from .log_checkpoints import log_checkpoints
+from .log_analysis import (
+    DAY_NAMES,
+    LogAggregates,
+    bin_event_counts,
+    hashable_log_content,
+    iter_log_chunks,
+    open_log_source,
+    read_log_frame,
+    select_annotations,
+)
+from .log_plots import PlotJob, plot_status, render_plots
+
+
+PLOT_MODES = ("sync", "background", "none")
+
+
+def _finish_analysis(
+        total_errors: int,
+        error_distribution: pd.Series,
+        jobs: List[PlotJob],
+        plot_mode: str,
+        corpus_name: str,
+        cache_key: Optional[str] = None
+) -> dict:
+    """
+    Render (or schedule) the plot jobs according to plot_mode, build the tool result
+    and store its summary in the analysis cache under cache_key.
+    """
+    plot_errors = {}
+    if plot_mode == "none":
+        plots = {}
+        print("Skipping plot rendering (plot_mode='none').")
+    else:
+        plots = render_plots(jobs, background=plot_mode == "background")
+        if plot_mode == "background":
+            print("Plots submitted for background rendering:", list(plots.values()))
+        else:
+            # A plot that failed to render leaves the summary and the other plots intact
+            status = plot_status(plots.values())
+            plot_errors = {kind: status[path] for kind, path in plots.items() if status[path] != "done"}
+            plots = {kind: path for kind, path in plots.items() if kind not in plot_errors}
+            print("Plots generated:", len(plots), "failed:", len(plot_errors))
+
+    summary = {
+        "total_errors": int(total_errors),
+        "error_types": error_distribution.to_dict(),
+        "plots": plots
+    }
+    if cache_key is not None:
+        analysis_cache.put(cache_key, summary)
+    return {
+        "status": "success",
+        "summary": summary,
+        "plot_mode": plot_mode,
+        "plots_pending": plot_mode == "background",
+        "cached": False,
+        "corpus_name": corpus_name,
+        **({"plot_errors": plot_errors} if plot_errors else {}),
+    }
+
+
+def summarize_aggregates(
+        aggregates: LogAggregates,
+        prefix: str,
+        corpus_name: str,
+        plot_mode: str,
+        cache_key: Optional[str] = None
+) -> dict:
+    """
+    Build the analyze_logs result (summary and plots) from running aggregates.
+    """
+    if aggregates.total_lines == 0:
+        print("Log file is empty or has invalid format.")
+        return {
+            "status": "error",
+            "message": "Log file is empty or has invalid format.",
+            "corpus_name": corpus_name,
+        }
+
+    print("Number of error rows:", aggregates.total_errors)
+    error_distribution = aggregates.error_distribution()
+    jobs: List[PlotJob] = [
+        ("error_trends", f'{prefix}_error_trends.png', (aggregates.error_trends(),)),
+        ("error_distribution", f'{prefix}_error_distribution.png', (error_distribution,)),
+        ("error_heatmap", f'{prefix}_error_heatmap.png', (aggregates.error_heatmap(),)),
+        ("unauth_users", f'{prefix}_unauth_users.png', (aggregates.unauth_users(),)),
+        # Per-minute counts re-binned into adaptive time buckets
+        ("timeline", f'{prefix}_timeline.png',
+         bin_event_counts(aggregates.timeline(), min_width="1min")),
+    ]
+    if aggregates.unauthorized_count:
+        counts, width = bin_event_counts(aggregates.unauthorized_timeline(), min_width="1min")
+        jobs.append((
+            "unauthorized_timeline",
+            f'{prefix}_unauthorized_timeline.png',
+            (counts, width, *aggregates.unauthorized_annotations()),
+        ))
+    return _finish_analysis(
+        aggregates.total_errors, error_distribution, jobs, plot_mode, corpus_name, cache_key
+    )
+
+
+def _analyze_logs_streaming(
+        log_source,
+        prefix: str,
+        corpus_name: str,
+        plot_mode: str,
+        cache_key: Optional[str] = None
+) -> dict:
+    """
+    Analyze a log chunk by chunk, keeping only running aggregates in memory.
+    """
+    aggregates = LogAggregates()
+    for chunk in iter_log_chunks(log_source):
+        aggregates.update(chunk)
+        print("Processed lines:", aggregates.total_lines)
+    return summarize_aggregates(aggregates, prefix, corpus_name, plot_mode, cache_key)
+
+
+def _analyze_logs_incremental(log_path: str, corpus_name: str, plot_mode: str) -> dict:
+    """
+    Analyze an append-only log file, parsing only what was appended since the last run.
+    """
+    aggregates, run = log_checkpoints.analyze(log_path)
+    print("Incremental run:", run)
+    prefix = os.path.join(log_checkpoints.plot_dir(log_path), "log")
+    result = summarize_aggregates(aggregates, prefix, corpus_name, plot_mode)
+    if result["status"] == "success":
+        result["incremental"] = run
+    return result
+
 
 def analyze_logs(
         corpus_name: str,
         tool_context: Optional[ToolContext] = None,
-        log_content: Optional[str] = None
+        log_content: Optional[str] = None,
+        log_path: Optional[str] = None,
+        streaming: bool = False,
+        plot_mode: str = "sync",
+        use_cache: bool = True,
+        incremental: bool = False
 ) -> dict:
+    """
+    Analyze a pipe-delimited log (timestamp|level|message) and plot error statistics.
+
+    Args:
+        corpus_name (str): The name of the corpus the log belongs to, used to prefix plot
+                           files when the analysis cache is not used
+        tool_context (ToolContext): The tool context
+        log_content (str): The log content. Also accepted: bytes, a binary or text stream
+                           (e.g. from open_log_file), an iterator of bytes/str chunks, or
+                           the dict returned by get_log_content_by_filename
+        log_path (str): Path to a local log file, used instead of log_content
+        streaming (bool): Read the log in fixed-size chunks and keep only running
+                          aggregates, so memory is bounded by the chunk size
+        plot_mode (str): "sync" renders the plots before returning, "background" returns
+                         the summary and plot paths immediately while the plots render
+                         in worker processes, "none" returns the summary only
+        use_cache (bool): Return the cached summary and plots when the same log content
+                          was analyzed before, and cache the result otherwise
+        incremental (bool): For an append-only log_path, resume from the file's stored
+                            checkpoint and parse only the lines appended since the
+                            last run (implies streaming; the content cache is not used)
+
+    Returns:
+        dict: Summary statistics and the paths of the generated plots
+    """
     print("Starting analyze_logs")
-    if log_content is not None:
-        log_stream = io.StringIO(log_content)
+    if plot_mode not in PLOT_MODES:
+        return {
+            "status": "error",
+            "message": f"Invalid plot_mode '{plot_mode}'. Use one of: {', '.join(PLOT_MODES)}",
+            "corpus_name": corpus_name,
+        }
+
+    if log_path is not None:
+        log_stream = log_path
+        prefix = corpus_name or "corpus_log"
+        print("Log path provided, prefix set to:", prefix)
+    elif log_content is not None:
         prefix = corpus_name or "corpus_log"
         print("Log content provided, prefix set to:", prefix)
     else:
@@ -29,14 +198,47 @@ def analyze_logs(
         }
 
     try:
+        if log_path is None:
+            # Streams, chunk iterators and bytes are parsed as they are read, never copied to a str
+            log_stream = open_log_source(log_content)
+
+        if incremental:
+            if log_path is None:
+                return {
+                    "status": "error",
+                    "message": "Incremental analysis requires log_path.",
+                    "corpus_name": corpus_name,
+                }
+            print("Analyzing log incrementally...")
+            return _analyze_logs_incremental(log_path, corpus_name, plot_mode)
+
+        cache_key = None
+        # Streams can only be read once, so they are analyzed without the content cache
+        hashable_content = hashable_log_content(log_content) if log_path is None else None
+        cacheable = log_path is not None or hashable_content is not None
+        if use_cache and ANALYSIS_CACHE_ENABLED and cacheable:
+            content_hash = analysis_cache.content_hash(log_content=hashable_content, log_path=log_path)
+            cache_key = analysis_cache.make_key(content_hash, "streaming" if streaming else "full")
+            cached = analysis_cache.get(cache_key, need_plots=plot_mode != "none")
+            if cached is not None:
+                print("Returning cached analysis:", cache_key)
+                return {
+                    "status": "success",
+                    "summary": cached,
+                    "plot_mode": plot_mode,
+                    "plots_pending": False,
+                    "cached": True,
+                    "corpus_name": corpus_name,
+                }
+            # Plots go into the cache entry rather than the working directory
+            prefix = os.path.join(analysis_cache.entry_dir(cache_key), "log")
+
+        if streaming:
+            print("Reading log content in chunks...")
+            return _analyze_logs_streaming(log_stream, prefix, corpus_name, plot_mode, cache_key)
+
         print("Reading log content into DataFrame...")
-        log_df = pd.read_csv(
-            log_stream,
-            sep='|',
-            names=['timestamp', 'level', 'message'],
-            parse_dates=['timestamp'],
-            engine='python'
-        )
+        log_df = read_log_frame(log_stream)
         print("DataFrame shape:", log_df.shape)
         if log_df.empty or not {'timestamp', 'level', 'message'}.issubset(log_df.columns):
             print("Log file is empty or has invalid format.")
@@ -46,140 +248,63 @@ def analyze_logs(
                 "corpus_name": corpus_name,
             }
 
+        # The ERROR mask is computed once; the plots below share the filtered rows
         errors = log_df[log_df['level'] == 'ERROR']
+        timed_errors = errors[errors['hour'] >= 0]
         print("Number of error rows:", errors.shape[0])
 
         # Error Trends Over Time
-        print("Generating error trends plot...")
-        error_trends = errors.groupby(errors['timestamp'].dt.hour).size()
+        error_trends = timed_errors.groupby('hour').size()
         print("Error trends data:", error_trends)
-        error_trends_path = f'{prefix}_error_trends.png'
-        plt.figure(figsize=(10, 5))
-        error_trends.plot(kind='line', marker='o', color='red')
-        plt.title('Error Trends by Hour')
-        plt.xlabel('Hour of Day')
-        plt.ylabel('Number of Errors')
-        plt.grid()
-        plt.tight_layout()
-        plt.savefig(error_trends_path)
-        plt.close()
-        print("Saved error trends plot to", error_trends_path)
 
         # Error Distribution by Type
-        print("Extracting error types...")
-        log_df['error_type'] = log_df['message'].str.extract(r'(ERROR_\w+)')
         error_distribution = log_df['error_type'].value_counts()
+        error_distribution = error_distribution[error_distribution > 0]
         print("Error distribution data:", error_distribution)
-        error_dist_path = f'{prefix}_error_distribution.png'
-        plt.figure(figsize=(8, 8))
-        error_distribution.plot(kind='pie', autopct='%1.1f%%', startangle=90, colormap='Reds')
-        plt.title('Error Distribution by Type')
-        plt.ylabel('')
-        plt.tight_layout()
-        plt.savefig(error_dist_path)
-        plt.close()
-        print("Saved error distribution plot to", error_dist_path)
 
         # Heatmap of Errors by Day and Hour
-        print("Generating error heatmap...")
-        log_df['day'] = log_df['timestamp'].dt.day_name()
-        log_df['hour'] = log_df['timestamp'].dt.hour
-        heatmap_data = log_df[log_df['level'] == 'ERROR'].pivot_table(
+        heatmap_data = timed_errors.pivot_table(
             index='day', columns='hour', aggfunc='size', fill_value=0
         )
+        heatmap_data.index = [DAY_NAMES[day] for day in heatmap_data.index]
         print("Heatmap data shape:", heatmap_data.shape)
-        heatmap_path = f'{prefix}_error_heatmap.png'
-        plt.figure(figsize=(12, 6))
-        sns.heatmap(heatmap_data, cmap='Reds', annot=True, fmt='d')
-        plt.title('Error Heatmap by Day and Hour')
-        plt.xlabel('Hour of Day')
-        plt.ylabel('Day of Week')
-        plt.tight_layout()
-        plt.savefig(heatmap_path)
-        plt.close()
-        print("Saved heatmap plot to", heatmap_path)
 
         # Unauthenticated Users Analysis
-        print("Analyzing unauthenticated users...")
-        unauth_pattern = r'Failed login.*user (.*@.*)'
-        unauth_users = log_df['message'].str.extractall(unauth_pattern)[0].value_counts()
+        unauth_users = log_df['failed_login_user'].value_counts()
         print("Unauthenticated users data:", unauth_users)
-        unauth_users_path = f'{prefix}_unauth_users.png'
-        plt.figure(figsize=(10, 6))
-        unauth_users.plot(kind='bar', color='orange')
-        plt.title('Unauthenticated Users')
-        plt.xlabel('User')
-        plt.ylabel('Number of Failed Logins')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.savefig(unauth_users_path)
-        plt.close()
-        print("Saved unauthenticated users plot to", unauth_users_path)
-
-        # Timeline Analysis (all events)
-        print("Generating timeline plot...")
-        timeline_path = f'{prefix}_timeline.png'
-        plt.figure(figsize=(15, 5))
-        plt.plot(log_df['timestamp'], [1] * len(log_df), marker='o', linestyle='', color='blue')
-        plt.yticks([])
-        plt.xlabel('Time')
-        plt.title('Log Event Timeline')
-        plt.grid(True)
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.savefig(timeline_path)
-        plt.close()
-        print("Saved timeline plot to", timeline_path)
-
-        # Unauthorized Events Timeline
-        print("Generating unauthorized events timeline...")
-        unauthorized_mask = log_df['message'].str.contains('Blocked login|Login denied', case=False, na=False)
-        unauthorized_events = log_df[unauthorized_mask]
-        unauthorized_timeline_path = f'{prefix}_unauthorized_timeline.png'
+
+        jobs: List[PlotJob] = [
+            ("error_trends", f'{prefix}_error_trends.png', (error_trends,)),
+            ("error_distribution", f'{prefix}_error_distribution.png', (error_distribution,)),
+            ("error_heatmap", f'{prefix}_error_heatmap.png', (heatmap_data,)),
+            ("unauth_users", f'{prefix}_unauth_users.png', (unauth_users,)),
+            # Timeline Analysis (all events), binned into adaptive time buckets
+            ("timeline", f'{prefix}_timeline.png', bin_event_counts(log_df['timestamp'].value_counts())),
+        ]
+
+        # Unauthorized Events Timeline: density plus a bounded number of labelled events
+        unauthorized_events = log_df[log_df['unauthorized'] & log_df['timestamp'].notna()]
         if not unauthorized_events.empty:
             print("Unauthorized events found:", unauthorized_events.shape[0])
-            plt.figure(figsize=(15, 3))
-            plt.plot(unauthorized_events['timestamp'], [1]*len(unauthorized_events), 'ro', label='Unauthorized Event')
-            for idx, row in unauthorized_events.iterrows():
-                plt.text(row['timestamp'], 1.02, row['message'][:40], rotation=45, fontsize=8, ha='left', va='bottom')
-            plt.yticks([])
-            plt.xlabel('Time')
-            plt.title('Unauthorized Events Timeline')
-            plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d\n%H:%M:%S'))
-            plt.grid(True, axis='x')
-            plt.tight_layout()
-            plt.savefig(unauthorized_timeline_path)
-            plt.close()
-            print("Saved unauthorized events timeline plot to", unauthorized_timeline_path)
+            counts, width = bin_event_counts(unauthorized_events['timestamp'].value_counts())
+            annotated_times, annotated_labels = select_annotations(
+                unauthorized_events['timestamp'], unauthorized_events['message'].str[:40]
+            )
+            jobs.append((
+                "unauthorized_timeline",
+                f'{prefix}_unauthorized_timeline.png',
+                (counts, width, annotated_times, annotated_labels),
+            ))
         else:
             print("No unauthorized events found.")
-            unauthorized_timeline_path = None
-
-        # Collect plot paths
-        plots = {
-            "error_trends": error_trends_path,
-            "error_distribution": error_dist_path,
-            "error_heatmap": heatmap_path,
-            "unauth_users": unauth_users_path,
-            "timeline": timeline_path
-        }
-        if unauthorized_timeline_path:
-            plots["unauthorized_timeline"] = unauthorized_timeline_path
 
-        print("All plots generated successfully.")
-        return {
-            "status": "success",
-            "summary": {
-                "total_errors": int(errors.shape[0]),
-                "error_types": error_distribution.to_dict(),
-                "plots": plots
-            },
-            "corpus_name": corpus_name,
-        }
+        return _finish_analysis(
+            errors.shape[0], error_distribution, jobs, plot_mode, corpus_name, cache_key
+        )
     except Exception as e:
         print("Exception occurred:", str(e))
         return {
             "status": "error",
             "message": f"Exception occurred: {str(e)}",
             "corpus_name": corpus_name,
-        }
\ No newline at end of file
+        }
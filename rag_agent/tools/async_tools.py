@@ -0,0 +1,76 @@
+"""
+Asyncio-native variants of the RAG tools.
+
+Each variant runs its synchronous counterpart on one shared, bounded thread pool,
+so blocking backend calls (e.g. a slow import_files) never stall the ADK event
+loop and concurrent sessions overlap their I/O. The variants keep the name,
+signature and docstring of the synchronous tool they wrap.
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from ..config import ASYNC_TOOL_MAX_WORKERS
+from .add_data import add_data as _add_data
+from .analyze_corpus_logs import analyze_corpus_logs as _analyze_corpus_logs
+from .analyze_logs import analyze_logs as _analyze_logs
+from .create_corpus import create_corpus as _create_corpus
+from .delete_corpus import delete_corpus as _delete_corpus
+from .delete_document import delete_document as _delete_document
+from .get_corpus_info import get_corpus_info as _get_corpus_info
+from .get_import_status import get_import_status as _get_import_status
+from .get_log_content_by_filename import get_log_content_by_filename as _get_log_content_by_filename
+from .get_log_template_lines import get_log_template_lines as _get_log_template_lines
+from .get_plot_status import get_plot_status as _get_plot_status
+from .list_corpora import list_corpora as _list_corpora
+from .read_corpus_file import read_corpus_file as _read_corpus_file
+from .rag_query import rag_query as _rag_query
+from .rag_query_batch import rag_query_batch as _rag_query_batch
+from .rag_query_multi import rag_query_multi as _rag_query_multi
+
+_executor = ThreadPoolExecutor(
+    max_workers=ASYNC_TOOL_MAX_WORKERS, thread_name_prefix="rag-tool"
+)
+
+
+def run_in_tool_executor(func):
+    """
+    Turn a blocking tool into a coroutine function that runs on the shared executor.
+
+    Args:
+        func: The synchronous tool function
+
+    Returns:
+        An async function with the same name, signature and docstring
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Carry context variables (e.g. tracing spans) over to the worker thread
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            _executor, functools.partial(context.run, func, *args, **kwargs)
+        )
+
+    return wrapper
+
+
+rag_query = run_in_tool_executor(_rag_query)
+rag_query_batch = run_in_tool_executor(_rag_query_batch)
+rag_query_multi = run_in_tool_executor(_rag_query_multi)
+list_corpora = run_in_tool_executor(_list_corpora)
+create_corpus = run_in_tool_executor(_create_corpus)
+add_data = run_in_tool_executor(_add_data)
+get_corpus_info = run_in_tool_executor(_get_corpus_info)
+get_import_status = run_in_tool_executor(_get_import_status)
+delete_corpus = run_in_tool_executor(_delete_corpus)
+delete_document = run_in_tool_executor(_delete_document)
+analyze_logs = run_in_tool_executor(_analyze_logs)
+analyze_corpus_logs = run_in_tool_executor(_analyze_corpus_logs)
+get_log_content_by_filename = run_in_tool_executor(_get_log_content_by_filename)
+read_corpus_file = run_in_tool_executor(_read_corpus_file)
+get_log_template_lines = run_in_tool_executor(_get_log_template_lines)
+get_plot_status = run_in_tool_executor(_get_plot_status)
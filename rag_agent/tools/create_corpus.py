@@ -5,12 +5,12 @@ Tool for creating a new Vertex AI RAG corpus.
 import re
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
 
+from ..backends import get_backend
 from ..config import (
     DEFAULT_EMBEDDING_MODEL,
 )
-from .utils import check_corpus_exists
+from .utils import check_corpus_exists, invalidate_corpus_cache
 
 
 def create_corpus(
@@ -41,24 +41,18 @@ def create_corpus(
         print("I'm here in the create_corpus function")
         display_name = re.sub(r"[^a-zA-Z0-9_-]", "_", corpus_name)
 
-        # Configure embedding model
-        embedding_model_config = rag.RagEmbeddingModelConfig(
-            vertex_prediction_endpoint=rag.VertexPredictionEndpoint(
-                publisher_model=DEFAULT_EMBEDDING_MODEL
-            )
-
-        )
         print("Using default embedding model:", DEFAULT_EMBEDDING_MODEL)
 
         # Create the corpus
-        rag_corpus = rag.create_corpus(
+        rag_corpus = get_backend().create_corpus(
             display_name=display_name,
-            backend_config=rag.RagVectorDbConfig(
-                rag_embedding_model_config=embedding_model_config
-            ),
+            embedding_model=DEFAULT_EMBEDDING_MODEL,
         )
         print("Corpus created successfully:", rag_corpus.name)
 
+        # The cached corpus listing no longer reflects the new corpus
+        invalidate_corpus_cache()
+
         # Update state to track corpus existence
         tool_context.state[f"corpus_exists_{corpus_name}"] = True
 
@@ -3,9 +3,15 @@ Tool for deleting a Vertex AI RAG corpus when it's no longer needed.
 """
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
 
-from .utils import check_corpus_exists, get_corpus_resource_name
+from ..backends import get_backend
+from .ingestion_manifest import ingestion_manifest
+from .utils import (
+    check_corpus_exists,
+    get_corpus_resource_name,
+    invalidate_corpus_cache,
+    invalidate_corpus_data,
+)
 
 
 def delete_corpus(
@@ -47,7 +53,12 @@ def delete_corpus(
         corpus_resource_name = get_corpus_resource_name(corpus_name)
 
         # Delete the corpus
-        rag.delete_corpus(corpus_resource_name)
+        get_backend().delete_corpus(corpus_resource_name)
+
+        # The cached corpus listing still contains the deleted corpus
+        invalidate_corpus_cache()
+        invalidate_corpus_data(corpus_resource_name)
+        ingestion_manifest.drop_corpus(corpus_resource_name)
 
         # Remove from state by setting to False
         state_key = f"corpus_exists_{corpus_name}"
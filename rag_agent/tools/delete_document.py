@@ -3,9 +3,14 @@ Tool for deleting a specific document from a Vertex AI RAG corpus.
 """
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
 
-from .utils import check_corpus_exists, get_corpus_resource_name
+from ..backends import get_backend
+from .file_index import file_index
+from .utils import (
+    check_corpus_exists,
+    get_corpus_resource_name,
+    invalidate_corpus_data,
+)
 
 
 def delete_document(
@@ -41,7 +46,13 @@ def delete_document(
 
         # Delete the document
         rag_file_path = f"{corpus_resource_name}/ragFiles/{document_id}"
-        rag.delete_file(rag_file_path)
+        record = file_index.lookup(corpus_resource_name, rag_file_path)
+        get_backend().delete_file(
+            rag_file_path, source_uri=record.source_uri if record is not None else None
+        )
+
+        # Cached query results for this corpus may reference the deleted document
+        invalidate_corpus_data(corpus_resource_name)
 
         return {
             "status": "success",
@@ -0,0 +1,238 @@
+"""
+Local copies of corpus files with a line-offset index, for random-access reads.
+
+The first read of a corpus file streams it from the backend into the cache
+directory and records the byte offset of every line start in a NumPy array next to
+it. Later reads seek straight to any line or byte range of the local copy. Copies
+are keyed on the file's resource name and update time, so a re-imported file is
+fetched again. Whole corpora can be dropped through invalidate_corpus_data().
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..backends import get_backend
+from ..backends.base import FileRecord
+from ..config import FILE_CACHE_DIR, FILE_CACHE_MAX_BYTES, GCS_READ_CHUNK_BYTES
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class CachedFile:
+    """
+    A local copy of a corpus file and the start offsets of its lines.
+
+    offsets has one entry per line plus a final entry equal to the file size, so
+    line i spans bytes [offsets[i], offsets[i + 1]).
+    """
+
+    def __init__(self, path: str, offsets: np.ndarray):
+        self.path = path
+        self.offsets = offsets
+
+    @property
+    def line_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def size(self) -> int:
+        return int(self.offsets[-1])
+
+    def read_bytes(self, start: int, end: int) -> bytes:
+        """Read bytes [start, end) of the file."""
+        start = max(0, min(start, self.size))
+        end = max(start, min(end, self.size))
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def read_lines(self, start: int, end: int) -> List[str]:
+        """Read lines [start, end) (0-based) without their line endings."""
+        start = max(0, min(start, self.line_count))
+        end = max(start, min(end, self.line_count))
+        data = self.read_bytes(int(self.offsets[start]), int(self.offsets[end]))
+        return data.decode("utf-8", errors="replace").splitlines()
+
+
+class LocalFileCache:
+    """
+    Size-bounded directory of CachedFile copies, grouped by corpus.
+    """
+
+    def __init__(self, root: str = FILE_CACHE_DIR, max_bytes: int = FILE_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Per-file download locks and the number of callers holding or waiting on
+        # each; a lock is dropped once nobody uses it, so the map stays small
+        self._file_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+
+    def _corpus_dir(self, corpus_resource_name: str) -> str:
+        return os.path.join(self.root, _digest(corpus_resource_name))
+
+    def _paths(self, record: FileRecord) -> Tuple[str, str]:
+        corpus_resource_name = record.name.split("/ragFiles/")[0]
+        base = os.path.join(
+            self._corpus_dir(corpus_resource_name),
+            _digest(f"{record.name}@{record.update_time}"),
+        )
+        return f"{base}.data", f"{base}.lines.npy"
+
+    @contextmanager
+    def _file_lock(self, key: str) -> Iterator[None]:
+        """Hold the download lock of one file; other files are not blocked meanwhile."""
+        with self._lock:
+            lock, users = self._file_locks.get(key, (None, 0))
+            lock = lock or threading.Lock()
+            self._file_locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, users = self._file_locks[key]
+                if users == 1:
+                    del self._file_locks[key]
+                else:
+                    self._file_locks[key] = (lock, users - 1)
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, record: FileRecord) -> CachedFile:
+        """
+        Return the local copy of a file, downloading and indexing it on first use.
+
+        Args:
+            record (FileRecord): The file, as listed by the backend
+
+        Returns:
+            CachedFile: The local copy and its line index
+        """
+        data_path, index_path = self._paths(record)
+        # One download per file at a time
+        with self._file_lock(index_path):
+            if os.path.exists(index_path):
+                self._count(hit=True)
+                os.utime(index_path)
+                return CachedFile(data_path, np.load(index_path, mmap_mode="r"))
+            self._count(hit=False)
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+            offsets = self._download(record, data_path)
+            tmp_index = f"{index_path}.tmp.npy"
+            np.save(tmp_index, offsets)
+            # The index is written last, so its presence marks a complete copy
+            os.replace(tmp_index, index_path)
+        self.evict(keep=index_path[:-len(".lines.npy")])
+        return CachedFile(data_path, np.load(index_path, mmap_mode="r"))
+
+    def _download(self, record: FileRecord, data_path: str) -> np.ndarray:
+        """Stream a file to data_path and return its line start offsets."""
+        line_starts = [np.zeros(1, dtype=np.int64)]
+        size = 0
+        last_byte = b"\n"
+        tmp_path = f"{data_path}.tmp"
+        with get_backend().open_file(record.name, source_uri=record.source_uri) as source, open(
+            tmp_path, "wb"
+        ) as target:
+            while True:
+                block = source.read(GCS_READ_CHUNK_BYTES)
+                if not block:
+                    break
+                target.write(block)
+                newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n"))
+                line_starts.append(newlines.astype(np.int64) + size + 1)
+                size += len(block)
+                last_byte = block[-1:]
+        os.replace(tmp_path, data_path)
+
+        offsets = np.concatenate(line_starts)
+        if last_byte != b"\n":
+            # The last line has no trailing newline; close it at the end of the file
+            offsets = np.append(offsets, size)
+        return offsets
+
+    def invalidate_corpus(self, corpus_resource_name: str) -> int:
+        """
+        Drop the local copies of every file of a corpus.
+
+        Returns:
+            int: The number of files dropped
+        """
+        corpus_dir = self._corpus_dir(corpus_resource_name)
+        with self._lock:
+            if not os.path.isdir(corpus_dir):
+                return 0
+            dropped = sum(1 for name in os.listdir(corpus_dir) if name.endswith(".lines.npy"))
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+        return dropped
+
+    def _entries(self) -> List[Tuple[float, str, int]]:
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for corpus_entry in os.scandir(self.root):
+            if not corpus_entry.is_dir():
+                continue
+            for entry in os.scandir(corpus_entry.path):
+                if entry.name.endswith(".lines.npy"):
+                    base = entry.path[:-len(".lines.npy")]
+                    size = entry.stat().st_size
+                    if os.path.exists(f"{base}.data"):
+                        size += os.path.getsize(f"{base}.data")
+                    entries.append((entry.stat().st_mtime, base, size))
+        return entries
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Delete least recently used copies until the cache fits in max_bytes.
+
+        Args:
+            keep (str): Path prefix of a copy that must survive (the one just fetched)
+        """
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, _, size in entries)
+            for _, base, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if base == keep:
+                    continue
+                logging.info(f"Evicting cached file copy {base}")
+                for path in (f"{base}.lines.npy", f"{base}.data"):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+
+    def stats(self) -> dict:
+        """Return file count, size and hit statistics."""
+        with self._lock:
+            entries = self._entries()
+            return {
+                "root": self.root,
+                "files": len(entries),
+                "size_bytes": sum(size for _, _, size in entries),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+file_cache = LocalFileCache()
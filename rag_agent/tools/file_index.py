@@ -0,0 +1,188 @@
+"""
+Process-wide index of the files of each corpus, for O(1) file lookups.
+
+A corpus's files are listed once and indexed by resource name, display name, file
+id and source URI. Lookups are served from the index until it is older than the
+configured TTL or the corpus is invalidated (add_data, delete_document), after which
+the next lookup lists the corpus again and only re-indexes files whose update_time
+changed. Only the most recently used corpora are kept indexed.
+
+Paged listings (get_corpus_info) go to the backend directly and do not use the index.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from ..backends import get_backend
+from ..backends.base import FileRecord
+from ..config import FILE_INDEX_MAX_CORPORA, FILE_INDEX_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class _CorpusFiles:
+    """The indexed files of one corpus."""
+
+    def __init__(self):
+        self.by_name: Dict[str, FileRecord] = {}
+        self.by_display_name: Dict[str, FileRecord] = {}
+        self.by_file_id: Dict[str, FileRecord] = {}
+        self.by_source_uri: Dict[str, FileRecord] = {}
+        self.loaded_at: Optional[float] = None
+
+    def add(self, record: FileRecord) -> None:
+        self.by_name[record.name] = record
+        self.by_file_id[record.file_id] = record
+        if record.display_name:
+            self.by_display_name[record.display_name] = record
+        if record.source_uri:
+            self.by_source_uri[record.source_uri] = record
+
+    def remove(self, record: FileRecord) -> None:
+        self.by_name.pop(record.name, None)
+        self.by_file_id.pop(record.file_id, None)
+        # Another file may have taken over the display name or source URI
+        if self.by_display_name.get(record.display_name) is record:
+            del self.by_display_name[record.display_name]
+        if self.by_source_uri.get(record.source_uri) is record:
+            del self.by_source_uri[record.source_uri]
+
+
+class CorpusFileIndex:
+    """
+    Cache of corpus file listings with dict lookups by every file identifier.
+    """
+
+    def __init__(
+        self, ttl_seconds: float = FILE_INDEX_TTL_SECONDS, max_corpora: int = FILE_INDEX_MAX_CORPORA
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_corpora = max_corpora
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._corpora: "OrderedDict[str, _CorpusFiles]" = OrderedDict()
+
+    def _is_fresh(self, files: _CorpusFiles) -> bool:
+        return files.loaded_at is not None and time.monotonic() - files.loaded_at < self.ttl_seconds
+
+    def _refresh(self, corpus_resource_name: str, files: _CorpusFiles) -> None:
+        """List the corpus and re-index only the files that were added, changed or removed."""
+        listed = {record.name: record for record in get_backend().list_files(corpus_resource_name)}
+        added = changed = removed = 0
+        for name, record in listed.items():
+            current = files.by_name.get(name)
+            if current is None:
+                added += 1
+            elif current.update_time != record.update_time:
+                changed += 1
+                files.remove(current)
+            else:
+                continue
+            files.add(record)
+        for name in [name for name in files.by_name if name not in listed]:
+            removed += 1
+            files.remove(files.by_name[name])
+        files.loaded_at = time.monotonic()
+        logger.info(
+            f"Refreshed file index of {corpus_resource_name}: "
+            f"{added} added, {changed} changed, {removed} removed"
+        )
+
+    def _get(self, corpus_resource_name: str) -> _CorpusFiles:
+        # The listing runs under the lock so concurrent callers share one refresh
+        with self._lock:
+            files = self._corpora.setdefault(corpus_resource_name, _CorpusFiles())
+            self._corpora.move_to_end(corpus_resource_name)
+            while len(self._corpora) > self.max_corpora:
+                self._corpora.popitem(last=False)
+            if self._is_fresh(files):
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._refresh(corpus_resource_name, files)
+            return files
+
+    def files(self, corpus_resource_name: str) -> List[FileRecord]:
+        """
+        Get every file of a corpus.
+
+        Args:
+            corpus_resource_name (str): The full resource name of the corpus
+
+        Returns:
+            List[FileRecord]: The files of the corpus
+        """
+        with self._lock:
+            return list(self._get(corpus_resource_name).by_name.values())
+
+    def lookup(self, corpus_resource_name: str, key: str) -> Optional[FileRecord]:
+        """
+        Find a file of a corpus by resource name, display name, file id or source URI.
+
+        A key that is not in a fresh index triggers one more listing, so files added
+        by another process are still found.
+
+        Args:
+            corpus_resource_name (str): The full resource name of the corpus
+            key (str): Any identifier of the file
+
+        Returns:
+            Optional[FileRecord]: The file, or None if the corpus has no such file
+        """
+        with self._lock:
+            files = self._corpora.get(corpus_resource_name)
+            refreshed = files is None or not self._is_fresh(files)
+            files = self._get(corpus_resource_name)
+            record = self._find(files, key)
+            if record is None and not refreshed:
+                files.loaded_at = None
+                record = self._find(self._get(corpus_resource_name), key)
+            return record
+
+    @staticmethod
+    def _find(files: _CorpusFiles, key: str) -> Optional[FileRecord]:
+        for mapping in (files.by_name, files.by_display_name, files.by_file_id, files.by_source_uri):
+            record = mapping.get(key)
+            if record is not None:
+                return record
+        return None
+
+    def invalidate_corpus(self, corpus_resource_name: str) -> int:
+        """
+        Mark a corpus's listing stale, so the next lookup lists the corpus again.
+
+        Returns:
+            int: The number of indexed files of the corpus
+        """
+        with self._lock:
+            files = self._corpora.get(corpus_resource_name)
+            if files is None:
+                return 0
+            files.loaded_at = None
+            return len(files.by_name)
+
+    def stats(self) -> dict:
+        """
+        Report cache effectiveness.
+
+        Returns:
+            dict: Hit/miss counters, hit ratio and the number of indexed corpora and files
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "corpora": len(self._corpora),
+                "files": sum(len(files.by_name) for files in self._corpora.values()),
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+# Shared by all tools in this process
+file_index = CorpusFileIndex()
@@ -1,48 +1,332 @@
+"""
+Export of every file of a corpus to one JSON or JSON Lines file.
+
+Files are fetched concurrently into spool files (in memory up to a threshold, on
+disk beyond it) and streamed into the output one record at a time, so memory use
+does not grow with the corpus. A manifest next to the output records which files
+are done and how far the output is valid, so an interrupted export resumes after
+the last completed file instead of starting over.
+"""
+
+import codecs
+import gzip
 import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import BinaryIO, Dict, Optional
+
+from rag_agent.backends import get_backend
+from rag_agent.backends.base import FileRecord
+from rag_agent.config import (
+    DEFAULT_QUERY_CONCURRENCY,
+    EXPORT_SPOOL_MAX_MEMORY_BYTES,
+    GCS_READ_CHUNK_BYTES,
+)
+from rag_agent.tools.file_index import file_index
+from rag_agent.tools.utils import check_corpus_exists, get_corpus_resource_name
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
-from vertexai import rag
+EXPORT_FORMATS = ("json", "jsonl")
+EXPORT_COMPRESSIONS = ("none", "gzip", "zstd")
+MANIFEST_VERSION = 1
 
-from rag_agent.tools import get_corpus_info
 
+def _infer_options(output_path: str, output_format: Optional[str], compression: Optional[str]):
+    stem, extension = os.path.splitext(output_path)
+    if compression is None:
+        compression = {".gz": "gzip", ".zst": "zstd"}.get(extension, "none")
+    if compression != "none" and extension in (".gz", ".zst"):
+        extension = os.path.splitext(stem)[1]
+    if output_format is None:
+        output_format = "jsonl" if extension == ".jsonl" else "json"
+    return output_format, compression
 
-def download_corpus_logs_as_json(corpus_name, tool_context, output_json_path):
-    # Get corpus info (including file list)
+
+def _spool_file(record: FileRecord) -> BinaryIO:
+    """Download one file into a spool file and rewind it."""
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_MEMORY_BYTES)
+    try:
+        with get_backend().open_file(record.name, source_uri=record.source_uri) as source:
+            shutil.copyfileobj(source, spool, GCS_READ_CHUNK_BYTES)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+class _ExportWriter:
     """
-        Downloads all file contents from a specified corpus and saves them as a JSON file.
-
-        Args:
-            corpus_name (str): The name of the corpus to fetch files from.
-            tool_context: Context or configuration required to access the corpus.
-            output_json_path (str): Path to the output JSON file where logs will be saved.
-
-        Returns:
-            None. Prints status messages and writes file contents to the specified JSON file.
-        """
-    corpus_info = get_corpus_info(corpus_name, tool_context)
-    if corpus_info.get("status") != "success":
-        print(f"Error: {corpus_info.get('message')}")
-        return
-
-    corpus_resource_name = corpus_name  # Adjust if needed
-    files = corpus_info.get("files", [])
-    logs = []
-
-    for file_info in files:
-        file_id = file_info["file_id"]
-        file_resource_name = f"{corpus_resource_name}/ragFiles/{file_id}"
+    Appends file records to the output and checkpoints the manifest after each one.
+
+    With compression, every record is its own gzip member or zstd frame; both
+    formats allow concatenation, so the output can be cut back to the end of the
+    last completed record and appended to again.
+    """
+
+    def __init__(self, output_path: str, manifest: dict):
+        self.output_path = output_path
+        self.manifest_path = f"{output_path}.manifest.json"
+        self.manifest = manifest
+        self.output_format = manifest["format"]
+        self.compression = manifest["compression"]
+        self.manifest["complete"] = False
+        mode = "r+b" if os.path.exists(output_path) and manifest["offset"] else "wb"
+        self._raw = open(output_path, mode)
+        # Drop whatever was written after the last checkpoint
+        self._raw.seek(manifest["offset"])
+        self._raw.truncate()
+        if not manifest["offset"] and self.output_format == "json":
+            self._write_member(b"[\n")
+            self._checkpoint()
+
+    def _write_member(self, *parts) -> None:
+        if self.compression == "gzip":
+            with gzip.GzipFile(fileobj=self._raw, mode="wb") as member:
+                for part in parts:
+                    self._write_part(member, part)
+        elif self.compression == "zstd":
+            with zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False) as frame:
+                for part in parts:
+                    self._write_part(frame, part)
+        else:
+            for part in parts:
+                self._write_part(self._raw, part)
+
+    @staticmethod
+    def _write_part(target, part) -> None:
+        if isinstance(part, bytes):
+            target.write(part)
+            return
+        # A spooled file content: decode and JSON-escape it block by block
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for block in iter(lambda: part.read(GCS_READ_CHUNK_BYTES), b""):
+            text = decoder.decode(block)
+            if text:
+                target.write(json.dumps(text, ensure_ascii=False)[1:-1].encode("utf-8"))
+        text = decoder.decode(b"", final=True)
+        if text:
+            target.write(json.dumps(text, ensure_ascii=False)[1:-1].encode("utf-8"))
+
+    def _checkpoint(self) -> None:
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self.manifest["offset"] = self._raw.tell()
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def write_file(self, record: FileRecord, content: BinaryIO) -> None:
+        """Append one file's record and mark the file as exported."""
+        head = json.dumps(
+            {"file_id": record.file_id, "display_name": record.display_name or ""},
+            ensure_ascii=False,
+        )
+        separator = b",\n" if self.output_format == "json" and self.manifest["completed"] else b""
+        suffix = b"\n" if self.output_format == "jsonl" else b""
+        self._write_member(
+            separator,
+            f'{head[:-1]}, "content": "'.encode("utf-8"),
+            content,
+            b'"}' + suffix,
+        )
+        self.manifest["completed"][record.name] = record.update_time
+        self._checkpoint()
+
+    def finish(self) -> None:
+        """Close the JSON array; the closing bracket lies past the checkpointed offset."""
+        offset = self.manifest["offset"]
+        if self.output_format == "json":
+            self._write_member(b"\n]\n")
+        self._raw.close()
+        self.manifest["complete"] = True
+        self.manifest["offset"] = offset
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def close(self) -> None:
+        if not self._raw.closed:
+            self._raw.close()
+
+
+def _load_manifest(
+    output_path: str, corpus_resource_name: str, output_format: str, compression: str,
+    files: Dict[str, FileRecord], resume: bool,
+) -> dict:
+    """Return the manifest to continue from, or a fresh one if it cannot be resumed."""
+    fresh = {
+        "version": MANIFEST_VERSION,
+        "corpus": corpus_resource_name,
+        "format": output_format,
+        "compression": compression,
+        "offset": 0,
+        "completed": {},
+        "complete": False,
+    }
+    manifest_path = f"{output_path}.manifest.json"
+    if not resume or not os.path.exists(manifest_path) or not os.path.exists(output_path):
+        return fresh
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return fresh
+    if any(manifest.get(key) != fresh[key] for key in ("version", "corpus", "format", "compression")):
+        print("Export manifest does not match this export, starting over")
+        return fresh
+    # Files exported earlier that changed or disappeared would leave stale records behind
+    if any(files.get(name) is None or files[name].update_time != update_time
+           for name, update_time in manifest["completed"].items()):
+        print("Corpus files changed since the interrupted export, starting over")
+        return fresh
+    return manifest
+
+
+def download_corpus_logs_as_json(
+    corpus_name,
+    tool_context,
+    output_json_path,
+    output_format: Optional[str] = None,
+    compression: Optional[str] = None,
+    max_concurrency: int = DEFAULT_QUERY_CONCURRENCY,
+    resume: bool = True,
+) -> dict:
+    """
+    Downloads all file contents from a specified corpus and saves them as a JSON file.
+
+    Each file becomes one {"file_id", "display_name", "content"} record, written to
+    the output as soon as it is downloaded. If a previous export to the same path
+    was interrupted, only the files it had not finished are downloaded.
+
+    Args:
+        corpus_name (str): The name of the corpus to fetch files from.
+        tool_context: Context or configuration required to access the corpus.
+        output_json_path (str): Path to the output file where logs will be saved.
+        output_format (str): "json" (one array) or "jsonl" (one record per line);
+                             inferred from the file extension by default.
+        compression (str): "none", "gzip" or "zstd"; inferred from a .gz or .zst
+                           extension by default.
+        max_concurrency (int): The maximum number of files downloaded at once.
+        resume (bool): Continue an interrupted export to the same path.
+
+    Returns:
+        dict: Status, output path and per-file counts of the export
+    """
+    try:
+        output_format, compression = _infer_options(output_json_path, output_format, compression)
+        if output_format not in EXPORT_FORMATS:
+            return {
+                "status": "error",
+                "message": f"Invalid output_format '{output_format}'. Use one of: {', '.join(EXPORT_FORMATS)}",
+            }
+        if compression not in EXPORT_COMPRESSIONS:
+            return {
+                "status": "error",
+                "message": f"Invalid compression '{compression}'. Use one of: {', '.join(EXPORT_COMPRESSIONS)}",
+            }
+        if compression == "zstd" and zstandard is None:
+            return {
+                "status": "error",
+                "message": "zstd compression requires the zstandard package",
+            }
+        if not check_corpus_exists(corpus_name, tool_context):
+            return {
+                "status": "error",
+                "message": f"Corpus '{corpus_name}' does not exist",
+                "corpus_name": corpus_name,
+            }
+
+        started = time.perf_counter()
+        corpus_resource_name = get_corpus_resource_name(corpus_name)
+        files = {record.name: record for record in file_index.files(corpus_resource_name)}
+        manifest = _load_manifest(
+            output_json_path, corpus_resource_name, output_format, compression, files, resume
+        )
+        pending = [record for name, record in files.items() if name not in manifest["completed"]]
+        skipped = len(files) - len(pending)
+        if manifest["complete"] and not pending:
+            print(f"Export to {output_json_path} is already up to date")
+            return {
+                "status": "success",
+                "message": f"Export of {len(files)} files is already up to date",
+                "output_path": output_json_path,
+                "files_exported": 0,
+                "files_skipped": skipped,
+                "files_failed": 0,
+            }
+        if skipped:
+            print(f"Resuming export: {skipped} of {len(files)} files already exported")
+
+        failed: Dict[str, str] = {}
+        exported = 0
+        writer = _ExportWriter(output_json_path, manifest)
         try:
-            file_content = rag.get_file(file_resource_name).read()
-            if isinstance(file_content, bytes):
-                file_content = file_content.decode("utf-8")
-            logs.append({
-                "file_id": file_id,
-                "display_name": file_info.get("display_name", ""),
-                "content": file_content
-            })
-        except Exception as e:
-            print(f"Failed to fetch file {file_id}: {e}")
-
-    # Save all logs to a local JSON file
-    with open(output_json_path, "w", encoding="utf-8") as f:
-        json.dump(logs, f, ensure_ascii=False, indent=2)
-    print(f"Saved {len(logs)} log files to {output_json_path}")
+            workers = max(1, min(max_concurrency, len(pending) or 1))
+            queue = iter(pending)
+            with ThreadPoolExecutor(max_workers=workers) as fetcher:
+                # At most `workers` files are fetched or waiting to be written at a time
+                fetches = {}
+                for record in queue:
+                    fetches[fetcher.submit(_spool_file, record)] = record
+                    if len(fetches) >= workers:
+                        break
+                while fetches:
+                    done, _ = wait(fetches, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record = fetches.pop(future)
+                        next_record = next(queue, None)
+                        if next_record is not None:
+                            fetches[fetcher.submit(_spool_file, next_record)] = next_record
+                        try:
+                            spool = future.result()
+                        except Exception as e:
+                            print(f"Failed to fetch file {record.file_id}: {e}")
+                            logging.error(f"Error exporting file {record.name}: {str(e)}")
+                            failed[record.file_id] = str(e)
+                            continue
+                        with spool:
+                            writer.write_file(record, spool)
+                        exported += 1
+            # Leave the export open for a later resume while files are missing
+            if not failed:
+                writer.finish()
+        finally:
+            writer.close()
+
+        print(f"Saved {exported} log files to {output_json_path}")
+        return {
+            "status": "success" if not failed else "warning",
+            "message": (
+                f"Exported {exported} files to {output_json_path}"
+                + (f"; {len(failed)} failed, run the export again to retry them" if failed else "")
+            ),
+            "output_path": output_json_path,
+            "output_format": output_format,
+            "compression": compression,
+            "files_exported": exported,
+            "files_skipped": skipped,
+            "files_failed": len(failed),
+            "failures": failed,
+            "bytes_written": os.path.getsize(output_json_path),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    except Exception as e:
+        error_msg = f"Error exporting corpus files: {str(e)}"
+        logging.error(error_msg)
+        return {
+            "status": "error",
+            "message": error_msg,
+            "corpus_name": corpus_name,
+        }
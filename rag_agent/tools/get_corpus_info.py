@@ -2,23 +2,72 @@
 Tool for retrieving detailed information about a specific RAG corpus.
 """
 
+import os
+from typing import Dict, Iterable, List, Optional
+
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
 
+from ..backends import get_backend
+from ..backends.base import FileRecord
+from ..config import CORPUS_INFO_PAGE_SIZE
 from .utils import check_corpus_exists, get_corpus_resource_name
 
 
+FILE_FIELDS = ("file_id", "display_name", "source_uri", "create_time", "update_time")
+
+
+def _summarize_files(files: Iterable[FileRecord]) -> dict:
+    """Count files and find the range of their create and update times in one pass."""
+    file_count = 0
+    extensions: Dict[str, int] = {}
+    ranges = {"create_time": [None, None], "update_time": [None, None]}
+    for rag_file in files:
+        file_count += 1
+        name = rag_file.display_name or rag_file.file_id
+        extension = os.path.splitext(name)[1].lower() or "(none)"
+        extensions[extension] = extensions.get(extension, 0) + 1
+        for field, bounds in ranges.items():
+            value = getattr(rag_file, field)
+            if not value:
+                continue
+            if bounds[0] is None or value < bounds[0]:
+                bounds[0] = value
+            if bounds[1] is None or value > bounds[1]:
+                bounds[1] = value
+    return {
+        "file_count": file_count,
+        "files_by_extension": extensions,
+        "earliest_create_time": ranges["create_time"][0],
+        "latest_create_time": ranges["create_time"][1],
+        "earliest_update_time": ranges["update_time"][0],
+        "latest_update_time": ranges["update_time"][1],
+    }
+
+
 def get_corpus_info(
     corpus_name: str,
     tool_context: ToolContext,
+    limit: int = CORPUS_INFO_PAGE_SIZE,
+    page_token: Optional[str] = None,
+    summary_only: bool = False,
+    fields: Optional[List[str]] = None,
 ) -> dict:
     """
     Get detailed information about a specific RAG corpus, including its files.
 
+    Files are returned one page at a time, fetched from the backend page by page;
+    pass the returned next_page_token to get the next page. The summary streams the
+    whole listing without keeping it.
+
     Args:
         corpus_name (str): The full resource name of the corpus to get information about.
                            Preferably use the resource_name from list_corpora results.
         tool_context (ToolContext): The tool context
+        limit (int): The maximum number of files to return
+        page_token (str): The next_page_token of the previous page, if any
+        summary_only (bool): Only return file counts and time ranges, without file rows
+        fields (List[str]): The file fields to return, out of file_id, display_name,
+                            source_uri, create_time and update_time (default: all)
 
     Returns:
         dict: Information about the corpus and its files
@@ -32,54 +81,42 @@ def get_corpus_info(
                 "corpus_name": corpus_name,
             }
 
+        fields = list(fields) if fields else list(FILE_FIELDS)
+        unknown_fields = [field for field in fields if field not in FILE_FIELDS]
+        if unknown_fields:
+            return {
+                "status": "error",
+                "message": f"Unknown field(s) {', '.join(unknown_fields)}. Use any of: {', '.join(FILE_FIELDS)}",
+                "corpus_name": corpus_name,
+            }
         # Get the corpus resource name
         corpus_resource_name = get_corpus_resource_name(corpus_name)
 
         # Try to get corpus details first
         corpus_display_name = corpus_name  # Default if we can't get actual display name
 
-        # Process file information
-        file_details = []
+        if summary_only:
+            summary = _summarize_files(get_backend().list_files(corpus_resource_name))
+            return {
+                "status": "success",
+                "message": f"Successfully retrieved summary for corpus '{corpus_display_name}'",
+                "corpus_name": corpus_name,
+                "corpus_display_name": corpus_display_name,
+                **summary,
+            }
+
+        # Process file information; only the requested page is listed
         try:
-            # Get the list of files
-            files = rag.list_files(corpus_resource_name)
-            for rag_file in files:
-                # Get document specific details
-                try:
-                    # Extract the file ID from the name
-                    file_id = rag_file.name.split("/")[-1]
-
-                    file_info = {
-                        "file_id": file_id,
-                        "display_name": (
-                            rag_file.display_name
-                            if hasattr(rag_file, "display_name")
-                            else ""
-                        ),
-                        "source_uri": (
-                            rag_file.source_uri
-                            if hasattr(rag_file, "source_uri")
-                            else ""
-                        ),
-                        "create_time": (
-                            str(rag_file.create_time)
-                            if hasattr(rag_file, "create_time")
-                            else ""
-                        ),
-                        "update_time": (
-                            str(rag_file.update_time)
-                            if hasattr(rag_file, "update_time")
-                            else ""
-                        ),
-                    }
-
-                    file_details.append(file_info)
-                except Exception:
-                    # Continue to the next file
-                    continue
-        except Exception:
-            # Continue without file details
-            pass
+            page, next_page_token = get_backend().list_files_page(
+                corpus_resource_name, max(1, limit), page_token or None
+            )
+        except ValueError:
+            return {
+                "status": "error",
+                "message": f"Invalid page_token '{page_token}'",
+                "corpus_name": corpus_name,
+            }
+        file_details = [{field: getattr(rag_file, field) for field in fields} for rag_file in page]
 
         # Basic corpus info
         return {
@@ -87,8 +124,9 @@ def get_corpus_info(
             "message": f"Successfully retrieved information for corpus '{corpus_display_name}'",
             "corpus_name": corpus_name,
             "corpus_display_name": corpus_display_name,
-            "file_count": len(file_details),
+            "files_in_page": len(file_details),
             "files": file_details,
+            "next_page_token": next_page_token,
         }
 
 
@@ -0,0 +1,54 @@
+"""
+Tool for checking on imports started by add_data.
+"""
+
+from google.adk.tools.tool_context import ToolContext
+
+from .import_operations import import_operations
+
+
+def get_import_status(
+    operation_id: str,
+    tool_context: ToolContext,
+) -> dict:
+    """
+    Get the progress and result of an import started by add_data, including the
+    analysis of any log files it added.
+
+    Args:
+        operation_id (str): The operation_id returned by add_data. If empty, all
+                            recent import operations are listed.
+        tool_context (ToolContext): The tool context
+
+    Returns:
+        dict: The operation's state, progress, result and log analysis
+    """
+    if not operation_id:
+        operations = import_operations.list()
+        return {
+            "status": "success",
+            "message": f"Found {len(operations)} import operation(s)",
+            "operations": operations,
+        }
+
+    operation = import_operations.get(operation_id)
+    if operation is None:
+        return {
+            "status": "error",
+            "message": f"Import operation '{operation_id}' not found",
+            "operation_id": operation_id,
+        }
+
+    analyses = operation["log_analysis"].values()
+    pending = sum(1 for analysis in analyses if analysis.get("status") in ("queued", "running"))
+    if operation["state"] in ("queued", "running"):
+        message = f"Import into corpus '{operation['corpus_name']}' is {operation['state']}"
+    elif pending:
+        message = f"Import finished; {pending} log analysis job(s) still pending"
+    else:
+        message = f"Import finished: {(operation['result'] or {}).get('message', '')}"
+    return {
+        "status": "success",
+        "message": message,
+        **operation,
+    }
@@ -1,8 +1,51 @@
+from typing import BinaryIO
+
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
+from rag_agent.backends import get_backend
+from rag_agent.backends.base import FileRecord
+from rag_agent.tools.file_index import file_index
 from rag_agent.tools.utils import check_corpus_exists, get_corpus_resource_name
 
 
+def find_corpus_file(filename: str, corpus_name: str) -> FileRecord:
+    """
+    Look up a file of a corpus by resource name, display name, file id or source URI.
+
+    Raises:
+        ValueError: If the file is not in the corpus
+    """
+    corpus_resource_name = get_corpus_resource_name(corpus_name)
+    filename = filename.strip()
+    file_obj = file_index.lookup(corpus_resource_name, filename)
+    if not file_obj:
+        raise ValueError(f"File '{filename}' not found in corpus.")
+    return file_obj
+
+
+def open_log_file(filename: str, corpus_name: str, tool_context: ToolContext) -> BinaryIO:
+    """
+    Open a file of a RAG corpus as a binary stream, without reading it into memory.
+
+    The stream can be passed straight to analyze_logs(log_content=...), which parses
+    and decodes it chunk by chunk.
+
+    Args:
+        filename (str): The file's display name or resource name
+        corpus_name (str): The name of the corpus containing the file
+        tool_context (ToolContext): The tool context
+
+    Returns:
+        BinaryIO: The file content stream; close it when done
+
+    Raises:
+        ValueError: If the corpus or the file does not exist
+    """
+    if not check_corpus_exists(corpus_name, tool_context):
+        raise ValueError(f"Corpus '{corpus_name}' does not exist")
+    record = find_corpus_file(filename, corpus_name)
+    return get_backend().open_file(record.name, source_uri=record.source_uri)
+
+
 def get_log_content_by_filename(
     filename: str,
     corpus_name: str,
@@ -24,29 +67,14 @@ def get_log_content_by_filename(
                 "corpus_name": corpus_name,
             }
 
-        corpus_resource_name = get_corpus_resource_name(corpus_name)
-        files = rag.list_files(corpus_resource_name)
-
-        # Print the list of files to inspect their attributes
-        print("Files in corpus:", files)
-
-        filename = filename.strip()
-        file_obj = next(
-            (f for f in files if getattr(f, "name", None) == filename or getattr(f, "display_name", None) == filename),
-            None
-        )
-        if not file_obj:
+        try:
+            file_obj = find_corpus_file(filename, corpus_name)
+        except ValueError as e:
             return {
                 "status": "error",
-                "message": f"File '{filename}' not found in corpus."
+                "message": str(e)
             }
-        # Inspect the file_obj to see its attributes
-        print("File object:", file_obj)
-        # Use the appropriate attribute from file_obj
-        file_resource_name = f"{corpus_resource_name}/ragFiles/{file_obj.name}"  # Replace file_obj.name with the correct attribute if needed
-        for f in files:
-            print(f"name: {getattr(f, 'name', None)}, display_name: {getattr(f, 'display_name', None)}")
-        file_content = rag.get_file(file_resource_name).read()
+        file_content = get_backend().read_file(file_obj.name, source_uri=file_obj.source_uri)
         if isinstance(file_content, bytes):
             file_content = file_content.decode("utf-8")
         return {
@@ -57,4 +85,4 @@ def get_log_content_by_filename(
         return {
             "status": "error",
             "message": str(e)
-        }
\ No newline at end of file
+        }
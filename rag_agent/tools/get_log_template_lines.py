@@ -0,0 +1,74 @@
+"""
+Tool for reading the original lines behind a template of a compacted log.
+"""
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..config import FILE_READ_MAX_LINES
+from .log_templates import load_template_index, read_template_lines
+
+
+def get_log_template_lines(
+    log_ref: str,
+    template_id: str,
+    tool_context: ToolContext,
+    offset: int = 0,
+    limit: int = 100,
+) -> dict:
+    """
+    Get the original log lines collapsed into one template when a log file was
+    added with compact_logs=True.
+
+    Args:
+        log_ref (str): The log_ref shown in the compacted log's "ref:" lines
+        template_id (str): The template id shown in the compacted log, e.g. "T3"
+        tool_context (ToolContext): The tool context
+        offset (int): The number of the template's lines to skip
+        limit (int): The maximum number of lines to return
+
+    Returns:
+        dict: The template, its count and the requested original lines
+    """
+    index = load_template_index(log_ref)
+    if index is None:
+        return {
+            "status": "error",
+            "message": f"No compacted log found for log_ref '{log_ref}'",
+            "log_ref": log_ref,
+        }
+    template = index["templates"].get(template_id)
+    if template is None:
+        return {
+            "status": "error",
+            "message": f"Template '{template_id}' not found in compacted log '{log_ref}'",
+            "log_ref": log_ref,
+        }
+
+    limit = max(0, min(limit, FILE_READ_MAX_LINES))
+    offset = max(0, offset)
+    try:
+        lines = read_template_lines(index, template_id, offset, limit)
+    except OSError as e:
+        return {
+            "status": "error",
+            "message": f"Cannot read the copy of the original log: {str(e)}",
+            "log_ref": log_ref,
+            "template_id": template_id,
+            "template": template["template"],
+            "count": template["count"],
+        }
+
+    return {
+        "status": "success",
+        "message": f"Read {len(lines)} of {template['count']} line(s) of template {template_id}",
+        "log_ref": log_ref,
+        "source": index["source_uri"],
+        "template_id": template_id,
+        "template": template["template"],
+        "count": template["count"],
+        "first_seen": template["first_seen"],
+        "last_seen": template["last_seen"],
+        "offset": offset,
+        "lines": lines,
+        "truncated": offset + len(lines) < template["count"],
+    }
@@ -0,0 +1,55 @@
+"""
+Tool for checking on plots that analyze_logs renders in the background.
+"""
+
+from typing import List
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..config import PLOT_STATUS_MAX_WAIT_SECONDS
+from .log_plots import plot_status, wait_for_plots
+
+
+def get_plot_status(
+    plot_paths: List[str],
+    tool_context: ToolContext,
+    wait_seconds: float = 0,
+) -> dict:
+    """
+    Get the rendering state of plots returned by analyze_logs with
+    plot_mode="background", optionally waiting for them to finish.
+
+    Args:
+        plot_paths (List[str]): The plot paths from the analyze_logs summary
+        tool_context (ToolContext): The tool context
+        wait_seconds (float): Seconds to wait for pending plots before reporting
+                              (capped at PLOT_STATUS_MAX_WAIT_SECONDS)
+
+    Returns:
+        dict: "pending", "done", "error: <reason>" or "unknown" for each path
+    """
+    if not plot_paths or not all(isinstance(path, str) for path in plot_paths):
+        return {
+            "status": "error",
+            "message": "Invalid plot_paths: Please provide the plot paths returned by analyze_logs",
+        }
+
+    wait_seconds = max(0.0, min(float(wait_seconds), PLOT_STATUS_MAX_WAIT_SECONDS))
+    if wait_seconds:
+        plots = wait_for_plots(plot_paths, timeout=wait_seconds)
+    else:
+        plots = plot_status(plot_paths)
+
+    pending = [path for path, state in plots.items() if state == "pending"]
+    failed = [path for path, state in plots.items() if state.startswith("error")]
+    unknown = [path for path, state in plots.items() if state == "unknown"]
+    done = len(plots) - len(pending) - len(failed) - len(unknown)
+    return {
+        "status": "error" if failed or unknown else "success",
+        "message": (
+            f"{done} of {len(plots)} plot(s) rendered, {len(pending)} pending, "
+            f"{len(failed)} failed, {len(unknown)} unknown"
+        ),
+        "plots": plots,
+        "all_done": done == len(plots),
+    }
@@ -0,0 +1,209 @@
+"""
+Handles for add_data imports, and the background queue for post-import log analysis.
+
+Every add_data call that imports something registers an operation. In background
+mode the import itself runs on a worker thread and add_data returns the operation
+id right away; get_import_status reports its progress and result. Log files added
+by an import are analyzed on a separate, single-worker queue in both modes, so the
+analysis never delays the import result.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from ..backends import get_backend
+from ..config import (
+    IMPORT_OPERATION_WORKERS,
+    IMPORT_OPERATIONS_KEPT,
+    LOG_ANALYSIS_JOB_WORKERS,
+)
+from .analyze_logs import analyze_logs
+from .file_index import file_index
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ImportOperations:
+    """
+    In-process registry of import operations and their log analysis jobs.
+    """
+
+    def __init__(self, max_kept: int = IMPORT_OPERATIONS_KEPT):
+        self.max_kept = max_kept
+        self._lock = threading.Lock()
+        self._operations: "OrderedDict[str, dict]" = OrderedDict()
+        self._import_executor = ThreadPoolExecutor(
+            max_workers=IMPORT_OPERATION_WORKERS, thread_name_prefix="rag-import-op"
+        )
+        self._analysis_executor = ThreadPoolExecutor(
+            max_workers=LOG_ANALYSIS_JOB_WORKERS, thread_name_prefix="rag-log-analysis"
+        )
+
+    def create(self, corpus_name: str, sources: int) -> str:
+        """
+        Register a new import operation.
+
+        Args:
+            corpus_name (str): The corpus the sources are imported into
+            sources (int): The number of sources to import
+
+        Returns:
+            str: The operation id
+        """
+        operation_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._operations[operation_id] = {
+                "operation_id": operation_id,
+                "corpus_name": corpus_name,
+                "state": "queued",
+                "sources": sources,
+                "progress": None,
+                "result": None,
+                "log_analysis": {},
+                "created_at": _now(),
+                "finished_at": None,
+            }
+            self._evict()
+        return operation_id
+
+    def _evict(self) -> None:
+        # Drop the oldest finished operations; running ones are always kept
+        finished = [
+            operation_id
+            for operation_id, operation in self._operations.items()
+            if operation["state"] in ("done", "failed")
+        ]
+        for operation_id in finished[: max(0, len(self._operations) - self.max_kept)]:
+            del self._operations[operation_id]
+
+    def _update(self, operation_id: str, **fields) -> None:
+        with self._lock:
+            operation = self._operations.get(operation_id)
+            if operation is not None:
+                operation.update(fields)
+
+    def run(self, operation_id: str, func: Callable[[Callable[[dict], None]], dict]) -> dict:
+        """
+        Run an import on the calling thread and record its result.
+
+        Args:
+            operation_id (str): The operation id returned by create()
+            func (Callable): The import; called with a progress callback, returns the result
+
+        Returns:
+            dict: The import result
+        """
+        self._update(operation_id, state="running", started_at=_now())
+        try:
+            result = func(lambda totals: self._update(operation_id, progress=totals))
+        except Exception as e:
+            logger.error(f"Import operation {operation_id} failed: {str(e)}")
+            result = {"status": "error", "message": f"Error adding data to corpus: {str(e)}"}
+        self._update(
+            operation_id,
+            state="failed" if result.get("status") == "error" else "done",
+            result=result,
+            finished_at=_now(),
+        )
+        return result
+
+    def submit(self, operation_id: str, func: Callable[[Callable[[dict], None]], dict]) -> None:
+        """Run an import on the operation worker pool, see run()."""
+        self._import_executor.submit(self.run, operation_id, func)
+
+    def queue_log_analysis(
+        self, operation_id: str, corpus_name: str, corpus_resource_name: str, sources: List[str]
+    ) -> None:
+        """
+        Queue the analysis of imported log files.
+
+        Args:
+            operation_id (str): The import operation the files belong to
+            corpus_name (str): The corpus the files were imported into
+            corpus_resource_name (str): The full resource name of the corpus
+            sources (List[str]): Source URIs of the imported log files, or local paths
+                                 of uploaded ones
+        """
+        with self._lock:
+            operation = self._operations.get(operation_id)
+            if operation is None:
+                return
+            for source in sources:
+                operation["log_analysis"][source] = {"status": "queued"}
+        for source in sources:
+            self._analysis_executor.submit(
+                self._analyze, operation_id, corpus_name, corpus_resource_name, source
+            )
+
+    def _set_analysis(self, operation_id: str, source: str, analysis: dict) -> None:
+        with self._lock:
+            operation = self._operations.get(operation_id)
+            if operation is not None:
+                operation["log_analysis"][source] = analysis
+
+    def _analyze(
+        self, operation_id: str, corpus_name: str, corpus_resource_name: str, source: str
+    ) -> None:
+        self._set_analysis(operation_id, source, {"status": "running"})
+        started = time.perf_counter()
+        try:
+            # Plots render on the shared plot pool, not on this worker
+            if "://" not in source and os.path.isfile(source):
+                analysis = analyze_logs(
+                    corpus_name, log_path=source, streaming=True, plot_mode="background"
+                )
+            else:
+                record = file_index.lookup(corpus_resource_name, source)
+                if record is None:
+                    raise ValueError(f"File '{source}' not found in corpus.")
+                with get_backend().open_file(record.name, source_uri=record.source_uri) as stream:
+                    analysis = analyze_logs(
+                        corpus_name, log_content=stream, streaming=True, plot_mode="background"
+                    )
+        except Exception as e:
+            logger.error(f"Error analyzing imported log {source}: {str(e)}")
+            analysis = {"status": "error", "message": str(e)}
+        if "summary" in analysis:
+            # For get_plot_status, which reports when the plots are ready
+            analysis["plots"] = list(analysis["summary"].get("plots", {}).values())
+        analysis["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self._set_analysis(operation_id, source, analysis)
+
+    def get(self, operation_id: str) -> Optional[dict]:
+        """Return a snapshot of one operation, or None if it is unknown."""
+        with self._lock:
+            operation = self._operations.get(operation_id)
+            if operation is None:
+                return None
+            snapshot = dict(operation)
+            snapshot["log_analysis"] = dict(operation["log_analysis"])
+            return snapshot
+
+    def list(self) -> List[dict]:
+        """Return a short summary of every known operation, newest first."""
+        with self._lock:
+            return [
+                {
+                    "operation_id": operation["operation_id"],
+                    "corpus_name": operation["corpus_name"],
+                    "state": operation["state"],
+                    "sources": operation["sources"],
+                    "created_at": operation["created_at"],
+                    "finished_at": operation["finished_at"],
+                }
+                for operation in reversed(self._operations.values())
+            ]
+
+
+import_operations = ImportOperations()
@@ -0,0 +1,362 @@
+"""
+Batched, concurrent import of source paths into a corpus.
+
+Paths are split into batches that are imported in parallel. All imports in the
+process share one embedding request budget: a token bucket refilled at
+DEFAULT_EMBEDDING_REQUESTS_PER_MIN. Every batch takes tokens for its files before
+it starts, and is given an equal share of the per-minute rate for its own import
+call. A failed batch is retried with exponential backoff, without affecting the
+other batches.
+
+Local files, directories and globs are uploaded file by file on a separate bounded
+pool, under the same embedding budget. With compact_logs, .log files are replaced
+by their mined templates (see log_templates) before they are uploaded.
+"""
+
+import glob
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional
+
+from ..backends import get_backend
+from ..config import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_EMBEDDING_REQUESTS_PER_MIN,
+    IMPORT_BATCH_SIZE,
+    IMPORT_MAX_CONCURRENCY,
+    IMPORT_MAX_RETRIES,
+    IMPORT_RETRY_BACKOFF_SECONDS,
+    UPLOAD_MAX_CONCURRENCY,
+)
+from .file_index import file_index
+from .log_templates import compact_log_file
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: up to `capacity` tokens, refilled at `rate_per_min`.
+    """
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        self.rate_per_min = rate_per_min
+        self.capacity = capacity if capacity is not None else rate_per_min
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_min / 60
+        )
+        self._updated_at = now
+
+    def acquire(self, tokens: float) -> float:
+        """
+        Block until `tokens` tokens are available and take them.
+
+        Requests larger than the capacity are capped to it, so they wait for a full
+        bucket instead of forever.
+
+        Returns:
+            float: The number of seconds spent waiting
+        """
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) * 60 / self.rate_per_min
+            time.sleep(delay)
+            waited += delay
+
+
+# Shared by every import in this process
+embedding_budget = TokenBucket(DEFAULT_EMBEDDING_REQUESTS_PER_MIN)
+
+
+def _import_batch(
+    corpus_resource_name: str, index: int, paths: List[str], requests_per_min: int
+) -> dict:
+    """Import one batch, retrying it on errors and on failed files."""
+    stats = {
+        "batch": index,
+        "paths": len(paths),
+        "imported": 0,
+        "failed": 0,
+        "skipped": 0,
+        "attempts": 0,
+        "throttled_ms": 0.0,
+        "error": None,
+    }
+    started = time.perf_counter()
+    for attempt in range(1, IMPORT_MAX_RETRIES + 2):
+        stats["attempts"] = attempt
+        # At least one embedding request per file; larger files only use more
+        stats["throttled_ms"] += round(embedding_budget.acquire(len(paths)) * 1000, 2)
+        try:
+            result = get_backend().import_files(
+                corpus_resource_name,
+                paths,
+                chunk_size=DEFAULT_CHUNK_SIZE,
+                chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+                max_embedding_requests_per_min=requests_per_min,
+            )
+        except Exception as e:
+            stats["error"] = str(e)
+            logger.warning(f"Import batch {index} attempt {attempt} failed: {str(e)}")
+        else:
+            stats["error"] = None
+            # Files imported by an earlier attempt show up as skipped in a retry
+            stats["skipped"] = max(0, result.skipped_count - stats["imported"])
+            stats["imported"] += result.imported_count
+            stats["failed"] = result.failed_count
+            if not result.failed_count:
+                break
+            logger.warning(
+                f"Import batch {index} attempt {attempt}: {result.failed_count} file(s) failed"
+            )
+        if attempt <= IMPORT_MAX_RETRIES:
+            time.sleep(IMPORT_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+    if stats["error"] is not None:
+        # The batch never went through; count every path as failed
+        stats["failed"] = len(paths) - stats["imported"]
+    stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return stats
+
+
+def import_in_batches(
+    corpus_resource_name: str,
+    paths: List[str],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    max_concurrency: int = IMPORT_MAX_CONCURRENCY,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Import paths into a corpus in concurrent, individually retried batches.
+
+    Args:
+        corpus_resource_name (str): The full resource name of the corpus
+        paths (List[str]): Validated source paths
+        batch_size (int): The maximum number of paths per import call
+        max_concurrency (int): The maximum number of batches imported at once
+        progress (Callable[[dict], None]): Called with the running totals after each batch
+
+    Returns:
+        dict: Totals over all batches, the statistics of each batch in batch order,
+              and the paths of the batches that imported without failures
+    """
+    batch_size = max(1, batch_size)
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    workers = max(1, min(max_concurrency, len(batches)))
+    # Each in-flight import gets an equal share of the global embedding rate
+    requests_per_min = max(1, DEFAULT_EMBEDDING_REQUESTS_PER_MIN // workers)
+
+    totals = {
+        "batches": len(batches),
+        "batches_done": 0,
+        "batches_failed": 0,
+        "imported": 0,
+        "failed": 0,
+        "skipped": 0,
+    }
+    batch_stats = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rag-import") as pool:
+        futures = [
+            pool.submit(_import_batch, corpus_resource_name, index, batch, requests_per_min)
+            for index, batch in enumerate(batches)
+        ]
+        for future in as_completed(futures):
+            stats = future.result()
+            batch_stats.append(stats)
+            totals["batches_done"] += 1
+            totals["batches_failed"] += stats["error"] is not None
+            for key in ("imported", "failed", "skipped"):
+                totals[key] += stats[key]
+            print(
+                f"Import progress: {totals['batches_done']}/{len(batches)} batches, "
+                f"{totals['imported']} imported, {totals['failed']} failed"
+            )
+            if progress is not None:
+                progress(dict(totals))
+
+    batch_stats.sort(key=lambda stats: stats["batch"])
+    succeeded_paths = [
+        path
+        for stats, batch in zip(batch_stats, batches)
+        if stats["error"] is None and not stats["failed"]
+        for path in batch
+    ]
+    return {**totals, "batch_stats": batch_stats, "succeeded_paths": succeeded_paths}
+
+
+def expand_local_paths(path: str) -> List[str]:
+    """
+    Expand a local file, directory or glob pattern into the files it covers.
+
+    Args:
+        path (str): A local path, optionally prefixed with file://; globs may use **
+
+    Returns:
+        List[str]: The matching files, sorted; empty if nothing matches
+    """
+    local_path = path[len("file://"):] if path.startswith("file://") else path
+    local_path = os.path.expanduser(local_path)
+    matches = glob.glob(local_path, recursive=True) if glob.has_magic(local_path) else [local_path]
+    files = []
+    for match in matches:
+        if os.path.isdir(match):
+            files.extend(
+                os.path.join(directory, name)
+                for directory, _, names in os.walk(match)
+                for name in names
+            )
+        elif os.path.isfile(match):
+            files.append(match)
+    return sorted(set(files))
+
+
+def _upload_one(corpus_resource_name: str, path: str, compress: bool, compact_logs: bool) -> dict:
+    """Upload one local file, retrying it on errors."""
+    stats = {"path": path, "bytes": 0, "bytes_sent": 0, "attempts": 0, "error": None}
+    started = time.perf_counter()
+    upload_path = path
+    if compact_logs and path.endswith(".log"):
+        try:
+            compaction = compact_log_file(path)
+        except Exception as e:
+            logger.warning(f"Could not compact {path}, uploading it as is: {str(e)}")
+        else:
+            if compaction is None:
+                stats["compaction_skipped"] = "compacted form is not smaller than the original"
+            else:
+                upload_path = compaction.pop("output_path")
+                stats["compaction"] = compaction
+    for attempt in range(1, IMPORT_MAX_RETRIES + 2):
+        stats["attempts"] = attempt
+        embedding_budget.acquire(1)
+        try:
+            upload = get_backend().upload_file(
+                corpus_resource_name,
+                upload_path,
+                display_name=os.path.basename(path),
+                chunk_size=DEFAULT_CHUNK_SIZE,
+                chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+                compress=compress,
+            )
+        except NotImplementedError as e:
+            stats["error"] = str(e)
+            break
+        except Exception as e:
+            stats["error"] = str(e)
+            logger.warning(f"Upload of {path} attempt {attempt} failed: {str(e)}")
+            if attempt <= IMPORT_MAX_RETRIES:
+                time.sleep(IMPORT_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            continue
+        stats.update(
+            error=None,
+            file_name=upload.file.name,
+            display_name=upload.file.display_name,
+            source_uri=upload.file.source_uri,
+            bytes=upload.bytes_read,
+            bytes_sent=upload.bytes_sent,
+        )
+        break
+
+    elapsed = time.perf_counter() - started
+    stats["elapsed_ms"] = round(elapsed * 1000, 2)
+    stats["mb_per_s"] = round(stats["bytes"] / (1024 * 1024) / elapsed, 2) if elapsed else None
+    if stats["bytes"] and compress:
+        stats["compression_ratio"] = round(stats["bytes_sent"] / stats["bytes"], 3)
+    return stats
+
+
+def upload_local_files(
+    corpus_resource_name: str,
+    files: List[str],
+    compress: bool = False,
+    max_concurrency: int = UPLOAD_MAX_CONCURRENCY,
+    progress: Optional[Callable[[dict], None]] = None,
+    compact_logs: bool = False,
+) -> dict:
+    """
+    Upload local files into a corpus on a bounded worker pool.
+
+    Each file is streamed from disk by the backend, optionally gzip-compressed on
+    the fly, and retried on its own if it fails.
+
+    Args:
+        corpus_resource_name (str): The full resource name of the corpus
+        files (List[str]): Local file paths, as returned by expand_local_paths()
+        compress (bool): Compress files while they are sent
+        max_concurrency (int): The maximum number of files uploaded at once
+        progress (Callable[[dict], None]): Called with the running totals after each file
+        compact_logs (bool): Upload .log files as their mined templates
+
+    Returns:
+        dict: Totals, overall throughput, compaction totals and the statistics of
+              each file, in input order
+    """
+    totals = {"files": len(files), "uploaded": 0, "failed": 0, "bytes": 0, "bytes_sent": 0}
+    file_stats = []
+    started = time.perf_counter()
+    workers = max(1, min(max_concurrency, len(files)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rag-upload") as pool:
+        futures = [
+            pool.submit(_upload_one, corpus_resource_name, path, compress, compact_logs)
+            for path in files
+        ]
+        for future in as_completed(futures):
+            stats = future.result()
+            file_stats.append(stats)
+            if stats["error"] is None:
+                totals["uploaded"] += 1
+                totals["bytes"] += stats["bytes"]
+                totals["bytes_sent"] += stats["bytes_sent"]
+            else:
+                totals["failed"] += 1
+            print(
+                f"Upload progress: {totals['uploaded'] + totals['failed']}/{len(files)} files, "
+                f"{totals['failed']} failed"
+            )
+            if progress is not None:
+                progress(dict(totals))
+
+    unnamed = [stats for stats in file_stats if stats["error"] is None and not stats["file_name"]]
+    if unnamed:
+        # Some backends only name uploaded files in the corpus listing: list it once
+        file_index.invalidate_corpus(corpus_resource_name)
+        for stats in unnamed:
+            record = file_index.lookup(corpus_resource_name, stats["source_uri"])
+            if record is not None:
+                stats["file_name"] = record.name
+
+    elapsed = time.perf_counter() - started
+    order = {path: index for index, path in enumerate(files)}
+    file_stats.sort(key=lambda stats: order[stats["path"]])
+    result = {
+        **totals,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "mb_per_s": round(totals["bytes"] / (1024 * 1024) / elapsed, 2) if elapsed else None,
+        "file_stats": file_stats,
+    }
+    compactions = [stats["compaction"] for stats in file_stats if "compaction" in stats]
+    if compactions:
+        compaction = {"files": len(compactions)}
+        for key in ("lines", "templates", "bytes_in", "bytes_out"):
+            compaction[key] = sum(c[key] for c in compactions)
+        compaction["ratio"] = (
+            round(compaction["bytes_out"] / compaction["bytes_in"], 3) if compaction["bytes_in"] else None
+        )
+        result["compaction"] = compaction
+    return result
@@ -0,0 +1,142 @@
+"""
+Per-corpus record of imported sources and their content fingerprints.
+
+add_data fingerprints every source under the paths it is given (GCS generation
+and MD5, or a hash of a local file) and only imports or uploads sources that are new
+or whose fingerprint changed since they were last imported, so scheduled re-imports
+of the same prefixes or directories do not re-embed unchanged files.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..backends import get_backend
+from ..config import INGEST_MANIFEST_DIR
+from .file_index import file_index
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionManifest:
+    """
+    Source URI -> fingerprint and import time, stored as one JSON file per corpus.
+    """
+
+    def __init__(self, root: str = INGEST_MANIFEST_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, corpus_resource_name: str) -> str:
+        digest = hashlib.blake2b(corpus_resource_name.encode("utf-8"), digest_size=12).hexdigest()
+        return os.path.join(self.root, f"{digest}.json")
+
+    def load(self, corpus_resource_name: str) -> Dict[str, dict]:
+        """
+        Get the recorded sources of a corpus.
+
+        Returns:
+            Dict[str, dict]: {"fingerprint", "imported_at"} per source URI, and the
+                            "file_name" of uploaded sources
+        """
+        try:
+            with open(self._path(corpus_resource_name), "r", encoding="utf-8") as f:
+                return json.load(f)["sources"]
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def plan(
+        self, corpus_resource_name: str, paths: Iterable[str], force: bool = False
+    ) -> Tuple[List[str], List[str], Dict[str, str]]:
+        """
+        Decide which sources under the given paths need importing.
+
+        A source is skipped when its fingerprint matches the recorded one and the
+        corpus still holds a file imported from it (or, for uploads, the recorded file).
+
+        Args:
+            corpus_resource_name (str): The full resource name of the corpus
+            paths (Iterable[str]): Validated import paths or local files
+            force (bool): Import every source, ignoring recorded fingerprints
+
+        Returns:
+            Tuple[List[str], List[str], Dict[str, str]]: The paths to import (source
+                URIs, or paths that cannot be fingerprinted), the unchanged source
+                URIs, and the fingerprints of the sources to import
+        """
+        recorded = {} if force else self.load(corpus_resource_name)
+        to_import: List[str] = []
+        unchanged: List[str] = []
+        fingerprints: Dict[str, str] = {}
+        present = None
+        for path in paths:
+            try:
+                sources = get_backend().fingerprint_sources(path)
+            except Exception as e:
+                logger.warning(f"Could not fingerprint {path}, importing it as is: {str(e)}")
+                sources = {}
+            if not sources:
+                to_import.append(path)
+                continue
+            for source_uri, fingerprint in sources.items():
+                entry = recorded.get(source_uri)
+                if entry is not None and entry["fingerprint"] == fingerprint:
+                    if present is None:
+                        # Files deleted since their import must be imported again
+                        present = set()
+                        for record in file_index.files(corpus_resource_name):
+                            present.update((record.source_uri, record.name))
+                    if source_uri in present or entry.get("file_name") in present:
+                        unchanged.append(source_uri)
+                        continue
+                to_import.append(source_uri)
+                fingerprints[source_uri] = fingerprint
+        # Overlapping paths (e.g. a prefix and a file under it) import a source once
+        return list(dict.fromkeys(to_import)), list(dict.fromkeys(unchanged)), fingerprints
+
+    def record(
+        self,
+        corpus_resource_name: str,
+        fingerprints: Dict[str, str],
+        file_names: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Record sources as imported with the given fingerprints.
+
+        Args:
+            corpus_resource_name (str): The full resource name of the corpus
+            fingerprints (Dict[str, str]): Fingerprint per imported source URI
+            file_names (Dict[str, str]): Resource name of the corpus file per uploaded
+                                         source URI; uploaded files do not always
+                                         keep the source URI
+        """
+        if not fingerprints:
+            return
+        imported_at = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            sources = self.load(corpus_resource_name)
+            for source_uri, fingerprint in fingerprints.items():
+                sources[source_uri] = {"fingerprint": fingerprint, "imported_at": imported_at}
+                if file_names and source_uri in file_names:
+                    sources[source_uri]["file_name"] = file_names[source_uri]
+            path = self._path(corpus_resource_name)
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"corpus": corpus_resource_name, "sources": sources}, f)
+            os.replace(tmp_path, path)
+
+    def drop_corpus(self, corpus_resource_name: str) -> None:
+        """Forget every source of a deleted corpus."""
+        with self._lock:
+            try:
+                os.remove(self._path(corpus_resource_name))
+            except FileNotFoundError:
+                pass
+
+
+ingestion_manifest = IngestionManifest()
@@ -4,7 +4,8 @@ Tool for listing all available Vertex AI RAG corpora.
 
 from typing import Dict, List, Union
 
-from vertexai import rag
+from ..backends import get_backend
+from .utils import corpus_resolver
 
 
 def list_corpora() -> dict:
@@ -20,7 +21,10 @@ def list_corpora() -> dict:
     """
     try:
         # Get the list of corpora
-        corpora = rag.list_corpora()
+        corpora = list(get_backend().list_corpora())
+
+        # Refresh the shared resolver cache with the listing we already paid for
+        corpus_resolver.update(corpora)
 
         # Process corpus information into a more usable format
         corpus_info: List[Dict[str, Union[str, int]]] = []
@@ -28,12 +32,8 @@ def list_corpora() -> dict:
             corpus_data: Dict[str, Union[str, int]] = {
                 "resource_name": corpus.name,  # Full resource name for use with other tools
                 "display_name": corpus.display_name,
-                "create_time": (
-                    str(corpus.create_time) if hasattr(corpus, "create_time") else ""
-                ),
-                "update_time": (
-                    str(corpus.update_time) if hasattr(corpus, "update_time") else ""
-                ),
+                "create_time": corpus.create_time,
+                "update_time": corpus.update_time,
             }
 
             corpus_info.append(corpus_data)
@@ -0,0 +1,519 @@
+"""
+Parsing and aggregation helpers for pipe-delimited log files.
+
+Logs are expected as "timestamp|level|message" lines. A whole log can be read into
+a compact DataFrame (categorical levels, Arrow-backed messages, datetime64
+timestamps), or read in fixed-size chunks that are folded into LogAggregates, so
+peak memory is bounded by the chunk size instead of the file size.
+
+Message-derived features (error type, failed-login user, unauthorized flag) come from
+a single combined regex applied once per distinct message, see extract_log_features().
+"""
+
+import csv
+import io
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config import (
+    LOG_ANNOTATION_BUDGET,
+    LOG_CHUNK_LINES,
+    LOG_SEGMENT_BYTES,
+    LOG_TIMELINE_MAX_BINS,
+    LOG_TIMESTAMP_FORMAT,
+)
+
+try:
+    import pyarrow  # noqa: F401
+
+    # Arrow strings store messages in one contiguous buffer instead of one object each
+    MESSAGE_DTYPE = "string[pyarrow]"
+except ImportError:
+    MESSAGE_DTYPE = "object"
+
+LOG_COLUMNS = ["timestamp", "level", "message"]
+ERROR_TYPE_PATTERN = r"(ERROR_\w+)"
+FAILED_LOGIN_PATTERN = r"Failed login.*user (.*@.*)"
+UNAUTHORIZED_PATTERN = "Blocked login|Login denied"
+# All three patterns in one regex: the lookaheads let each group match anywhere in
+# the message regardless of the order in which the features appear
+LOG_FEATURE_PATTERN = (
+    rf"^(?=(?:.*?(?P<error_type>{ERROR_TYPE_PATTERN[1:-1]}))?)"
+    rf"(?=(?:.*?(?P<unauthorized>(?i:{UNAUTHORIZED_PATTERN})))?)"
+    rf"(?:.*?{FAILED_LOGIN_PATTERN.replace('(', '(?P<failed_login_user>', 1)})?"
+)
+# Cheap literal prefilter so the combined regex only runs on messages that can match
+_FEATURE_CANDIDATE_PATTERN = rf"ERROR_|Failed login|(?i:{UNAUTHORIZED_PATTERN})"
+# Candidate timeline bucket widths, finest first
+TIMELINE_BIN_WIDTHS = ["1s", "5s", "15s", "1min", "5min", "15min", "1h", "3h", "6h", "1D", "7D"]
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Parse timestamps with the configured format, falling back to ISO 8601.
+
+    Args:
+        values (pd.Series): Raw timestamp strings
+
+    Returns:
+        pd.Series: datetime64 values, NaT where a timestamp could not be parsed
+    """
+    # cache=True parses each distinct timestamp once; logs repeat them heavily
+    parsed = pd.to_datetime(values, format=LOG_TIMESTAMP_FORMAT, errors="coerce", cache=True)
+    failed = parsed.isna() & values.notna()
+    if failed.any():
+        parsed[failed] = pd.to_datetime(values[failed], format="ISO8601", errors="coerce")
+    return parsed.astype("datetime64[ns]")
+
+
+def _read_log_csv(source, **kwargs):
+    return pd.read_csv(
+        source,
+        sep="|",
+        names=LOG_COLUMNS,
+        engine="c",
+        # Log messages are raw text, so quotes must not start quoted fields
+        quoting=csv.QUOTE_NONE,
+        dtype={"timestamp": str, "level": "category", "message": MESSAGE_DTYPE},
+        **kwargs,
+    )
+
+
+class _ChunkIteratorReader(io.RawIOBase):
+    """Raw binary stream over an iterator of bytes (or str) chunks."""
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]):
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def open_log_source(log_content):
+    """
+    Turn any supported form of log content into something the parser can stream.
+
+    Accepted forms: a str, bytes, a binary or text file-like object (e.g. from
+    RagBackend.open_file), an iterator of bytes or str chunks, or the dict returned
+    by get_log_content_by_filename. Streams and iterators are passed through without
+    being read into memory; bytes are decoded by the parser as it reads them.
+
+    Args:
+        log_content: The log content in one of the accepted forms
+
+    Returns:
+        A path-less source for iter_log_chunks() and read_log_frame()
+
+    Raises:
+        ValueError: If the content is a failed get_log_content_by_filename result
+        TypeError: If the content is of an unsupported type
+    """
+    if isinstance(log_content, dict):
+        if log_content.get("status", "success") != "success" or "content" not in log_content:
+            raise ValueError(log_content.get("message", "Log content dict has no content"))
+        log_content = log_content["content"]
+    if isinstance(log_content, str):
+        return io.StringIO(log_content)
+    if isinstance(log_content, (bytes, bytearray, memoryview)):
+        return io.BytesIO(log_content)
+    if hasattr(log_content, "read"):
+        return log_content
+    if hasattr(log_content, "__iter__"):
+        return io.BufferedReader(_ChunkIteratorReader(log_content), buffer_size=1 << 20)
+    raise TypeError(f"Unsupported log content type: {type(log_content).__name__}")
+
+
+def hashable_log_content(log_content) -> Optional[Union[str, bytes]]:
+    """
+    Return the in-memory content of a log for hashing, or None for streams.
+
+    Args:
+        log_content: The log content in any form accepted by open_log_source()
+
+    Returns:
+        Optional[Union[str, bytes]]: The content, or None if it is only available as a stream
+    """
+    if isinstance(log_content, dict):
+        log_content = log_content.get("content")
+    if isinstance(log_content, (str, bytes)):
+        return log_content
+    if isinstance(log_content, (bytearray, memoryview)):
+        return bytes(log_content)
+    return None
+
+
+def add_time_columns(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add small-integer "day" (0 = Monday) and "hour" columns derived from "timestamp".
+
+    Rows without a valid timestamp get -1 in both columns.
+
+    Args:
+        frame (pd.DataFrame): A parsed log frame
+
+    Returns:
+        pd.DataFrame: The same frame, for chaining
+    """
+    timestamps = frame["timestamp"]
+    frame["day"] = timestamps.dt.dayofweek.fillna(-1).astype("int8")
+    frame["hour"] = timestamps.dt.hour.fillna(-1).astype("int8")
+    return frame
+
+
+def extract_log_features(messages: pd.Series) -> pd.DataFrame:
+    """
+    Extract every message-derived feature in one pass.
+
+    Log messages are mostly repeated templates, so the messages are factorized first
+    and LOG_FEATURE_PATTERN runs once per distinct message; the results are then
+    broadcast back to every row by their factor codes.
+
+    Args:
+        messages (pd.Series): Log messages
+
+    Returns:
+        pd.DataFrame: Columns "error_type" (category), "failed_login_user" and
+                      "unauthorized" (bool), aligned with messages
+    """
+    codes, uniques = pd.factorize(messages)
+    uniques = pd.Series(uniques, dtype=messages.dtype)
+    candidates = uniques.str.contains(_FEATURE_CANDIDATE_PATTERN, na=False)
+    per_unique = uniques[candidates].str.extract(LOG_FEATURE_PATTERN).reindex(uniques.index)
+    # Code -1 marks a missing message and reindexes to an all-NA row
+    features = per_unique.reindex(codes)
+    features.index = messages.index
+    features["error_type"] = features["error_type"].astype("category")
+    features["unauthorized"] = features["unauthorized"].notna()
+    return features[["error_type", "failed_login_user", "unauthorized"]]
+
+
+def read_log_frame(source) -> pd.DataFrame:
+    """
+    Read a whole log into a compact DataFrame.
+
+    Columns: "timestamp" (datetime64[ns]), "level" (category), "message" (Arrow string
+    when pyarrow is installed), the extract_log_features() columns, and "day" and
+    "hour" (int8).
+
+    Args:
+        source: A path or a file-like object with the log content
+
+    Returns:
+        pd.DataFrame: The parsed log
+    """
+    frame = _read_log_csv(source)
+    frame["timestamp"] = parse_timestamps(frame["timestamp"])
+    frame = frame.join(extract_log_features(frame["message"]))
+    return add_time_columns(frame)
+
+
+def iter_log_chunks(source, chunk_lines: int = LOG_CHUNK_LINES) -> Iterator[pd.DataFrame]:
+    """
+    Read a log in chunks of at most chunk_lines lines with the C parser.
+
+    Args:
+        source: A path or a file-like object with the log content
+        chunk_lines (int): Lines per chunk
+
+    Yields:
+        pd.DataFrame: Chunks with parsed "timestamp", "level" and "message" columns
+    """
+    with _read_log_csv(source, chunksize=chunk_lines) as reader:
+        for chunk in reader:
+            chunk["timestamp"] = parse_timestamps(chunk["timestamp"])
+            yield chunk
+
+
+def split_log_bytes(data: bytes, segment_bytes: int = LOG_SEGMENT_BYTES) -> List[bytes]:
+    """
+    Split raw log bytes into segments of about segment_bytes, at line boundaries.
+
+    Args:
+        data (bytes): The log content
+        segment_bytes (int): The target segment size
+
+    Returns:
+        List[bytes]: Segments that together hold every line exactly once
+    """
+    segments = []
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start + segment_bytes)
+        end = len(data) if end == -1 else end + 1
+        segments.append(data[start:end])
+        start = end
+    return segments
+
+
+def aggregate_log_bytes(data: bytes) -> dict:
+    """
+    Parse raw log bytes into serialized LogAggregates.
+
+    Runs in worker processes, so both the argument and the result are cheap to pickle.
+
+    Args:
+        data (bytes): Complete lines of a log
+
+    Returns:
+        dict: LogAggregates.to_dict() of the lines
+    """
+    aggregates = LogAggregates()
+    if data.strip():
+        for chunk in iter_log_chunks(io.BytesIO(data)):
+            aggregates.update(chunk)
+    return aggregates.to_dict()
+
+
+def bin_event_counts(
+    counts: pd.Series, max_bins: int = LOG_TIMELINE_MAX_BINS, min_width: str = "1s"
+) -> Tuple[pd.Series, str]:
+    """
+    Re-bin event counts into contiguous time buckets of an adaptive width.
+
+    The width is the finest of TIMELINE_BIN_WIDTHS (no finer than min_width) that
+    covers the whole time span in at most max_bins buckets, so the result size and
+    the cost of plotting it do not grow with the number of events.
+
+    Args:
+        counts (pd.Series): Event counts indexed by timestamp (e.g. per second or minute)
+        max_bins (int): The maximum number of buckets
+        min_width (str): The resolution of counts; finer widths are never chosen
+
+    Returns:
+        Tuple[pd.Series, str]: Counts per bucket (empty buckets included) and the width
+    """
+    counts = counts.sort_index()
+    widths = TIMELINE_BIN_WIDTHS[TIMELINE_BIN_WIDTHS.index(min_width):]
+    span = counts.index[-1] - counts.index[0] if len(counts) else pd.Timedelta(0)
+    width = next(
+        (width for width in widths if span / pd.Timedelta(width) < max_bins), widths[-1]
+    )
+    return counts.resample(width).sum(), width
+
+
+def select_annotations(
+    timestamps: pd.Series, labels: pd.Series, budget: int = LOG_ANNOTATION_BUDGET
+) -> Tuple[pd.Series, pd.Series]:
+    """
+    Pick at most budget events to label, spread evenly over the time span.
+
+    The span is split into budget equal buckets and the first event of each
+    non-empty bucket is kept.
+
+    Args:
+        timestamps (pd.Series): Event timestamps
+        labels (pd.Series): Event labels, aligned with timestamps
+        budget (int): The maximum number of events to keep
+
+    Returns:
+        Tuple[pd.Series, pd.Series]: The selected timestamps and labels
+    """
+    if len(timestamps) <= budget:
+        return timestamps, labels
+    start, end = timestamps.min(), timestamps.max()
+    span = max(end - start, pd.Timedelta(1, "ns"))
+    buckets = ((timestamps - start) / span * budget).astype("int64").clip(upper=budget - 1)
+    first = ~buckets.duplicated().to_numpy()
+    return timestamps[first], labels[first]
+
+
+class LogAggregates:
+    """
+    Running aggregates of a log, updated one chunk at a time.
+
+    Holds everything analyze_logs plots: hourly error counts, error-type counts,
+    the day-of-week x hour error matrix, failed-login users, per-minute event
+    and unauthorized-event counts for the timelines, and the first unauthorized
+    event of each minute as annotation candidates.
+    """
+
+    def __init__(self):
+        self.total_lines = 0
+        self.total_errors = 0
+        self.hourly_errors = np.zeros(24, dtype=np.int64)
+        self.day_hour_errors = np.zeros((7, 24), dtype=np.int64)
+        self.error_types: Counter = Counter()
+        self.failed_login_users: Counter = Counter()
+        self.events_per_minute: Counter = Counter()
+        self.unauthorized_count = 0
+        self.unauthorized_per_minute: Counter = Counter()
+        self.unauthorized_events: Dict[pd.Timestamp, Tuple[pd.Timestamp, str]] = {}
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """
+        Fold one parsed chunk into the aggregates.
+
+        Args:
+            frame (pd.DataFrame): A chunk as produced by iter_log_chunks(), or a frame
+                                  from read_log_frame() whose features are reused
+        """
+        self.total_lines += len(frame)
+        if "error_type" in frame.columns:
+            features = frame
+        else:
+            features = extract_log_features(frame["message"])
+
+        error_mask = frame["level"] == "ERROR"
+        self.total_errors += int(error_mask.sum())
+        error_times = frame.loc[error_mask, "timestamp"].dropna()
+        hours = error_times.dt.hour.to_numpy()
+        days = error_times.dt.dayofweek.to_numpy()
+        self.hourly_errors += np.bincount(hours, minlength=24)
+        self.day_hour_errors += np.bincount(days * 24 + hours, minlength=7 * 24).reshape(7, 24)
+
+        self.error_types.update(features["error_type"].value_counts().to_dict())
+        self.failed_login_users.update(features["failed_login_user"].value_counts().to_dict())
+        minutes = frame["timestamp"].dt.floor("min")
+        self.events_per_minute.update(minutes.value_counts().to_dict())
+
+        unauthorized_mask = features["unauthorized"]
+        self.unauthorized_count += int(unauthorized_mask.sum())
+        if unauthorized_mask.any():
+            unauthorized_minutes = minutes[unauthorized_mask]
+            self.unauthorized_per_minute.update(unauthorized_minutes.value_counts().to_dict())
+            # Keep one annotation candidate per minute; earlier chunks win
+            firsts = frame.loc[unauthorized_mask, ["timestamp", "message"]].assign(
+                minute=unauthorized_minutes
+            ).dropna().drop_duplicates("minute")
+            for minute, timestamp, message in zip(
+                firsts["minute"], firsts["timestamp"], firsts["message"].str[:40]
+            ):
+                self.unauthorized_events.setdefault(minute, (timestamp, message))
+
+    def merge(self, other: "LogAggregates") -> "LogAggregates":
+        """
+        Fold the aggregates of another log (or another part of the same log) into these.
+
+        Args:
+            other (LogAggregates): The aggregates to add
+
+        Returns:
+            LogAggregates: self, for chaining
+        """
+        self.total_lines += other.total_lines
+        self.total_errors += other.total_errors
+        self.hourly_errors += other.hourly_errors
+        self.day_hour_errors += other.day_hour_errors
+        self.error_types.update(other.error_types)
+        self.failed_login_users.update(other.failed_login_users)
+        self.events_per_minute.update(other.events_per_minute)
+        self.unauthorized_count += other.unauthorized_count
+        self.unauthorized_per_minute.update(other.unauthorized_per_minute)
+        for minute, event in other.unauthorized_events.items():
+            current = self.unauthorized_events.get(minute)
+            if current is None or event[0] < current[0]:
+                self.unauthorized_events[minute] = event
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the aggregates to JSON-compatible types.
+
+        Returns:
+            dict: The aggregates; timestamps are ISO 8601 strings
+        """
+        return {
+            "total_lines": self.total_lines,
+            "total_errors": self.total_errors,
+            "hourly_errors": self.hourly_errors.tolist(),
+            "day_hour_errors": self.day_hour_errors.tolist(),
+            "error_types": dict(self.error_types),
+            "failed_login_users": dict(self.failed_login_users),
+            "events_per_minute": {
+                minute.isoformat(): count for minute, count in self.events_per_minute.items()
+            },
+            "unauthorized_count": self.unauthorized_count,
+            "unauthorized_per_minute": {
+                minute.isoformat(): count for minute, count in self.unauthorized_per_minute.items()
+            },
+            "unauthorized_events": [
+                [minute.isoformat(), timestamp.isoformat(), label]
+                for minute, (timestamp, label) in self.unauthorized_events.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LogAggregates":
+        """
+        Rebuild aggregates serialized with to_dict().
+
+        Args:
+            data (dict): The serialized aggregates
+
+        Returns:
+            LogAggregates: The restored aggregates
+        """
+        aggregates = cls()
+        aggregates.total_lines = data["total_lines"]
+        aggregates.total_errors = data["total_errors"]
+        aggregates.hourly_errors = np.array(data["hourly_errors"], dtype=np.int64)
+        aggregates.day_hour_errors = np.array(data["day_hour_errors"], dtype=np.int64)
+        aggregates.error_types = Counter(data["error_types"])
+        aggregates.failed_login_users = Counter(data["failed_login_users"])
+        aggregates.events_per_minute = Counter(
+            {pd.Timestamp(minute): count for minute, count in data["events_per_minute"].items()}
+        )
+        aggregates.unauthorized_count = data["unauthorized_count"]
+        aggregates.unauthorized_per_minute = Counter(
+            {pd.Timestamp(minute): count for minute, count in data["unauthorized_per_minute"].items()}
+        )
+        aggregates.unauthorized_events = {
+            pd.Timestamp(minute): (pd.Timestamp(timestamp), label)
+            for minute, timestamp, label in data["unauthorized_events"]
+        }
+        return aggregates
+
+    # ----- views used for plotting and summaries -----
+
+    def error_trends(self) -> pd.Series:
+        """Errors per hour of day, for the hours that have errors."""
+        trends = pd.Series(self.hourly_errors, index=pd.RangeIndex(24, name="timestamp"))
+        return trends[trends > 0]
+
+    def error_distribution(self) -> pd.Series:
+        """Occurrences per error type, most frequent first."""
+        return pd.Series(self.error_types, dtype="int64").sort_values(ascending=False)
+
+    def error_heatmap(self) -> pd.DataFrame:
+        """Errors per day of week and hour, restricted to days and hours with errors."""
+        heatmap = pd.DataFrame(self.day_hour_errors, index=DAY_NAMES, columns=range(24))
+        heatmap.index.name = "day"
+        heatmap.columns.name = "hour"
+        return heatmap.loc[heatmap.sum(axis=1) > 0, heatmap.sum(axis=0) > 0]
+
+    def unauth_users(self) -> pd.Series:
+        """Failed logins per user, most frequent first."""
+        return pd.Series(self.failed_login_users, dtype="int64").sort_values(ascending=False)
+
+    def timeline(self) -> pd.Series:
+        """Events per minute, in time order."""
+        return pd.Series(self.events_per_minute, dtype="int64").sort_index()
+
+    def unauthorized_timeline(self) -> pd.Series:
+        """Unauthorized events per minute, in time order."""
+        return pd.Series(self.unauthorized_per_minute, dtype="int64").sort_index()
+
+    def unauthorized_annotations(
+        self, budget: int = LOG_ANNOTATION_BUDGET
+    ) -> Tuple[pd.Series, pd.Series]:
+        """At most budget unauthorized events to label, spread over the time span."""
+        events = sorted(self.unauthorized_events.values())
+        timestamps = pd.Series([event[0] for event in events], dtype="datetime64[ns]")
+        labels = pd.Series([event[1] for event in events], dtype=object)
+        return select_annotations(timestamps, labels, budget)
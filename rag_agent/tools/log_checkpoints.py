@@ -0,0 +1,185 @@
+"""
+Persisted per-file checkpoints for incremental analysis of append-only logs.
+
+A checkpoint records how far a log file has been parsed (the byte offset just past
+the last complete line) together with the LogAggregates of everything before that
+offset. Re-analyzing the file parses only the appended tail and merges it into the
+stored aggregates. A checkpoint is discarded when the file was truncated or rotated,
+detected by a shrinking size or a changed fingerprint of its first bytes.
+"""
+
+import hashlib
+import io
+import json
+import os
+from typing import Optional, Tuple
+
+from ..config import LOG_CHECKPOINT_DIR
+from .log_analysis import LogAggregates, iter_log_chunks
+
+# Bump whenever LogAggregates changes shape, so older checkpoints are rebuilt
+CHECKPOINT_VERSION = 1
+# Bytes at the start of the file used to recognize it across runs
+_FINGERPRINT_BYTES = 4096
+_SCAN_BLOCK_BYTES = 1 << 16
+
+
+class _BoundedReader(io.RawIOBase):
+    """Raw reader over a file that stops at a fixed end offset."""
+
+    def __init__(self, f, end: int):
+        self._f = f
+        self._remaining = end - f.tell()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:self._remaining]
+        read = self._f.readinto(view)
+        self._remaining -= read
+        return read
+
+
+def _fingerprint(f, length: int) -> str:
+    f.seek(0)
+    return hashlib.blake2b(f.read(length), digest_size=16).hexdigest()
+
+
+def _last_line_end(f, start: int, size: int) -> int:
+    """Return the offset just past the last newline in [start, size), or start if none."""
+    position = size
+    while position > start:
+        block_start = max(start, position - _SCAN_BLOCK_BYTES)
+        f.seek(block_start)
+        block = f.read(position - block_start)
+        newline = block.rfind(b"\n")
+        if newline != -1:
+            return block_start + newline + 1
+        position = block_start
+    return start
+
+
+class LogCheckpointStore:
+    """
+    Checkpoints of analyzed log files, one JSON file per log path.
+    """
+
+    def __init__(self, root: str = LOG_CHECKPOINT_DIR):
+        self.root = root
+
+    def _key(self, log_path: str) -> str:
+        return hashlib.blake2b(os.path.abspath(log_path).encode("utf-8"), digest_size=16).hexdigest()
+
+    def checkpoint_path(self, log_path: str) -> str:
+        """Return the checkpoint file of a log path."""
+        return os.path.join(self.root, f"{self._key(log_path)}.json")
+
+    def plot_dir(self, log_path: str) -> str:
+        """Return (and create) the directory holding the plots of a log path."""
+        path = os.path.join(self.root, self._key(log_path))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def load(self, log_path: str) -> Optional[dict]:
+        """
+        Load the checkpoint of a log path.
+
+        Args:
+            log_path (str): The log file
+
+        Returns:
+            Optional[dict]: The checkpoint, or None if missing, unreadable or outdated
+        """
+        try:
+            with open(self.checkpoint_path(log_path), "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            return None
+        return checkpoint
+
+    def save(self, log_path: str, offset: int, fingerprint: str, aggregates: LogAggregates) -> None:
+        """
+        Persist the checkpoint of a log path.
+
+        Args:
+            log_path (str): The log file
+            offset (int): Byte offset just past the last parsed line
+            fingerprint (str): Fingerprint of the first bytes of the file
+            aggregates (LogAggregates): Aggregates of everything before offset
+        """
+        os.makedirs(self.root, exist_ok=True)
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "log_path": os.path.abspath(log_path),
+            "offset": offset,
+            "fingerprint_bytes": min(offset, _FINGERPRINT_BYTES),
+            "fingerprint": fingerprint,
+            "aggregates": aggregates.to_dict(),
+        }
+        path = self.checkpoint_path(log_path)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+
+    def delete(self, log_path: str) -> None:
+        """Forget the checkpoint of a log path."""
+        try:
+            os.remove(self.checkpoint_path(log_path))
+        except FileNotFoundError:
+            pass
+
+    def analyze(self, log_path: str) -> Tuple[LogAggregates, dict]:
+        """
+        Bring the aggregates of a log file up to date, parsing only what was appended.
+
+        A trailing line without a newline is treated as still being written and is
+        left for the next run.
+
+        Args:
+            log_path (str): The log file
+
+        Returns:
+            Tuple[LogAggregates, dict]: The aggregates of the whole file, and statistics
+                                        about the run (resumed offset, parsed bytes and lines)
+        """
+        checkpoint = self.load(log_path)
+        with open(log_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            aggregates = LogAggregates()
+            start = 0
+            if checkpoint is not None and checkpoint["offset"] <= size:
+                # The file must still start with the bytes it started with last time
+                if _fingerprint(f, checkpoint["fingerprint_bytes"]) == checkpoint["fingerprint"]:
+                    aggregates = LogAggregates.from_dict(checkpoint["aggregates"])
+                    start = checkpoint["offset"]
+            resumed = checkpoint is not None and start > 0
+
+            end = _last_line_end(f, start, size)
+            parsed = LogAggregates()
+            if end > start:
+                f.seek(start)
+                tail = io.BufferedReader(_BoundedReader(f, end))
+                for chunk in iter_log_chunks(tail):
+                    parsed.update(chunk)
+            aggregates.merge(parsed)
+
+            fingerprint_bytes = min(end, _FINGERPRINT_BYTES)
+            fingerprint = _fingerprint(f, fingerprint_bytes)
+
+        self.save(log_path, end, fingerprint, aggregates)
+        return aggregates, {
+            "resumed": resumed,
+            "resumed_from_offset": start,
+            "parsed_bytes": end - start,
+            "parsed_lines": parsed.total_lines,
+            "offset": end,
+        }
+
+
+log_checkpoints = LogCheckpointStore()
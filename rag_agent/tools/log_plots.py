@@ -0,0 +1,301 @@
+"""
+Plot rendering for analyze_logs.
+
+Each plot is described by a job: the name of a plot function from PLOT_FUNCTIONS, the
+output path and the (picklable) data to draw. Jobs are rendered either in the calling
+process or on a shared process pool, one figure per worker, so PNG encoding does not
+add to the latency of the tool call. Rendering always uses the non-interactive Agg
+backend.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Optional, Tuple
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.dates as mdates  # noqa: E402
+import matplotlib.pyplot as plt  # noqa: E402
+import pandas as pd  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+from ..config import PLOT_RENDER_WORKERS, PLOT_STATUS_HISTORY  # noqa: E402
+
+# A plot job: (plot function name, output path, positional data arguments)
+PlotJob = Tuple[str, str, tuple]
+
+
+def plot_error_trends(error_trends: pd.Series, path: str) -> None:
+    plt.figure(figsize=(10, 5))
+    error_trends.plot(kind='line', marker='o', color='red')
+    plt.title('Error Trends by Hour')
+    plt.xlabel('Hour of Day')
+    plt.ylabel('Number of Errors')
+    plt.grid()
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_error_distribution(error_distribution: pd.Series, path: str) -> None:
+    plt.figure(figsize=(8, 8))
+    error_distribution.plot(kind='pie', autopct='%1.1f%%', startangle=90, colormap='Reds')
+    plt.title('Error Distribution by Type')
+    plt.ylabel('')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_error_heatmap(heatmap_data: pd.DataFrame, path: str) -> None:
+    plt.figure(figsize=(12, 6))
+    sns.heatmap(heatmap_data, cmap='Reds', annot=True, fmt='d')
+    plt.title('Error Heatmap by Day and Hour')
+    plt.xlabel('Hour of Day')
+    plt.ylabel('Day of Week')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_unauth_users(unauth_users: pd.Series, path: str) -> None:
+    plt.figure(figsize=(10, 6))
+    unauth_users.plot(kind='bar', color='orange')
+    plt.title('Unauthenticated Users')
+    plt.xlabel('User')
+    plt.ylabel('Number of Failed Logins')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def _plot_density(counts: pd.Series, width: str, color: str) -> None:
+    # One vectorized step line per bucket, however many events the buckets hold
+    plt.fill_between(counts.index, counts.to_numpy(), step='post', color=color, alpha=0.3)
+    plt.step(counts.index, counts.to_numpy(), where='post', color=color)
+    plt.ylabel(f'Events per {width}')
+    plt.ylim(bottom=0)
+
+
+def plot_timeline(counts: pd.Series, width: str, path: str) -> None:
+    plt.figure(figsize=(15, 5))
+    _plot_density(counts, width, 'blue')
+    plt.xlabel('Time')
+    plt.title('Log Event Timeline')
+    plt.grid(True)
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_unauthorized_timeline(
+    counts: pd.Series, width: str, timestamps, labels, path: str
+) -> None:
+    plt.figure(figsize=(15, 5))
+    _plot_density(counts, width, 'red')
+    # Only the annotation budget's worth of events get a marker and a label
+    top = counts.max() if len(counts) else 1
+    plt.plot(timestamps, [top] * len(timestamps), 'ro', label='Unauthorized Event')
+    for timestamp, label in zip(timestamps, labels):
+        plt.text(timestamp, top * 1.02, label, rotation=45, fontsize=8, ha='left', va='bottom')
+    # Leave headroom above the density for the rotated labels
+    plt.ylim(top=top * 2.5)
+    plt.xlabel('Time')
+    plt.title('Unauthorized Events Timeline')
+    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d\n%H:%M:%S'))
+    plt.grid(True, axis='x')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_no_data(kind: str, path: str) -> None:
+    """Draw a placeholder for a plot whose data is empty (e.g. a log without errors)."""
+    plt.figure(figsize=(8, 3))
+    plt.text(0.5, 0.5, f"No data for {kind.replace('_', ' ')}", ha='center', va='center', fontsize=14)
+    plt.axis('off')
+    plt.savefig(path)
+    plt.close()
+
+
+def _has_data(data: tuple) -> bool:
+    # Series and frames that are empty or all zero have nothing to draw (a pie of
+    # zeros, a bar chart without bars) and make the plot functions raise
+    for arg in data:
+        if isinstance(arg, (pd.Series, pd.DataFrame)):
+            if arg.empty or not arg.to_numpy().any():
+                return False
+    return True
+
+
+PLOT_FUNCTIONS = {
+    "error_trends": plot_error_trends,
+    "error_distribution": plot_error_distribution,
+    "error_heatmap": plot_error_heatmap,
+    "unauth_users": plot_unauth_users,
+    "timeline": plot_timeline,
+    "unauthorized_timeline": plot_unauthorized_timeline,
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Background renders still running, by output path, so callers can wait for them
+_pending: Dict[str, Future] = {}
+# Outcome of the most recent finished renders, by output path
+_finished: "OrderedDict[str, str]" = OrderedDict()
+_status_lock = threading.Lock()
+
+
+def render_plot(kind: str, path: str, data: tuple) -> str:
+    """
+    Render one plot job and return its output path.
+
+    Args:
+        kind (str): A key of PLOT_FUNCTIONS
+        path (str): The PNG file to write
+        data (tuple): Positional arguments for the plot function, before the path
+
+    Returns:
+        str: The output path
+    """
+    if _has_data(data):
+        PLOT_FUNCTIONS[kind](*data, path)
+    else:
+        plot_no_data(kind, path)
+    return path
+
+
+def _get_pool(replace_broken: bool = False) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is not None and replace_broken:
+            # A worker died (e.g. killed for memory); start over with a fresh pool
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            # spawn rather than fork: the agent process runs threads (ADK, tool
+            # executors) that a forked child would inherit in an undefined state
+            _pool = ProcessPoolExecutor(
+                max_workers=PLOT_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _render_outcome(future: Future) -> str:
+    if future.cancelled():
+        return "error: cancelled"
+    if future.exception() is not None:
+        return f"error: {future.exception()}"
+    return "done"
+
+
+def _remember(path: str, outcome: str) -> None:
+    # Called with _status_lock held
+    _finished[path] = outcome
+    _finished.move_to_end(path)
+    while len(_finished) > PLOT_STATUS_HISTORY:
+        _finished.popitem(last=False)
+
+
+def _on_render_done(path: str, future: Future) -> None:
+    outcome = _render_outcome(future)
+    if outcome != "done":
+        logging.error(f"Error rendering plot {path}: {outcome[len('error: '):]}")
+    with _status_lock:
+        # Only forget the future if a newer render of the same path hasn't replaced it
+        if _pending.get(path) is future:
+            del _pending[path]
+        _remember(path, outcome)
+
+
+def render_plots(jobs: Iterable[PlotJob], background: bool = False) -> Dict[str, str]:
+    """
+    Render plot jobs synchronously or on the shared process pool.
+
+    Args:
+        jobs (Iterable[PlotJob]): The plots to render
+        background (bool): Submit the jobs to the process pool and return without
+                           waiting; use plot_status() or wait_for_plots() to follow them.
+                           Failed synchronous renders are logged and reported by
+                           plot_status() rather than raised
+
+    Returns:
+        Dict[str, str]: Output path by plot kind
+    """
+    paths = {}
+    for kind, path, data in jobs:
+        paths[kind] = path
+        if not background:
+            # One failed plot must not cost the caller its summary or the other plots
+            try:
+                render_plot(kind, path, data)
+                outcome = "done"
+            except Exception as e:
+                plt.close('all')
+                logging.error(f"Error rendering plot {path}: {str(e)}")
+                outcome = f"error: {str(e)}"
+            with _status_lock:
+                _remember(path, outcome)
+            continue
+        try:
+            future = _get_pool().submit(render_plot, kind, path, data)
+        except BrokenProcessPool:
+            future = _get_pool(replace_broken=True).submit(render_plot, kind, path, data)
+        with _status_lock:
+            _pending[path] = future
+            _finished.pop(path, None)
+        # Runs at once if the render already finished
+        future.add_done_callback(lambda done, path=path: _on_render_done(path, done))
+    return paths
+
+
+def plot_status(paths: Iterable[str]) -> Dict[str, str]:
+    """
+    Report the state of background renders.
+
+    Args:
+        paths (Iterable[str]): Output paths returned by render_plots()
+
+    Returns:
+        Dict[str, str]: "pending", "done", "error: <reason>" or "unknown" by path;
+                        a path no longer tracked is "done" if its file exists
+    """
+    status = {}
+    with _status_lock:
+        for path in paths:
+            future = _pending.get(path)
+            if future is not None:
+                status[path] = _render_outcome(future) if future.done() else "pending"
+            elif path in _finished:
+                status[path] = _finished[path]
+            else:
+                status[path] = "done" if os.path.isfile(path) else "unknown"
+    return status
+
+
+def wait_for_plots(paths: Iterable[str], timeout: Optional[float] = None) -> Dict[str, str]:
+    """
+    Block until the given background renders finish or the timeout expires.
+
+    Args:
+        paths (Iterable[str]): Output paths returned by render_plots()
+        timeout (float): Maximum number of seconds to wait
+
+    Returns:
+        Dict[str, str]: The plot_status() of each path after waiting
+    """
+    paths = list(paths)
+    with _status_lock:
+        futures = [_pending[path] for path in paths if path in _pending]
+    wait(futures, timeout=timeout)
+    return plot_status(paths)
@@ -0,0 +1,345 @@
+"""
+Drain-style template mining and compaction of log files before they are embedded.
+
+Lines are masked (numbers, hex, IPs, UUIDs, e-mail addresses) and clustered into
+templates with a fixed-depth parse tree: the first level splits on token count,
+the next levels on the leading tokens, and a leaf holds the templates compared by
+token similarity. Every line joins the most similar template above the similarity
+threshold, turning the tokens they disagree on into <*>, or starts a new one.
+
+A compacted log holds one record per template: its count, time range, an example
+line and the first line numbers it covers. The line numbers of every template are
+kept in an index next to the compacted file and a compressed copy of the original,
+so the original lines stay retrievable with read_template_lines().
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+
+from ..config import (
+    LOG_TEMPLATE_DEPTH,
+    LOG_TEMPLATE_DIR,
+    LOG_TEMPLATE_MAX_CHILDREN,
+    LOG_TEMPLATE_REFS_LISTED,
+    LOG_TEMPLATE_SIMILARITY,
+)
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = "<*>"
+INDEX_VERSION = 2
+# Compressed copy of the original log, kept with each template index
+ORIGINAL_NAME = "original.log.gz"
+
+# Variable parts masked before clustering, most specific first
+_MASKS = [
+    re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"),
+    re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"),
+    re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b"),
+    re.compile(r"\b0x[0-9a-fA-F]+\b"),
+    re.compile(r"(?<![\w.])[-+]?\d+(?:\.\d+)?(?![\w.])"),
+]
+
+
+def _mask(message: str) -> List[str]:
+    for pattern in _MASKS:
+        message = pattern.sub(WILDCARD, message)
+    return message.split()
+
+
+def _split_line(line: str):
+    """Split a timestamp|level|message line; other lines are all message."""
+    parts = line.split("|", 2)
+    if len(parts) == 3:
+        return parts[0].strip(), parts[1].strip().upper(), parts[2].strip()
+    return None, None, line.strip()
+
+
+class LogTemplate:
+    """
+    One mined template and the lines it covers.
+    """
+
+    def __init__(self, template_id: str, tokens: List[str], level: Optional[str]):
+        self.template_id = template_id
+        self.tokens = tokens
+        self.level = level
+        self.count = 0
+        self.first_seen: Optional[str] = None
+        self.last_seen: Optional[str] = None
+        self.example: Optional[str] = None
+        # Covered line numbers as [first, last] runs of consecutive lines
+        self.runs: List[List[int]] = []
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def add(self, line_number: int, timestamp: Optional[str], line: str) -> None:
+        self.count += 1
+        if self.example is None:
+            self.example = line
+        if timestamp:
+            # Timestamps are compared as text; the log format sorts lexically
+            if self.first_seen is None or timestamp < self.first_seen:
+                self.first_seen = timestamp
+            if self.last_seen is None or timestamp > self.last_seen:
+                self.last_seen = timestamp
+        if self.runs and self.runs[-1][1] == line_number - 1:
+            self.runs[-1][1] = line_number
+        else:
+            self.runs.append([line_number, line_number])
+
+    def similarity(self, tokens: List[str]) -> float:
+        # As in Drain's simSeq, a template wildcard matches any token
+        if not tokens:
+            return 1.0
+        same = sum(1 for a, b in zip(self.tokens, tokens) if a == b or a == WILDCARD)
+        return same / len(tokens)
+
+    def merge(self, tokens: List[str]) -> None:
+        self.tokens = [a if a == b else WILDCARD for a, b in zip(self.tokens, tokens)]
+
+
+class _Node:
+    __slots__ = ("children", "templates")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.templates: List[LogTemplate] = []
+
+
+class LogTemplateMiner:
+    """
+    Incremental Drain parse tree.
+
+    Args:
+        depth (int): Tree depth, including the token-count level and the leaves
+        similarity (float): Minimum share of equal tokens for a line to join a template
+        max_children (int): Children per tree node before new tokens fall under <*>
+    """
+
+    def __init__(
+        self,
+        depth: int = LOG_TEMPLATE_DEPTH,
+        similarity: float = LOG_TEMPLATE_SIMILARITY,
+        max_children: int = LOG_TEMPLATE_MAX_CHILDREN,
+    ):
+        self.depth = max(3, depth)
+        self.similarity = similarity
+        self.max_children = max_children
+        self.root = _Node()
+        self.templates: List[LogTemplate] = []
+        self.lines = 0
+
+    def _leaf(self, level: Optional[str], tokens: List[str]) -> _Node:
+        node = self.root.children.setdefault(f"{level}:{len(tokens)}", _Node())
+        for token in tokens[: self.depth - 2]:
+            key = WILDCARD if any(char.isdigit() for char in token) else token
+            if key not in node.children and len(node.children) >= self.max_children:
+                key = WILDCARD
+            node = node.children.setdefault(key, _Node())
+        return node
+
+    def add_line(self, line: str) -> LogTemplate:
+        """
+        Assign the next line of the log to a template.
+
+        Returns:
+            LogTemplate: The template the line now belongs to
+        """
+        self.lines += 1
+        timestamp, level, message = _split_line(line)
+        tokens = _mask(message)
+        leaf = self._leaf(level, tokens)
+        best, best_similarity = None, -1.0
+        for template in leaf.templates:
+            similarity = template.similarity(tokens)
+            if similarity > best_similarity:
+                best, best_similarity = template, similarity
+        if best is not None and best_similarity >= self.similarity:
+            best.merge(tokens)
+        else:
+            best = LogTemplate(f"T{len(self.templates) + 1}", tokens, level)
+            leaf.templates.append(best)
+            self.templates.append(best)
+        best.add(self.lines, timestamp, line)
+        return best
+
+
+def _format_runs(runs: List[List[int]], limit: int) -> str:
+    parts, listed = [], 0
+    for first, last in runs:
+        if listed >= limit:
+            break
+        parts.append(str(first) if first == last else f"{first}-{last}")
+        listed += last - first + 1
+    covered = sum(last - first + 1 for first, last in runs)
+    more = f" (+{covered - listed} more)" if covered > listed else ""
+    return ",".join(parts) + more
+
+
+def _template_dir(log_ref: str) -> str:
+    return os.path.join(LOG_TEMPLATE_DIR, log_ref)
+
+
+def compact_log_file(path: str) -> Optional[dict]:
+    """
+    Mine the templates of a local log file and write its compacted form.
+
+    The original is copied (gzip-compressed) next to the compacted file and the
+    template index, in a LOG_TEMPLATE_DIR directory named after the hash of its
+    content. The "log_ref" of that directory is what the compacted records refer
+    to, so their lines stay readable after the source file rotates or changes, and
+    compacting the same content again reuses it. Nothing is kept if the compacted
+    form would not be smaller than the original.
+
+    Args:
+        path (str): The local log file
+
+    Returns:
+        Optional[dict]: "output_path" of the compacted file, its "log_ref", and the
+                        line, template and byte counts of the compaction; None if
+                        the file does not compact
+    """
+    local_path = os.path.abspath(os.path.expanduser(path))
+    os.makedirs(LOG_TEMPLATE_DIR, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=".tmp-", dir=LOG_TEMPLATE_DIR)
+    try:
+        # One pass: hash the content, keep a copy of it and mine its lines
+        digest = hashlib.blake2b(digest_size=16)
+        miner = LogTemplateMiner()
+        bytes_in = 0
+        with open(local_path, "rb") as source, gzip.open(
+            os.path.join(work_dir, ORIGINAL_NAME), "wb"
+        ) as original:
+            for raw in source:
+                digest.update(raw)
+                original.write(raw)
+                bytes_in += len(raw)
+                miner.add_line(raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+        log_ref = digest.hexdigest()
+
+        output_path = os.path.join(work_dir, os.path.basename(local_path))
+        with open(output_path, "w", encoding="utf-8") as out:
+            out.write(
+                f"# Compacted log of file://{local_path} (log_ref {log_ref}): {miner.lines} lines in "
+                f"{len(miner.templates)} templates; <*> marks variable values. "
+                f"Original lines: get_log_template_lines(log_ref, template_id)\n\n"
+            )
+            for template in miner.templates:
+                time_range = ""
+                if template.first_seen:
+                    time_range = f" | {template.first_seen} .. {template.last_seen}"
+                out.write(
+                    f"[{template.template_id}] {template.count} lines"
+                    f" | {template.level or '-'}{time_range}\n"
+                    f"template: {template.template}\n"
+                    f"example: {template.example}\n"
+                    f"ref: log_ref={log_ref} template={template.template_id} "
+                    f"lines={_format_runs(template.runs, LOG_TEMPLATE_REFS_LISTED)}\n\n"
+                )
+        bytes_out = os.path.getsize(output_path)
+        if bytes_out >= bytes_in:
+            # Mostly unique lines: the records would only add overhead
+            return None
+
+        index = {
+            "version": INDEX_VERSION,
+            "log_ref": log_ref,
+            "source_uri": f"file://{local_path}",
+            "lines": miner.lines,
+            "templates": {
+                template.template_id: {
+                    "template": template.template,
+                    "level": template.level,
+                    "count": template.count,
+                    "first_seen": template.first_seen,
+                    "last_seen": template.last_seen,
+                    "runs": template.runs,
+                }
+                for template in miner.templates
+            },
+        }
+        with open(os.path.join(work_dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(index, f)
+
+        directory = _template_dir(log_ref)
+        try:
+            os.rename(work_dir, directory)
+        except OSError:
+            # Same content compacted before (or concurrently): keep the existing copy
+            if not os.path.exists(os.path.join(directory, "index.json")):
+                raise
+        output_name = os.path.basename(local_path)
+        if not os.path.exists(os.path.join(directory, output_name)):
+            # Same content under another file name
+            shutil.copyfile(output_path, os.path.join(directory, output_name))
+        return {
+            "output_path": os.path.join(directory, output_name),
+            "log_ref": log_ref,
+            "lines": miner.lines,
+            "templates": len(miner.templates),
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "ratio": round(bytes_out / bytes_in, 3) if bytes_in else None,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def load_template_index(log_ref: str) -> Optional[dict]:
+    """Return the template index of a compacted log, or None if there is none."""
+    if not re.fullmatch(r"[0-9a-f]{32}", log_ref or ""):
+        return None
+    try:
+        with open(os.path.join(_template_dir(log_ref), "index.json"), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get("version") == INDEX_VERSION else None
+
+
+def read_template_lines(index: dict, template_id: str, offset: int, limit: int) -> List[dict]:
+    """
+    Read original lines of one template from the copy kept with its index.
+
+    Args:
+        index (dict): The index returned by load_template_index()
+        template_id (str): The template, e.g. "T3"
+        offset (int): The number of the template's lines to skip
+        limit (int): The maximum number of lines returned
+
+    Returns:
+        List[dict]: {"line_number", "line"} in file order
+    """
+    wanted = []
+    for first, last in index["templates"][template_id]["runs"]:
+        if offset > last - first:
+            offset -= last - first + 1
+            continue
+        wanted.extend(range(first + offset, min(last + 1, first + offset + limit - len(wanted))))
+        offset = 0
+        if len(wanted) >= limit:
+            break
+    if not wanted:
+        return []
+
+    lines, targets = [], iter(wanted)
+    target = next(targets)
+    original_path = os.path.join(_template_dir(index["log_ref"]), ORIGINAL_NAME)
+    with gzip.open(original_path, "rt", encoding="utf-8", errors="replace") as f:
+        for line_number, line in enumerate(f, start=1):
+            if line_number == target:
+                lines.append({"line_number": line_number, "line": line.rstrip("\r\n")})
+                target = next(targets, None)
+                if target is None:
+                    break
+    return lines
@@ -3,17 +3,88 @@ Tool for querying Vertex AI RAG corpora and retrieving relevant information.
 """
 
 import logging
+from typing import List, Tuple
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
 
+from ..backends import get_backend
 from ..config import (
     DEFAULT_DISTANCE_THRESHOLD,
     DEFAULT_TOP_K,
+    SEMANTIC_CACHE_ENABLED,
 )
+from .result_cache import retrieval_cache
+from .semantic_cache import semantic_cache
 from .utils import check_corpus_exists, get_corpus_resource_name
 
 
+def retrieve_contexts(
+    corpus_resource_name: str,
+    query: str,
+    top_k: int = DEFAULT_TOP_K,
+    distance_threshold: float = DEFAULT_DISTANCE_THRESHOLD,
+) -> Tuple[List[dict], dict]:
+    """
+    Retrieve processed contexts for a query, going through the result caches.
+
+    Args:
+        corpus_resource_name (str): The full resource name of the corpus to query
+        query (str): The text query to search for in the corpus
+        top_k (int): The maximum number of contexts to retrieve
+        distance_threshold (float): The maximum vector distance of a retrieved context
+
+    Returns:
+        Tuple[List[dict], dict]: The results list and cache information
+                                 ("cached", plus "matched_query"/"similarity"
+                                 when served by the semantic cache)
+    """
+    # Serve repeated questions from the result cache
+    cache_key = retrieval_cache.make_key(
+        corpus_resource_name, query, top_k, distance_threshold
+    )
+    results = retrieval_cache.get(cache_key)
+    if results is not None:
+        return results, {"cached": True}
+
+    # Fall back to a paraphrase of a previously answered question
+    if SEMANTIC_CACHE_ENABLED:
+        match = semantic_cache.get(
+            corpus_resource_name, query, top_k, distance_threshold
+        )
+        if match is not None:
+            results, matched_query, similarity = match
+            return results, {
+                "cached": True,
+                "matched_query": matched_query,
+                "similarity": round(similarity, 4),
+            }
+
+    # Results retrieved while the corpus changes must not be cached
+    retrieval_generation = retrieval_cache.generation(corpus_resource_name)
+    semantic_generation = semantic_cache.generation(corpus_resource_name)
+
+    # Perform the query
+    print("Performing retrieval query...")
+    results = get_backend().retrieval_query(
+        corpus_names=[corpus_resource_name],
+        text=query,
+        top_k=top_k,
+        distance_threshold=distance_threshold,
+    )
+
+    retrieval_cache.put(cache_key, results, generation=retrieval_generation)
+    if SEMANTIC_CACHE_ENABLED:
+        semantic_cache.put(
+            corpus_resource_name,
+            query,
+            top_k,
+            distance_threshold,
+            results,
+            generation=semantic_generation,
+        )
+    return results, {"cached": False}
+
+
 def rag_query(
     corpus_name: str,
     query: str,
@@ -45,41 +116,8 @@ def rag_query(
         # Get the corpus resource name
         corpus_resource_name = get_corpus_resource_name(corpus_name)
 
-        # Configure retrieval parameters
-        rag_retrieval_config = rag.RagRetrievalConfig(
-            top_k=DEFAULT_TOP_K,
-            filter=rag.Filter(vector_distance_threshold=DEFAULT_DISTANCE_THRESHOLD),
-        )
-
-        # Perform the query
-        print("Performing retrieval query...")
-        response = rag.retrieval_query(
-            rag_resources=[
-                rag.RagResource(
-                    rag_corpus=corpus_resource_name,
-                )
-            ],
-            text=query,
-            rag_retrieval_config=rag_retrieval_config,
-        )
-
-        # Process the response into a more usable format
-        results = []
-        if hasattr(response, "contexts") and response.contexts:
-            for ctx_group in response.contexts.contexts:
-                result = {
-                    "source_uri": (
-                        ctx_group.source_uri if hasattr(ctx_group, "source_uri") else ""
-                    ),
-                    "source_name": (
-                        ctx_group.source_display_name
-                        if hasattr(ctx_group, "source_display_name")
-                        else ""
-                    ),
-                    "text": ctx_group.text if hasattr(ctx_group, "text") else "",
-                    "score": ctx_group.score if hasattr(ctx_group, "score") else 0.0,
-                }
-                results.append(result)
+        # Retrieve contexts (possibly from cache)
+        results, cache_info = retrieve_contexts(corpus_resource_name, query)
 
         # If we didn't find any results
         if not results:
@@ -90,6 +128,7 @@ def rag_query(
                 "corpus_name": corpus_name,
                 "results": [],
                 "results_count": 0,
+                **cache_info,
             }
 
         return {
@@ -99,6 +138,7 @@ def rag_query(
             "corpus_name": corpus_name,
             "results": results,
             "results_count": len(results),
+            **cache_info,
         }
 
     except Exception as e:
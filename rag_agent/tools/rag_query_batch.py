@@ -0,0 +1,116 @@
+"""
+Tool for running many queries against a Vertex AI RAG corpus concurrently.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..config import DEFAULT_QUERY_CONCURRENCY
+from .rag_query import retrieve_contexts
+from .utils import check_corpus_exists, get_corpus_resource_name
+
+
+def _run_query(corpus_resource_name: str, query: str) -> dict:
+    """Run one query of a batch and time it, capturing errors per query."""
+    started = time.perf_counter()
+    try:
+        results, cache_info = retrieve_contexts(corpus_resource_name, query)
+        outcome = {
+            "query": query,
+            "status": "success" if results else "warning",
+            "results": results,
+            "results_count": len(results),
+            **cache_info,
+        }
+    except Exception as e:
+        logging.error(f"Error querying corpus for '{query}': {str(e)}")
+        outcome = {
+            "query": query,
+            "status": "error",
+            "message": f"Error querying corpus: {str(e)}",
+            "results": [],
+            "results_count": 0,
+        }
+    outcome["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return outcome
+
+
+def rag_query_batch(
+    corpus_name: str,
+    queries: List[str],
+    tool_context: ToolContext,
+    max_concurrency: int = DEFAULT_QUERY_CONCURRENCY,
+) -> dict:
+    """
+    Run several queries against one Vertex AI RAG corpus concurrently.
+
+    Args:
+        corpus_name (str): The name of the corpus to query. If empty, the current corpus will be used.
+                          Preferably use the resource_name from list_corpora results.
+        queries (List[str]): The text queries to run
+        tool_context (ToolContext): The tool context
+        max_concurrency (int): The maximum number of retrievals in flight at once
+
+    Returns:
+        dict: Per-query results and timings in the same order as the input queries
+    """
+    if not queries or not all(isinstance(query, str) for query in queries):
+        return {
+            "status": "error",
+            "message": "Invalid queries: Please provide a list of text queries",
+            "corpus_name": corpus_name,
+        }
+
+    try:
+        # Check if the corpus exists
+        if not check_corpus_exists(corpus_name, tool_context):
+            return {
+                "status": "error",
+                "message": f"Corpus '{corpus_name}' does not exist. Please create it first using the create_corpus tool.",
+                "corpus_name": corpus_name,
+            }
+
+        # Resolve the corpus once for the whole batch
+        corpus_resource_name = get_corpus_resource_name(corpus_name)
+
+        started = time.perf_counter()
+        workers = max(1, min(max_concurrency, len(queries)))
+        print(f"Running {len(queries)} queries with concurrency {workers}...")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map() yields results in input order
+            outcomes = list(
+                executor.map(lambda query: _run_query(corpus_resource_name, query), queries)
+            )
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        failed = sum(1 for outcome in outcomes if outcome["status"] == "error")
+        if failed == len(outcomes):
+            status = "error"
+        elif failed:
+            status = "partial"
+        else:
+            status = "success"
+
+        return {
+            "status": status,
+            "message": f"Ran {len(outcomes)} queries against corpus '{corpus_name}' ({failed} failed)",
+            "corpus_name": corpus_name,
+            "queries_count": len(outcomes),
+            "failed_count": failed,
+            "concurrency": workers,
+            "elapsed_ms": elapsed_ms,
+            "results": outcomes,
+        }
+
+    except Exception as e:
+        error_msg = f"Error running batch query: {str(e)}"
+        logging.error(error_msg)
+        return {
+            "status": "error",
+            "message": error_msg,
+            "corpus_name": corpus_name,
+        }
@@ -0,0 +1,241 @@
+"""
+Tool for querying several Vertex AI RAG corpora at once and merging the results.
+"""
+
+import fnmatch
+import heapq
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Optional, Tuple
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..config import (
+    DEFAULT_DISTANCE_THRESHOLD,
+    DEFAULT_QUERY_CONCURRENCY,
+    DEFAULT_TOP_K,
+    RETRIEVAL_SCORE_IS_DISTANCE,
+)
+from .rag_query import retrieve_contexts
+from .utils import check_corpus_exists, corpus_resolver, get_corpus_resource_name
+
+# Best rank a result can possibly have: distance 0.0 or cosine similarity 1.0
+_BEST_POSSIBLE_RANK = 0.0 if RETRIEVAL_SCORE_IS_DISTANCE else 1.0
+
+
+def _rank(result: dict) -> float:
+    """Map a result score to a rank where higher is always better; no score ranks last."""
+    score = result.get("score")
+    if score is None:
+        return float("-inf")
+    return -float(score) if RETRIEVAL_SCORE_IS_DISTANCE else float(score)
+
+
+def _corpus_threshold(
+    best: List[Tuple[float, int, dict]], top_k: int, distance_threshold: float
+) -> Optional[float]:
+    """
+    Bound the distance a corpus queried now must beat to enter the merged top-k.
+
+    Returns:
+        Optional[float]: The distance threshold to query with, or None when no
+                         result the corpus could return would enter the top-k
+    """
+    if len(best) < top_k:
+        return distance_threshold
+    kth = best[0][0]
+    if kth >= _BEST_POSSIBLE_RANK:
+        return None
+    if RETRIEVAL_SCORE_IS_DISTANCE:
+        # Only results strictly closer than the k-th can still be merged
+        return min(distance_threshold, -kth)
+    return distance_threshold
+
+
+def expand_corpus_names(
+    corpus_names: List[str], tool_context: ToolContext
+) -> Tuple[List[str], List[str]]:
+    """
+    Expand corpus names and glob patterns into existing corpus resource names.
+
+    Args:
+        corpus_names (List[str]): Display names, resource names or glob patterns
+                                  (e.g. "auth-logs-2025-*")
+        tool_context (ToolContext): The tool context
+
+    Returns:
+        Tuple[List[str], List[str]]: The matching resource names without duplicates,
+                                     and the names or patterns that matched nothing
+    """
+    resource_names: List[str] = []
+    missing: List[str] = []
+    for name in corpus_names:
+        if any(char in name for char in "*?["):
+            matches = [
+                resource_name
+                for resource_name, display_name in corpus_resolver.corpora().items()
+                if fnmatch.fnmatchcase(display_name, name)
+                or fnmatch.fnmatchcase(resource_name, name)
+            ]
+        elif check_corpus_exists(name, tool_context):
+            matches = [get_corpus_resource_name(name)]
+        else:
+            matches = []
+
+        if not matches:
+            missing.append(name)
+        for resource_name in matches:
+            if resource_name not in resource_names:
+                resource_names.append(resource_name)
+    return resource_names, missing
+
+
+def rag_query_multi(
+    corpus_names: List[str],
+    query: str,
+    tool_context: ToolContext,
+    top_k: int = DEFAULT_TOP_K,
+    max_concurrency: int = DEFAULT_QUERY_CONCURRENCY,
+    distance_threshold: float = DEFAULT_DISTANCE_THRESHOLD,
+) -> dict:
+    """
+    Query several Vertex AI RAG corpora in parallel and return the global top-k results.
+
+    Corpora are queried max_concurrency at a time. Once top_k results are merged,
+    corpora queried later only ask for results closer than the current k-th one,
+    and are skipped when nothing they could return would enter the top-k.
+
+    Args:
+        corpus_names (List[str]): Names of the corpora to query. Glob patterns such as
+                                  "payments-*" are matched against corpus display names.
+        query (str): The text query to search for in the corpora
+        tool_context (ToolContext): The tool context
+        top_k (int): The number of results to return across all corpora
+        max_concurrency (int): The maximum number of corpora queried at once
+        distance_threshold (float): The maximum vector distance of a retrieved context
+
+    Returns:
+        dict: The merged results ordered best-first, with per-corpus statistics
+    """
+    try:
+        if not corpus_names or not all(isinstance(name, str) for name in corpus_names):
+            return {
+                "status": "error",
+                "message": "Invalid corpus_names: Please provide a list of corpus names or patterns",
+                "query": query,
+            }
+        if top_k < 1:
+            return {
+                "status": "error",
+                "message": "Invalid top_k: Please provide a number of results of at least 1",
+                "query": query,
+            }
+
+        resource_names, missing = expand_corpus_names(corpus_names, tool_context)
+        if not resource_names:
+            return {
+                "status": "error",
+                "message": f"No corpora matched {corpus_names}",
+                "query": query,
+                "missing_corpora": missing,
+            }
+
+        started = time.perf_counter()
+        # Min-heap of the best top_k results seen so far; heap[0] is the current k-th
+        best: List[Tuple[float, int, dict]] = []
+        sequence = 0
+        per_corpus = {name: {"status": "pending"} for name in resource_names}
+        early_stopped = False
+
+        def query_corpus(resource_name: str, threshold: float) -> Tuple[str, List[dict], float]:
+            corpus_started = time.perf_counter()
+            results, _ = retrieve_contexts(
+                resource_name, query, top_k=top_k, distance_threshold=threshold
+            )
+            return resource_name, results, time.perf_counter() - corpus_started
+
+        workers = max(1, min(max_concurrency, len(resource_names)))
+        print(f"Querying {len(resource_names)} corpora with concurrency {workers}...")
+        queue = list(reversed(resource_names))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            while queue or pending:
+                # Submit lazily so each corpus is queried with the tightest bound known
+                while queue and len(pending) < workers:
+                    resource_name = queue.pop()
+                    threshold = _corpus_threshold(best, top_k, distance_threshold)
+                    if threshold is None:
+                        per_corpus[resource_name] = {"status": "skipped"}
+                        early_stopped = True
+                        continue
+                    per_corpus[resource_name]["distance_threshold"] = threshold
+                    pending[executor.submit(query_corpus, resource_name, threshold)] = resource_name
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    resource_name = pending.pop(future)
+                    threshold = per_corpus[resource_name]["distance_threshold"]
+                    try:
+                        _, results, elapsed = future.result()
+                    except Exception as e:
+                        logging.error(f"Error querying corpus {resource_name}: {str(e)}")
+                        per_corpus[resource_name] = {
+                            "status": "error",
+                            "message": str(e),
+                        }
+                        continue
+
+                    merged = 0
+                    for result in sorted(results, key=_rank, reverse=True):
+                        rank = _rank(result)
+                        if len(best) == top_k:
+                            # Sorted best-first: nothing further in this corpus can beat the k-th
+                            if rank <= best[0][0]:
+                                break
+                            heapq.heapreplace(best, (rank, sequence, {**result, "corpus": resource_name}))
+                        else:
+                            heapq.heappush(best, (rank, sequence, {**result, "corpus": resource_name}))
+                        sequence += 1
+                        merged += 1
+                    per_corpus[resource_name] = {
+                        "status": "success",
+                        "results_count": len(results),
+                        "merged_count": merged,
+                        "distance_threshold": threshold,
+                        "elapsed_ms": round(elapsed * 1000, 2),
+                    }
+
+        results = [entry[2] for entry in sorted(best, key=lambda entry: (-entry[0], entry[1]))]
+        failed = [name for name, stats in per_corpus.items() if stats["status"] == "error"]
+        if len(failed) == len(resource_names):
+            status = "error"
+        elif not results:
+            status = "warning"
+        else:
+            status = "success"
+
+        return {
+            "status": status,
+            "message": f"Queried {len(resource_names)} corpora, {len(failed)} failed",
+            "query": query,
+            "corpora": resource_names,
+            "missing_corpora": missing,
+            "results": results,
+            "results_count": len(results),
+            "per_corpus": per_corpus,
+            "early_stopped": early_stopped,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    except Exception as e:
+        error_msg = f"Error querying corpora: {str(e)}"
+        logging.error(error_msg)
+        return {
+            "status": "error",
+            "message": error_msg,
+            "query": query,
+            "corpus_names": corpus_names,
+        }
@@ -0,0 +1,190 @@
+"""
+Tool for reading part of a corpus file: its head, its tail, a line range or a byte range.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+from google.adk.tools.tool_context import ToolContext
+
+from ..config import FILE_READ_MAX_BYTES, FILE_READ_MAX_LINES
+from .file_cache import CachedFile, file_cache
+from .get_log_content_by_filename import find_corpus_file
+from .utils import check_corpus_exists
+
+READ_MODES = ("head", "tail", "lines", "bytes")
+# Lines scanned per read while looking for lines of the requested level
+_FILTER_WINDOW_LINES = 10000
+
+
+def _line_level(line: str) -> str:
+    parts = line.split("|", 2)
+    return parts[1].strip().upper() if len(parts) > 1 else ""
+
+
+def _filter_lines(
+    cached: CachedFile, start: int, end: int, level: str, limit: int, from_end: bool
+) -> Tuple[List[int], List[str]]:
+    """
+    Collect up to limit lines of the given level from lines [start, end).
+
+    The range is scanned window by window, backwards when from_end is set, so a
+    tail read of a large file stops as soon as enough matching lines are found.
+    """
+    numbers: List[int] = []
+    lines: List[str] = []
+    windows = range(end, start, -_FILTER_WINDOW_LINES) if from_end else range(
+        start, end, _FILTER_WINDOW_LINES
+    )
+    for bound in windows:
+        lo, hi = (max(start, bound - _FILTER_WINDOW_LINES), bound) if from_end else (
+            bound, min(end, bound + _FILTER_WINDOW_LINES)
+        )
+        matches = [
+            (lo + i, line)
+            for i, line in enumerate(cached.read_lines(lo, hi))
+            if _line_level(line) == level
+        ]
+        if from_end:
+            matches = matches[::-1]
+        for number, line in matches[: limit - len(numbers)]:
+            numbers.append(number)
+            lines.append(line)
+        if len(numbers) >= limit:
+            break
+    if from_end:
+        numbers.reverse()
+        lines.reverse()
+    return numbers, lines
+
+
+def read_corpus_file(
+    filename: str,
+    corpus_name: str,
+    tool_context: ToolContext,
+    mode: str = "tail",
+    n: int = 100,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    level: Optional[str] = None,
+) -> dict:
+    """
+    Read part of a file from a RAG corpus instead of its whole content.
+
+    The file is fetched once into a local cache together with an index of its line
+    offsets; every later read seeks straight to the requested range.
+
+    Args:
+        filename (str): The file's display name or resource name
+        corpus_name (str): The name of the corpus containing the file
+        tool_context (ToolContext): The tool context
+        mode (str): "head" (first n lines), "tail" (last n lines), "lines" (lines
+            start to end, 1-based and inclusive) or "bytes" (bytes start to end,
+            0-based and exclusive)
+        n (int): The number of lines for head and tail
+        start (int): First line or byte of the range for the lines and bytes modes
+        end (int): Last line or end byte of the range; defaults to the end of the file
+        level (str): Only return lines of this log level, e.g. "ERROR" (line modes only)
+
+    Returns:
+        dict: The requested content and its position within the file
+    """
+    try:
+        if mode not in READ_MODES:
+            return {
+                "status": "error",
+                "message": f"Invalid mode '{mode}'. Use one of: {', '.join(READ_MODES)}",
+            }
+        if level and mode == "bytes":
+            return {
+                "status": "error",
+                "message": "The level filter only applies to the head, tail and lines modes",
+            }
+        if not check_corpus_exists(corpus_name, tool_context):
+            return {
+                "status": "error",
+                "message": f"Corpus '{corpus_name}' does not exist",
+                "corpus_name": corpus_name,
+            }
+        try:
+            record = find_corpus_file(filename, corpus_name)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+
+        cached = file_cache.get(record)
+        result = {
+            "status": "success",
+            "filename": record.display_name or record.name,
+            "mode": mode,
+            "total_lines": cached.line_count,
+            "total_bytes": cached.size,
+        }
+
+        if mode == "bytes":
+            first = max(0, start or 0)
+            last = cached.size if end is None else min(end, cached.size)
+            truncated = last - first > FILE_READ_MAX_BYTES
+            last = min(last, first + FILE_READ_MAX_BYTES)
+            data = cached.read_bytes(first, last)
+            result.update(
+                content=data.decode("utf-8", errors="replace"),
+                start=first,
+                end=first + len(data),
+                truncated=truncated,
+            )
+            return result
+
+        # Resolve the mode to a 0-based, end-exclusive line range
+        if mode == "lines":
+            lo = max(0, (start or 1) - 1)
+            hi = cached.line_count if end is None else min(end, cached.line_count)
+            wanted = max(0, hi - lo)
+        else:
+            lo, hi = 0, cached.line_count
+            wanted = max(0, n)
+        limit = min(wanted, FILE_READ_MAX_LINES)
+        from_end = mode == "tail"
+
+        if level:
+            numbers, lines = _filter_lines(
+                cached, lo, hi, level.strip().upper(), limit, from_end=from_end
+            )
+            truncated = wanted > limit and len(numbers) >= limit
+        else:
+            lo, hi = (max(lo, hi - limit), hi) if from_end else (lo, min(hi, lo + limit))
+            numbers = list(range(lo, hi))
+            lines = cached.read_lines(lo, hi)
+            truncated = wanted > limit and limit < cached.line_count
+
+        # Keep the response small even when individual lines are very long; a
+        # tail read drops lines from the front, the other modes from the back
+        size = 0
+        order = range(len(lines) - 1, -1, -1) if from_end else range(len(lines))
+        for kept, index in enumerate(order):
+            size += len(lines[index]) + 1
+            if size > FILE_READ_MAX_BYTES:
+                keep = slice(len(lines) - kept, None) if from_end else slice(0, kept)
+                lines, numbers = lines[keep], numbers[keep]
+                truncated = True
+                break
+        if level:
+            result["line_numbers"] = [number + 1 for number in numbers]
+
+        result.update(
+            content="\n".join(lines),
+            first_line=numbers[0] + 1 if numbers else None,
+            last_line=numbers[-1] + 1 if numbers else None,
+            returned_lines=len(lines),
+            truncated=truncated,
+        )
+        if level:
+            result["level"] = level.strip().upper()
+        return result
+
+    except Exception as e:
+        error_msg = f"Error reading corpus file: {str(e)}"
+        logging.error(error_msg)
+        return {
+            "status": "error",
+            "message": error_msg,
+        }
@@ -0,0 +1,181 @@
+"""
+Exact-match cache for processed RAG retrieval results.
+"""
+
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from ..config import (
+    RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_TTL_SECONDS,
+)
+
+CacheKey = Tuple[str, str, int, float]
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query so trivially different spellings share a cache entry.
+
+    Args:
+        query (str): The raw query text
+
+    Returns:
+        str: The query lower-cased with surrounding and repeated whitespace collapsed
+    """
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+def _estimate_size(obj) -> int:
+    """Approximate the in-memory size of a results list in bytes."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_estimate_size(k) + _estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_estimate_size(item) for item in obj)
+    return size
+
+
+class RetrievalResultCache:
+    """
+    LRU + TTL cache of processed retrieval results.
+
+    Entries are keyed on (corpus resource name, normalized query, top_k,
+    distance threshold) and can be invalidated per corpus when its contents change.
+    Every invalidation bumps the corpus's generation; a put() made with the
+    generation read before its retrieval is dropped if the corpus changed meanwhile.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> (stored_at, size_bytes, results)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, int, List[dict]]]" = OrderedDict()
+        self._bytes = 0
+        # Invalidation count per corpus; corpora never invalidated are at 0
+        self._generations: Dict[str, int] = {}
+
+    @staticmethod
+    def make_key(
+        corpus_resource_name: str, query: str, top_k: int, distance_threshold: float
+    ) -> CacheKey:
+        return (
+            corpus_resource_name,
+            normalize_query(query),
+            int(top_k),
+            float(distance_threshold),
+        )
+
+    def _discard(self, key: CacheKey) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: CacheKey) -> Optional[List[dict]]:
+        """
+        Look up cached results.
+
+        Args:
+            key (CacheKey): A key built with make_key()
+
+        Returns:
+            Optional[List[dict]]: A copy of the cached results, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] >= self.ttl_seconds:
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(result) for result in entry[2]]
+
+    def generation(self, corpus_resource_name: str) -> int:
+        """Return the corpus's generation, to pass to put() after the retrieval."""
+        with self._lock:
+            return self._generations.get(corpus_resource_name, 0)
+
+    def put(self, key: CacheKey, results: List[dict], generation: Optional[int] = None) -> None:
+        """
+        Store processed results, evicting the least recently used entries if full.
+
+        Args:
+            key (CacheKey): A key built with make_key()
+            results (List[dict]): The processed results list returned by rag_query
+            generation (int): The corpus generation read before the retrieval; the
+                              results are dropped if the corpus was invalidated since
+        """
+        if self.max_entries <= 0:
+            return
+        stored = [dict(result) for result in results]
+        size = _estimate_size(stored)
+        with self._lock:
+            if generation is not None and self._generations.get(key[0], 0) != generation:
+                return
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (time.monotonic(), size, stored)
+            self._bytes += size
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_corpus(self, corpus_resource_name: str) -> int:
+        """
+        Drop every entry belonging to a corpus.
+
+        Args:
+            corpus_resource_name (str): The full resource name of the corpus
+
+        Returns:
+            int: The number of entries removed
+        """
+        with self._lock:
+            self._generations[corpus_resource_name] = self._generations.get(corpus_resource_name, 0) + 1
+            stale = [key for key in self._entries if key[0] == corpus_resource_name]
+            for key in stale:
+                self._discard(key)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report cache effectiveness and footprint.
+
+        Returns:
+            dict: Hit/miss counters, hit ratio, entry count and approximate bytes held
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+# Shared by all tools in this process
+retrieval_cache = RetrievalResultCache()
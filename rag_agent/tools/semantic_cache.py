@@ -0,0 +1,274 @@
+"""
+Near-duplicate query cache for RAG retrieval results.
+
+Queries are embedded with a local embedder and kept in a compact float32 matrix
+per (corpus, top_k, distance threshold). A new query is answered from the cache
+when its cosine similarity to a stored query exceeds the configured threshold
+and both carry the same numbers and identifiers (host names, dates, codes): the
+embedding alone scores "errors on server-1" and "errors on server-2" as close.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import (
+    SEMANTIC_CACHE_EMBEDDING_DIM,
+    SEMANTIC_CACHE_MAX_CORPORA,
+    SEMANTIC_CACHE_MAX_ENTRIES_PER_CORPUS,
+    SEMANTIC_CACHE_SIMILARITY_THRESHOLD,
+    SEMANTIC_CACHE_TTL_SECONDS,
+)
+from ..embeddings import HashingEmbedder
+from .result_cache import normalize_query
+
+StoreKey = Tuple[str, int, float]
+
+_TOKEN = re.compile(r"[\w@.:/-]+")
+_IDENTIFIER = re.compile(r"\d|\w[_@.:/-]\w")
+
+
+def _key_tokens(query: str) -> FrozenSet[str]:
+    """
+    Collect the tokens of a query that must match exactly for a cache hit.
+
+    Args:
+        query (str): The normalized query text
+
+    Returns:
+        FrozenSet[str]: Tokens holding a digit or joining word characters with
+                        _ @ . : / - (e.g. "server-1", "2024-01-02", "db.prod")
+    """
+    tokens = (token.strip(".:/-") for token in _TOKEN.findall(query))
+    return frozenset(token for token in tokens if _IDENTIFIER.search(token))
+
+
+class _QueryStore:
+    """Embeddings and cached results for one (corpus, top_k, threshold) combination."""
+
+    def __init__(self, dim: int, max_entries: int):
+        self.max_entries = max_entries
+        # Grown by doubling up to max_entries so small stores stay small
+        self.vectors = np.zeros((min(16, max_entries), dim), dtype=np.float32)
+        self.last_used = np.zeros(len(self.vectors), dtype=np.float64)
+        self.stored_at = np.zeros(len(self.vectors), dtype=np.float64)
+        self.queries: List[str] = []
+        self.keys: List[FrozenSet[str]] = []
+        self.results: List[List[dict]] = []
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def best_match(
+        self,
+        vector: np.ndarray,
+        keys: FrozenSet[str],
+        threshold: float,
+        fresh_after: float,
+    ) -> Optional[Tuple[int, float]]:
+        """Return the most similar fresh row with the same key tokens, if any passes."""
+        similarities = self.vectors[: len(self)] @ vector
+        candidates = np.flatnonzero(
+            (similarities >= threshold) & (self.stored_at[: len(self)] > fresh_after)
+        )
+        for row in candidates[np.argsort(-similarities[candidates], kind="stable")]:
+            if self.keys[row] == keys:
+                return int(row), float(similarities[row])
+        return None
+
+    def _grow(self) -> None:
+        capacity = min(len(self.vectors) * 2, self.max_entries)
+        for name in ("vectors", "last_used", "stored_at"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, query: str, vector: np.ndarray, results: List[dict], now: float) -> None:
+        if len(self) < self.max_entries:
+            if len(self) == len(self.vectors):
+                self._grow()
+            row = len(self)
+            self.queries.append(query)
+            self.keys.append(_key_tokens(query))
+            self.results.append(results)
+        else:
+            # Evict the least recently used row in place
+            row = int(np.argmin(self.last_used))
+            self.queries[row] = query
+            self.keys[row] = _key_tokens(query)
+            self.results[row] = results
+        self.vectors[row] = vector
+        self.last_used[row] = now
+        self.stored_at[row] = now
+
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + self.last_used.nbytes + self.stored_at.nbytes
+
+
+class SemanticQueryCache:
+    """
+    Bounded cache that serves results for paraphrased queries.
+
+    Memory is bounded by max_corpora stores of at most max_entries_per_corpus rows;
+    the least recently used store and row are evicted first. The embedder can be any
+    object with an embed(texts) method returning L2-normalized row vectors.
+    """
+
+    def __init__(
+        self,
+        embedder=None,
+        similarity_threshold: float = SEMANTIC_CACHE_SIMILARITY_THRESHOLD,
+        max_entries_per_corpus: int = SEMANTIC_CACHE_MAX_ENTRIES_PER_CORPUS,
+        max_corpora: int = SEMANTIC_CACHE_MAX_CORPORA,
+        ttl_seconds: float = SEMANTIC_CACHE_TTL_SECONDS,
+    ):
+        self.embedder = embedder or HashingEmbedder(dim=SEMANTIC_CACHE_EMBEDDING_DIM)
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_corpus = max_entries_per_corpus
+        self.max_corpora = max_corpora
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._stores: "OrderedDict[StoreKey, _QueryStore]" = OrderedDict()
+        # Invalidation count per corpus, see RetrievalResultCache.generation()
+        self._generations: Dict[str, int] = {}
+
+    def _embed(self, query: str) -> np.ndarray:
+        return np.asarray(self.embedder.embed([normalize_query(query)])[0], dtype=np.float32)
+
+    def get(
+        self,
+        corpus_resource_name: str,
+        query: str,
+        top_k: int,
+        distance_threshold: float,
+    ) -> Optional[Tuple[List[dict], str, float]]:
+        """
+        Look up results for a query similar to one answered before.
+
+        Args:
+            corpus_resource_name (str): The full resource name of the corpus
+            query (str): The text query
+            top_k (int): The top_k used for retrieval
+            distance_threshold (float): The vector distance threshold used for retrieval
+
+        Returns:
+            Optional[Tuple[List[dict], str, float]]: A copy of the cached results, the
+            cached query they were retrieved for and its similarity, or None on a miss
+        """
+        vector = self._embed(query)
+        key = (corpus_resource_name, int(top_k), float(distance_threshold))
+        now = time.monotonic()
+        with self._lock:
+            store = self._stores.get(key)
+            if store is not None and len(store):
+                match = store.best_match(
+                    vector,
+                    _key_tokens(normalize_query(query)),
+                    self.similarity_threshold,
+                    now - self.ttl_seconds,
+                )
+                if match is not None:
+                    row, similarity = match
+                    store.last_used[row] = now
+                    self._stores.move_to_end(key)
+                    self.hits += 1
+                    results = [dict(result) for result in store.results[row]]
+                    return results, store.queries[row], similarity
+            self.misses += 1
+            return None
+
+    def generation(self, corpus_resource_name: str) -> int:
+        """Return the corpus's generation, to pass to put() after the retrieval."""
+        with self._lock:
+            return self._generations.get(corpus_resource_name, 0)
+
+    def put(
+        self,
+        corpus_resource_name: str,
+        query: str,
+        top_k: int,
+        distance_threshold: float,
+        results: List[dict],
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Remember the results retrieved for a query.
+
+        Args:
+            corpus_resource_name (str): The full resource name of the corpus
+            query (str): The text query
+            top_k (int): The top_k used for retrieval
+            distance_threshold (float): The vector distance threshold used for retrieval
+            results (List[dict]): The processed results list returned by rag_query
+            generation (int): The corpus generation read before the retrieval; the
+                              results are dropped if the corpus was invalidated since
+        """
+        if self.max_entries_per_corpus <= 0 or self.max_corpora <= 0:
+            return
+        vector = self._embed(query)
+        key = (corpus_resource_name, int(top_k), float(distance_threshold))
+        stored = [dict(result) for result in results]
+        with self._lock:
+            current = self._generations.get(corpus_resource_name, 0)
+            if generation is not None and current != generation:
+                return
+            store = self._stores.get(key)
+            if store is None:
+                store = _QueryStore(len(vector), self.max_entries_per_corpus)
+                self._stores[key] = store
+                while len(self._stores) > self.max_corpora:
+                    self._stores.popitem(last=False)
+            self._stores.move_to_end(key)
+            store.add(normalize_query(query), vector, stored, time.monotonic())
+
+    def invalidate_corpus(self, corpus_resource_name: str) -> int:
+        """
+        Drop every stored query belonging to a corpus.
+
+        Args:
+            corpus_resource_name (str): The full resource name of the corpus
+
+        Returns:
+            int: The number of entries removed
+        """
+        with self._lock:
+            self._generations[corpus_resource_name] = self._generations.get(corpus_resource_name, 0) + 1
+            stale = [key for key in self._stores if key[0] == corpus_resource_name]
+            return sum(len(self._stores.pop(key)) for key in stale)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._stores.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Report cache effectiveness and footprint.
+
+        Returns:
+            dict: Hit/miss counters, hit ratio, entry count and bytes held by the matrices
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": sum(len(store) for store in self._stores.values()),
+                "stores": len(self._stores),
+                "matrix_bytes": sum(store.nbytes() for store in self._stores.values()),
+                "similarity_threshold": self.similarity_threshold,
+            }
+
+
+# Shared by all tools in this process
+semantic_cache = SemanticQueryCache()
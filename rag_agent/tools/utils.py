@@ -4,18 +4,236 @@ Utility functions for the RAG tools.
 
 import logging
 import re
+import threading
+import time
+from typing import Dict, Iterable, Optional
 
 from google.adk.tools.tool_context import ToolContext
-from vertexai import rag
 
+from ..backends import get_backend
 from ..config import (
+    CORPUS_RESOLVER_TTL_SECONDS,
     LOCATION,
     PROJECT_ID,
 )
+from .analysis_cache import analysis_cache
+from .file_cache import file_cache
+from .file_index import file_index
+from .result_cache import retrieval_cache
+from .semantic_cache import semantic_cache
 
 logger = logging.getLogger(__name__)
 
 
+class CorpusResolverCache:
+    """
+    Process-wide cache mapping corpus display names and resource names to each other.
+
+    A single corpus listing snapshot is reused by every tool until it is older
+    than the configured TTL or is explicitly invalidated (e.g. after a corpus is
+    created or deleted).
+    """
+
+    def __init__(self, ttl_seconds: float = CORPUS_RESOLVER_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._display_to_resource: Dict[str, str] = {}
+        self._resource_to_display: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.ttl_seconds
+        )
+
+    def _ensure_loaded(self) -> None:
+        # The listing runs under the lock so concurrent callers share one refresh
+        with self._lock:
+            if self._is_fresh():
+                self.hits += 1
+                return
+            self.misses += 1
+            self.update(get_backend().list_corpora())
+
+    def update(self, corpora: Iterable) -> None:
+        """
+        Replace the cached mappings with a fresh corpus listing.
+
+        Args:
+            corpora (Iterable): Corpus records as returned by the backend's list_corpora()
+        """
+        display_to_resource = {}
+        resource_to_display = {}
+        for corpus in corpora:
+            display_name = getattr(corpus, "display_name", "") or ""
+            resource_to_display[corpus.name] = display_name
+            if display_name:
+                display_to_resource[display_name] = corpus.name
+
+        with self._lock:
+            self._display_to_resource = display_to_resource
+            self._resource_to_display = resource_to_display
+            self._loaded_at = time.monotonic()
+
+    def resolve(self, corpus_name: str) -> Optional[str]:
+        """
+        Look up the resource name of an existing corpus.
+
+        Args:
+            corpus_name (str): A corpus display name or full resource name
+
+        Returns:
+            Optional[str]: The resource name, or None if no such corpus is known
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if corpus_name in self._resource_to_display:
+                return corpus_name
+            return self._display_to_resource.get(corpus_name)
+
+    def display_name(self, resource_name: str) -> Optional[str]:
+        """
+        Look up the display name of an existing corpus.
+
+        Args:
+            resource_name (str): The full resource name of the corpus
+
+        Returns:
+            Optional[str]: The display name, or None if no such corpus is known
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._resource_to_display.get(resource_name)
+
+    def corpora(self) -> Dict[str, str]:
+        """
+        Get every known corpus.
+
+        Returns:
+            Dict[str, str]: Mapping of resource name to display name
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return dict(self._resource_to_display)
+
+    def invalidate(self) -> None:
+        """Drop the cached listing so the next lookup lists corpora again."""
+        with self._lock:
+            self._loaded_at = None
+
+    def stats(self) -> dict:
+        """
+        Report cache effectiveness.
+
+        Returns:
+            dict: Hit/miss counters, hit ratio, number of cached corpora and listing age
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "corpora": len(self._resource_to_display),
+                "age_seconds": (
+                    time.monotonic() - self._loaded_at
+                    if self._loaded_at is not None
+                    else None
+                ),
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+# Shared by all tools in this process
+corpus_resolver = CorpusResolverCache()
+
+
+def invalidate_corpus_cache() -> None:
+    """
+    Invalidate the shared corpus resolver cache.
+    Must be called by any tool that creates or deletes a corpus.
+    """
+    corpus_resolver.invalidate()
+
+
+def get_corpus_cache_stats() -> dict:
+    """
+    Get hit/miss statistics for the shared corpus resolver cache.
+
+    Returns:
+        dict: Statistics as reported by CorpusResolverCache.stats()
+    """
+    return corpus_resolver.stats()
+
+
+def invalidate_corpus_data(corpus_resource_name: str) -> None:
+    """
+    Drop every cached artifact derived from a corpus's contents.
+    Must be called by any tool that adds, removes or deletes documents.
+
+    Args:
+        corpus_resource_name (str): The full resource name of the corpus
+    """
+    dropped = retrieval_cache.invalidate_corpus(corpus_resource_name)
+    dropped += semantic_cache.invalidate_corpus(corpus_resource_name)
+    dropped += file_cache.invalidate_corpus(corpus_resource_name)
+    file_index.invalidate_corpus(corpus_resource_name)
+    logger.info(f"Invalidated {dropped} cached result(s) for corpus: {corpus_resource_name}")
+
+
+def get_retrieval_cache_stats() -> dict:
+    """
+    Get hit ratio and footprint statistics for the shared retrieval result cache.
+
+    Returns:
+        dict: Statistics as reported by RetrievalResultCache.stats()
+    """
+    return retrieval_cache.stats()
+
+
+def get_semantic_cache_stats() -> dict:
+    """
+    Get hit ratio and footprint statistics for the shared semantic query cache.
+
+    Returns:
+        dict: Statistics as reported by SemanticQueryCache.stats()
+    """
+    return semantic_cache.stats()
+
+
+def get_file_index_stats() -> dict:
+    """
+    Get hit/miss statistics for the shared corpus file index.
+
+    Returns:
+        dict: Statistics as reported by CorpusFileIndex.stats()
+    """
+    return file_index.stats()
+
+
+def get_file_cache_stats() -> dict:
+    """
+    Get file count, size and hit statistics for the local corpus file copies.
+
+    Returns:
+        dict: Statistics as reported by LocalFileCache.stats()
+    """
+    return file_cache.stats()
+
+
+def get_analysis_cache_stats() -> dict:
+    """
+    Get entry count, size and hit statistics for the on-disk log analysis cache.
+
+    Returns:
+        dict: Statistics as reported by AnalysisCache.stats()
+    """
+    return analysis_cache.stats()
+
+
 def get_corpus_resource_name(corpus_name: str) -> str:
     """
     Convert a corpus name to its full resource name if needed.
@@ -35,11 +253,9 @@ def get_corpus_resource_name(corpus_name: str) -> str:
 
     # Check if this is a display name of an existing corpus
     try:
-        # List all corpora and check if there's a match with the display name
-        corpora = rag.list_corpora()
-        for corpus in corpora:
-            if hasattr(corpus, "display_name") and corpus.display_name == corpus_name:
-                return corpus.name
+        resource_name = corpus_resolver.resolve(corpus_name)
+        if resource_name:
+            return resource_name
     except Exception as e:
         logger.warning(f"Error when checking for corpus display name: {str(e)}")
         # If we can't check, continue with the default behavior
@@ -75,22 +291,20 @@ def check_corpus_exists(corpus_name: str, tool_context: ToolContext) -> bool:
         return True
 
     try:
-        # Get full resource name
-        corpus_resource_name = get_corpus_resource_name(corpus_name)
+        # Match by display name or resource name first, then by the normalized
+        # resource name (covers bare corpus IDs and partial paths)
+        exists = corpus_resolver.resolve(corpus_name) is not None
+        if not exists:
+            corpus_resource_name = get_corpus_resource_name(corpus_name)
+            exists = corpus_resolver.resolve(corpus_resource_name) is not None
 
-        # List all corpora and check if this one exists
-        corpora = rag.list_corpora()
-        for corpus in corpora:
-            if (
-                corpus.name == corpus_resource_name
-                or corpus.display_name == corpus_name
-            ):
-                # Update state
-                tool_context.state[f"corpus_exists_{corpus_name}"] = True
-                # Also set this as the current corpus if no current corpus is set
-                if not tool_context.state.get("current_corpus"):
-                    tool_context.state["current_corpus"] = corpus_name
-                return True
+        if exists:
+            # Update state
+            tool_context.state[f"corpus_exists_{corpus_name}"] = True
+            # Also set this as the current corpus if no current corpus is set
+            if not tool_context.state.get("current_corpus"):
+                tool_context.state["current_corpus"] = corpus_name
+            return True
 
         return False
     except Exception as e:
@@ -0,0 +1,95 @@
+"""
+Compare the memory footprint and parse time of the original object-dtype log frame
+with the compact frame produced by rag_agent.tools.log_analysis.read_log_frame.
+
+Usage:
+    python -m scripts.benchmark_log_frame --lines 10000000
+
+Run it from the repository root so the rag_agent package is importable.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from rag_agent.tools.log_analysis import read_log_frame
+
+MESSAGES = [
+    "User login ok user{u}@corp.com",
+    "ERROR_DB connection refused",
+    "ERROR_TIMEOUT upstream timed out after 30s",
+    "Failed login for user user{u}@corp.com",
+    "Blocked login attempt from 10.0.0.{u}",
+    "Login denied for user{u}@corp.com",
+    "Cache refreshed in {u}ms",
+    "ERROR_AUTH token expired for user{u}@corp.com",
+]
+
+
+def write_synthetic_log(path: str, lines: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    timestamp = datetime(2025, 1, 1)
+    block = []
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(lines):
+            timestamp += timedelta(milliseconds=rng.randint(0, 500))
+            message = rng.choice(MESSAGES).format(u=rng.randint(0, 255))
+            level = "ERROR" if message.startswith("ERROR") else rng.choice(["INFO", "WARN", "DEBUG"])
+            block.append(f"{timestamp:%Y-%m-%d %H:%M:%S}|{level}|{message}\n")
+            if len(block) == 100_000:
+                f.writelines(block)
+                block.clear()
+        f.writelines(block)
+
+
+def read_original_frame(path: str) -> pd.DataFrame:
+    """The representation analyze_logs used before read_log_frame."""
+    frame = pd.read_csv(
+        path,
+        sep="|",
+        names=["timestamp", "level", "message"],
+        parse_dates=["timestamp"],
+        engine="python",
+    )
+    frame["error_type"] = frame["message"].str.extract(r"(ERROR_\w+)")
+    frame["day"] = frame["timestamp"].dt.day_name()
+    frame["hour"] = frame["timestamp"].dt.hour
+    return frame
+
+
+def measure(name: str, reader, path: str) -> pd.Series:
+    started = time.perf_counter()
+    frame = reader(path)
+    elapsed = time.perf_counter() - started
+    usage = frame.memory_usage(deep=True, index=False)
+    print(f"\n{name}: {elapsed:.1f}s, {usage.sum() / 2**20:.1f} MiB")
+    for column, dtype in frame.dtypes.items():
+        print(f"  {column:<11} {str(dtype):<16} {usage[column] / 2**20:>10.1f} MiB")
+    return usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=10_000_000)
+    parser.add_argument("--log", help="Existing log file to use instead of a synthetic one")
+    args = parser.parse_args()
+
+    path = args.log
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.log")
+        print(f"Writing {args.lines:,} synthetic lines to {path}...")
+        write_synthetic_log(path, args.lines)
+    print(f"Log size: {os.path.getsize(path) / 2**20:.1f} MiB")
+
+    original = measure("Original (object dtypes, python engine)", read_original_frame, path)
+    compact = measure("Compact (read_log_frame)", read_log_frame, path)
+    print(f"\nMemory reduction: {original.sum() / compact.sum():.1f}x")
+
+
+if __name__ == "__main__":
+    main()